@@ -3,8 +3,10 @@
 
 import numpy
 import math
+import weakref
+from collections import OrderedDict
 
-from typing import List, Optional, TYPE_CHECKING, Any, Set, cast, Iterable, Dict
+from typing import List, Optional, TYPE_CHECKING, Any, Set, cast, Iterable, Dict, Tuple
 
 from UM.Logger import Logger
 from UM.Mesh.MeshData import MeshData
@@ -28,6 +30,7 @@ from UM.View.RenderBatch import RenderBatch
 from UM.View.GL.OpenGL import OpenGL
 
 from cura.Settings.GlobalStack import GlobalStack
+from cura.Scene.ConvexHullGrid import ConvexHullGrid, getPolygonBounds
 from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Settings.ExtruderManager import ExtruderManager
 
@@ -83,6 +86,19 @@ class BuildVolume(SceneNode):
         self._disallowed_areas_no_brim = []  # type: List[Polygon]
         self._disallowed_area_mesh = None  # type: Optional[MeshData]
         self._disallowed_area_size = 0.
+        # The disallowed areas without duplicates, to find the ones a node can collide with.
+        self._disallowed_area_grid = ConvexHullGrid([], [])
+        self._disallowed_area_version = 0
+        # The results of _computeDisallowedAreas by the values of the settings they depend on.
+        self._disallowed_areas_cache = OrderedDict()  # type: OrderedDict[Tuple[Any, ...], Tuple[List[Polygon], List[Polygon], List[Polygon]]]
+        self._disallowed_areas_cache_capacity = 16
+        self._disallowed_areas_cache_hits = 0
+        self._disallowed_areas_cache_misses = 0
+
+        # The state of every node at its last boundary check and whether it was outside the build area, so only the
+        # nodes that changed since then are checked again. Forgotten when anything else they depend on changes.
+        self._node_boundary_checks = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[SceneNode, Tuple[Any, bool]]
+        self._node_boundary_context = None  # type: Any
 
         self._error_areas = []  # type: List[Polygon]
         self._error_mesh = None  # type: Optional[MeshData]
@@ -248,6 +264,41 @@ class BuildVolume(SceneNode):
 
     def setDisallowedAreas(self, areas: List[Polygon]):
         self._disallowed_areas = areas
+        self._updateDisallowedAreaGrid()
+
+    def _updateDisallowedAreaGrid(self) -> None:
+        """Puts the disallowed areas in a grid, after leaving out the areas that are equal to another one.
+
+        The static areas of the machine are added for every extruder, so many areas are there more than once.
+        """
+
+        areas = []  # type: List[Polygon]
+        bounds = []
+        seen = set()
+        for area in self._disallowed_areas:
+            area_bounds = getPolygonBounds(area)
+            if area_bounds is None:
+                continue
+            key = area.getPoints().tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            areas.append(area)
+            bounds.append(area_bounds)
+        self._disallowed_area_grid = ConvexHullGrid(areas, bounds)
+        self._disallowed_area_version += 1
+
+    def _collidesWithDisallowedAreas(self, printing_area: Optional[Polygon]) -> bool:
+        """Like node.collidesWithAreas(self.getDisallowedAreas()), but only tests the areas around the printing area
+        of the node.
+        """
+
+        if not printing_area or not printing_area.isValid():
+            return False
+        bounds = getPolygonBounds(printing_area)
+        if bounds is None:
+            return False
+        return any(printing_area.intersectsPolygon(area) is not None for area in self._disallowed_area_grid.query(bounds))
 
     def render(self, renderer):
         if not self.getMeshData() or not self.isVisible():
@@ -294,6 +345,13 @@ class BuildVolume(SceneNode):
             # In that situation there is a model, but no machine (and therefore no build volume.
             return
 
+        # Only the nodes that changed since the last check are checked again.
+        context = (self._getBoxKey(build_volume_bounding_box), self._disallowed_area_version, id(self._global_container_stack),
+                   tuple(extruder.isEnabled for extruder in self._global_container_stack.extruderList))
+        if context != self._node_boundary_context:
+            self._node_boundary_checks.clear()
+            self._node_boundary_context = context
+
         for node in nodes:
             # Need to check group nodes later
             if node.callDecoration("isGroup"):
@@ -303,31 +361,20 @@ class BuildVolume(SceneNode):
                 if not isinstance(node, CuraSceneNode):
                     continue
 
-                if node.collidesWithBbox(build_volume_bounding_box):
-                    node.setOutsideBuildArea(True)
+                printing_area = node.callDecoration("getPrintingArea")
+                state = self._getNodeBoundaryState(node, printing_area)
+                last_check = self._node_boundary_checks.get(node)
+                if last_check is not None and last_check[0] == state:
+                    # The group nodes may have overridden the result since.
+                    node.setOutsideBuildArea(last_check[1])
                     continue
 
-                if node.collidesWithAreas(self.getDisallowedAreas()):
-                    node.setOutsideBuildArea(True)
-                    continue
-                # If the entire node is below the build plate, still mark it as outside.
-                node_bounding_box = node.getBoundingBox()
-                if node_bounding_box and node_bounding_box.top < 0 and not node.getParent().callDecoration("isGroup"):
-                    node.setOutsideBuildArea(True)
-                    continue
-                # Mark the node as outside build volume if the set extruder is disabled
-                extruder_position = node.callDecoration("getActiveExtruderPosition")
-                try:
-                    if not self._global_container_stack.extruderList[int(extruder_position)].isEnabled and not node.callDecoration("isGroup"):
-                        node.setOutsideBuildArea(True)
-                        continue
-                except IndexError:  # Happens when the extruder list is too short. We're not done building the printer in memory yet.
-                    continue
-                except TypeError:  # Happens when extruder_position is None. This object has no extruder decoration.
+                outside = self._isOutsideBuildArea(node, build_volume_bounding_box, printing_area)
+                if outside is None:
                     continue
+                self._node_boundary_checks[node] = (state, outside)
+                node.setOutsideBuildArea(outside)
 
-                node.setOutsideBuildArea(False)
-                
         #BCN3D IDEX INCLUSION
         from cura.Utils.BCN3Dutils.Bcn3dIdexSupport import updateNodeBoundaryCheckForDuplicated
         updateNodeBoundaryCheckForDuplicated() 
@@ -346,6 +393,50 @@ class BuildVolume(SceneNode):
             for child_node in children:
                 child_node.setOutsideBuildArea(group_node.isOutsideBuildArea())
 
+    def _isOutsideBuildArea(self, node: CuraSceneNode, build_volume_bounding_box: AxisAlignedBox, printing_area: Optional[Polygon]) -> Optional[bool]:
+        """Whether a sliceable or group node is outside the build area, or None if that can't be known yet."""
+
+        if node.collidesWithBbox(build_volume_bounding_box):
+            return True
+
+        if self._collidesWithDisallowedAreas(printing_area):
+            return True
+        # If the entire node is below the build plate, still mark it as outside.
+        node_bounding_box = node.getBoundingBox()
+        if node_bounding_box and node_bounding_box.top < 0 and not node.getParent().callDecoration("isGroup"):
+            return True
+        # Mark the node as outside build volume if the set extruder is disabled
+        extruder_position = node.callDecoration("getActiveExtruderPosition")
+        try:
+            if not self._global_container_stack.extruderList[int(extruder_position)].isEnabled and not node.callDecoration("isGroup"):
+                return True
+        except IndexError:  # Happens when the extruder list is too short. We're not done building the printer in memory yet.
+            return None
+        except TypeError:  # Happens when extruder_position is None. This object has no extruder decoration.
+            return None
+
+        return False
+
+    def _getNodeBoundaryState(self, node: CuraSceneNode, printing_area: Optional[Polygon]) -> Tuple[Any, ...]:
+        """What the boundary check of a node depends on, apart from the build volume and the global settings.
+
+        The printing area changes with the settings of the object too, like its horizontal expansion.
+        """
+
+        mesh_data = node.getMeshData()
+        parent = node.getParent()
+        printing_area_points = printing_area.getPoints() if printing_area is not None else None
+        return (printing_area_points.tobytes() if printing_area_points is not None else None,
+                node.getWorldTransformation(copy = False).getData().tobytes(), self._getBoxKey(node.getBoundingBox()),
+                id(mesh_data) if mesh_data is not None else None, id(parent) if parent is not None else None,
+                node.callDecoration("getActiveExtruderPosition"), tuple(id(decorator) for decorator in node.getDecorators()))
+
+    @staticmethod
+    def _getBoxKey(box: Optional[AxisAlignedBox]) -> Optional[Tuple[float, ...]]:
+        if box is None:
+            return None
+        return box.left, box.right, box.bottom, box.top, box.back, box.front
+
     def checkBoundsAndUpdate(self, node: CuraSceneNode, bounds: Optional[AxisAlignedBox] = None) -> None:
         """Update the outsideBuildArea of a single node, given bounds or current build volume
 
@@ -373,7 +464,7 @@ class BuildVolume(SceneNode):
                 node.setOutsideBuildArea(True)
                 return
 
-            if node.collidesWithAreas(self.getDisallowedAreas()):
+            if self._collidesWithDisallowedAreas(node.callDecoration("getPrintingArea")):
                 node.setOutsideBuildArea(True)
                 return
 
@@ -612,6 +703,8 @@ class BuildVolume(SceneNode):
 
         self._application.getController().getScene()._maximum_bounds = scale_to_max_bounds  # type: ignore
 
+        # The settings changed, which can change the hulls of all nodes.
+        self._node_boundary_checks.clear()
         self.updateNodeBoundaryCheck()
 
     def getBoundingBox(self) -> Optional[AxisAlignedBox]:
@@ -814,12 +907,69 @@ class BuildVolume(SceneNode):
         if not self._global_container_stack:
             return
 
-        self._error_areas = []
-
         used_extruders = ExtruderManager.getInstance().getUsedExtruderStacks()
         self._edge_disallowed_size = None  # Force a recalculation
         disallowed_border_size = self.getEdgeDisallowedSize()
 
+        # Switching the print mode back and forth gives the same areas again, so they are only computed once.
+        key = self._getDisallowedAreasKey(disallowed_border_size, used_extruders)
+        try:
+            areas = self._disallowed_areas_cache.get(key)
+        except TypeError:  # A setting has a value that can't be a key. Don't cache the areas then.
+            key = None
+            areas = None
+        if areas is not None:
+            self._disallowed_areas_cache.move_to_end(key)
+            self._disallowed_areas_cache_hits += 1
+        else:
+            self._disallowed_areas_cache_misses += 1
+            areas = self._computeDisallowedAreas(disallowed_border_size, used_extruders)
+            if key is not None:
+                self._disallowed_areas_cache[key] = areas
+                while len(self._disallowed_areas_cache) > self._disallowed_areas_cache_capacity:
+                    self._disallowed_areas_cache.popitem(last = False)
+
+        disallowed_areas, disallowed_areas_no_brim, error_areas = areas
+        self._disallowed_areas = list(disallowed_areas)
+        self._disallowed_areas_no_brim = list(disallowed_areas_no_brim)
+        self._error_areas = list(error_areas)
+        self._has_errors = len(self._error_areas) > 0
+        self._updateDisallowedAreaGrid()
+
+    def getDisallowedAreasCacheStatistics(self) -> Dict[str, int]:
+        """The number of times the disallowed areas were found and not found in the cache, and the number it holds."""
+
+        return {"hits": self._disallowed_areas_cache_hits, "misses": self._disallowed_areas_cache_misses, "size": len(self._disallowed_areas_cache)}
+
+    def _getDisallowedAreasKey(self, border_size: float, used_extruders: List["ExtruderStack"]) -> Tuple[Any, ...]:
+        """The values of all settings that the disallowed areas are computed from."""
+
+        global_values = tuple(self._freezeValue(self._global_container_stack.getProperty(setting_key, "value")) for setting_key in self._disallowed_area_global_keys)
+        extruder_values = tuple((extruder.getId(), extruder.isEnabled) + tuple(self._freezeValue(extruder.getProperty(setting_key, "value")) for setting_key in self._disallowed_area_extruder_keys)
+                                for extruder in used_extruders)
+        # The build volume is the area that all extruders can reach.
+        nozzle_offsets = tuple((extruder.getProperty("machine_nozzle_offset_x", "value"), extruder.getProperty("machine_nozzle_offset_y", "value"))
+                               for extruder in ExtruderManager.getInstance().getActiveExtruderStacks())
+        return (border_size, self._shape, self._global_container_stack.getMetaDataEntry("nozzle_offsetting_for_disallowed_areas", True),
+                global_values, extruder_values, nozzle_offsets)
+
+    @classmethod
+    def _freezeValue(cls, value: Any) -> Any:
+        """The value with its lists as tuples, so it can be part of a dictionary key."""
+
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freezeValue(item) for item in value)
+        return value
+
+    def _computeDisallowedAreas(self, disallowed_border_size: float, used_extruders: List["ExtruderStack"]) -> Tuple[List[Polygon], List[Polygon], List[Polygon]]:
+        """Computes the disallowed areas of all used extruders.
+
+        :return: The disallowed areas, the disallowed areas without the border and the prime towers that collide with
+        them.
+        """
+
+        error_areas = []  # type: List[Polygon]
+
         result_areas = self._computeDisallowedAreasStatic(disallowed_border_size, used_extruders)  # Normal machine disallowed areas can always be added.
         prime_areas = self._computeDisallowedAreasPrimeBlob(disallowed_border_size, used_extruders)
         result_areas_no_brim = self._computeDisallowedAreasStatic(0, used_extruders)  # Where the priming is not allowed to happen. This is not added to the result, just for collision checking.
@@ -854,16 +1004,15 @@ class BuildVolume(SceneNode):
                     result_areas[extruder_id].extend(prime_tower_areas[extruder_id])
                     result_areas_no_brim[extruder_id].extend(prime_tower_areas[extruder_id])
                 else:
-                    self._error_areas.extend(prime_tower_areas[extruder_id])
-
-        self._has_errors = len(self._error_areas) > 0
+                    error_areas.extend(prime_tower_areas[extruder_id])
 
-        self._disallowed_areas = []
+        disallowed_areas = []  # type: List[Polygon]
         for extruder_id in result_areas:
-            self._disallowed_areas.extend(result_areas[extruder_id])
-        self._disallowed_areas_no_brim = []
+            disallowed_areas.extend(result_areas[extruder_id])
+        disallowed_areas_no_brim = []  # type: List[Polygon]
         for extruder_id in result_areas_no_brim:
-            self._disallowed_areas_no_brim.extend(result_areas_no_brim[extruder_id])
+            disallowed_areas_no_brim.extend(result_areas_no_brim[extruder_id])
+        return disallowed_areas, disallowed_areas_no_brim, error_areas
 
     def _computeDisallowedAreasPrinted(self, used_extruders):
         """Computes the disallowed areas for objects that are printed with print features.
@@ -1219,4 +1368,7 @@ class BuildVolume(SceneNode):
     _extruder_settings = ["support_enable", "support_bottom_enable", "support_roof_enable", "support_infill_extruder_nr", "support_extruder_nr_layer_0", "support_bottom_extruder_nr", "support_roof_extruder_nr", "brim_line_count", "skirt_brim_extruder_nr", "raft_base_extruder_nr", "raft_interface_extruder_nr", "raft_surface_extruder_nr", "adhesion_type"] #Settings that can affect which extruders are used.
     _limit_to_extruder_settings = ["wall_extruder_nr", "wall_0_extruder_nr", "wall_x_extruder_nr", "top_bottom_extruder_nr", "infill_extruder_nr", "support_infill_extruder_nr", "support_extruder_nr_layer_0", "support_bottom_extruder_nr", "support_roof_extruder_nr", "skirt_brim_extruder_nr", "raft_base_extruder_nr", "raft_interface_extruder_nr", "raft_surface_extruder_nr"]
     _material_size_settings = ["material_shrinkage_percentage", "material_shrinkage_percentage_xy", "material_shrinkage_percentage_z"]
+    # The settings of the global stack and the extruders that _computeDisallowedAreas reads, apart from the edge size.
+    _disallowed_area_global_keys = ["machine_width", "machine_depth", "machine_center_is_zero", "machine_disallowed_areas", "print_mode", "adhesion_type", "skirt_brim_extruder_nr"] + _tower_settings
+    _disallowed_area_extruder_keys = ["extruder_nr", "machine_nozzle_offset_x", "machine_nozzle_offset_y", "nozzle_disallowed_areas"] + _prime_settings
     _disallowed_area_settings = _skirt_settings + _prime_settings + _tower_settings + _ooze_shield_settings + _distance_settings + _extruder_settings + _material_size_settings
@@ -1,20 +1,34 @@
 # Copyright (c) 2015 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
+from typing import Dict
+
+import numpy
+
 from UM.Mesh.MeshData import MeshData
 
+from cura.LayerPolygon import LayerPolygon
+from cura.LayerStatistics import LayerStatistics
+
 
 class LayerData(MeshData):
     """Class to holds the layer mesh and information about the layers.
 
     Immutable, use :py:class:`cura.LayerDataBuilder.LayerDataBuilder` to create one of these.
+
+    Compact layer data (see ``LayerDataBuilder.build``) stores its attributes in small types and keeps the colors as
+    a palette per extruder and per line type. ``getAttribute``, ``getColors`` and ``getColorsAsByteArray`` expand
+    them to the float32 arrays the shaders read, so they only exist while the mesh is uploaded.
     """
 
     def __init__(self, vertices = None, normals = None, indices = None, colors = None, uvs = None, file_name = None,
-                 center_position = None, layers=None, element_counts=None, attributes=None):
+                 center_position = None, layers=None, element_counts=None, attributes=None, palettes=None, statistics=None):
         super().__init__(vertices=vertices, normals=normals, indices=indices, colors=colors, uvs=uvs,
                          file_name=file_name, center_position=center_position, attributes=attributes)
         self._layers = layers
         self._element_counts = element_counts
+        # The material color per extruder and the color per line type of compact layer data.
+        self._palettes = palettes
+        self._statistics = statistics
 
     def getLayer(self, layer):
         if layer in self._layers:
@@ -26,3 +40,80 @@ class LayerData(MeshData):
 
     def getElementCounts(self):
         return self._element_counts
+
+    def getStatistics(self) -> LayerStatistics:
+        """The ranges of the feedrates, line widths, thicknesses and flow rates per layer and line type."""
+
+        if self._statistics is None:
+            self._statistics = LayerStatistics(self._layers)
+        return self._statistics
+
+    def isCompact(self) -> bool:
+        return self._palettes is not None
+
+    def hasColors(self) -> bool:
+        return self.isCompact() or super().hasColors()
+
+    def getColors(self):
+        if not self.isCompact():
+            return super().getColors()
+        line_type_color_map = self._palettes[1]
+        return line_type_color_map[super().getAttribute("line_types")["value"]]
+
+    def getColorsAsByteArray(self):
+        # The vertex buffer upload of Uranium reads the colors as bytes, not through getColors.
+        if not self.isCompact():
+            return super().getColorsAsByteArray()
+        return self.getColors().tobytes()
+
+    def getAttribute(self, key):
+        attribute = super().getAttribute(key)
+        if not self.isCompact() or key not in {"line_dimensions", "extruders", "colors", "line_types", "feedrates"}:
+            return attribute
+
+        if key == "colors":
+            material_color_map, line_type_color_map = self._palettes
+            line_types = super().getAttribute("line_types")["value"]
+            value = self.materialColors(super().getAttribute("extruders")["value"], line_types, line_type_color_map[line_types], material_color_map)
+        else:
+            value = attribute["value"].astype(numpy.float32)
+        expanded = dict(attribute)
+        expanded["value"] = value
+        return expanded
+
+    def getMemoryUsage(self) -> Dict[str, int]:
+        """The number of bytes taken by every array of the layer data, by name."""
+
+        usage = {}
+        for name, value in (("vertices", self.getVertices()), ("indices", self.getIndices()), ("normals", self.getNormals())):
+            if value is not None:
+                usage[name] = value.nbytes
+        if not self.isCompact() and super().getColors() is not None:
+            usage["vertex_colors"] = super().getColors().nbytes
+        for name in self.attributeNames():
+            value = super().getAttribute(name)["value"]
+            if value is not None:
+                usage[name] = value.nbytes
+        if self.isCompact():
+            usage["palettes"] = sum(palette.nbytes for palette in self._palettes)
+        return usage
+
+    @staticmethod
+    def materialColors(extruders: numpy.ndarray, line_types: numpy.ndarray, colors: numpy.ndarray, material_color_map: numpy.ndarray) -> numpy.ndarray:
+        """The color of the material of every vertex, or its line type color for travels.
+
+        :param extruders: The extruder of every vertex.
+        :param line_types: The line type of every vertex.
+        :param colors: The line type color of every vertex.
+        :param material_color_map: [r, g, b, a] for each extruder row.
+        """
+
+        # Note: we're using numpy indexing here.
+        # See also: https://docs.scipy.org/doc/numpy/reference/arrays.indexing.html
+        material_colors = numpy.zeros((len(extruders), 4), dtype=numpy.float32)
+        for extruder_nr in range(material_color_map.shape[0]):
+            material_colors[extruders == extruder_nr] = material_color_map[extruder_nr]
+        # Set material_colors with indices where line_types (also numpy array) == MoveCombingType
+        material_colors[line_types == LayerPolygon.MoveCombingType] = colors[line_types == LayerPolygon.MoveCombingType]
+        material_colors[line_types == LayerPolygon.MoveRetractionType] = colors[line_types == LayerPolygon.MoveRetractionType]
+        return material_colors
@@ -5,6 +5,7 @@ from .Layer import Layer
 from .LayerPolygon import LayerPolygon
 from UM.Mesh.MeshBuilder import MeshBuilder
 from .LayerData import LayerData
+from .LayerStatistics import LayerStatistics
 
 import numpy
 from typing import Dict, Optional
@@ -43,11 +44,14 @@ class LayerDataBuilder(MeshBuilder):
 
         self._layers[layer].setThickness(thickness)
 
-    def build(self, material_color_map, line_type_brightness = 1.0):
+    def build(self, material_color_map, line_type_brightness = 1.0, compact = False):
         """Return the layer data as :py:class:`cura.LayerData.LayerData`.
 
         :param material_color_map: [r, g, b, a] for each extruder row.
         :param line_type_brightness: compatibility layer view uses line type brightness of 0.5
+        :param compact: Store the line dimensions and feedrates as half floats and the extruders and line types as
+        bytes, and keep the colors as palettes instead of an RGBA value per vertex. The layer data then expands the
+        attributes only when they are uploaded to the GPU.
         """
 
         vertex_count = 0
@@ -57,12 +61,19 @@ class LayerDataBuilder(MeshBuilder):
             index_count += data.lineMeshElementCount()
 
         vertices = numpy.empty((vertex_count, 3), numpy.float32)
-        line_dimensions = numpy.empty((vertex_count, 2), numpy.float32)
-        colors = numpy.empty((vertex_count, 4), numpy.float32)
         indices = numpy.empty((index_count, 2), numpy.int32)
-        feedrates = numpy.empty((vertex_count), numpy.float32)
-        extruders = numpy.empty((vertex_count), numpy.float32)
-        line_types = numpy.empty((vertex_count), numpy.float32)
+        if compact:
+            line_dimensions = numpy.empty((vertex_count, 2), numpy.float16)
+            colors = None  # Looked up from the line types.
+            feedrates = numpy.empty((vertex_count), numpy.float16)
+            extruders = numpy.empty((vertex_count), numpy.uint8)
+            line_types = numpy.empty((vertex_count), numpy.uint8)
+        else:
+            line_dimensions = numpy.empty((vertex_count, 2), numpy.float32)
+            colors = numpy.empty((vertex_count, 4), numpy.float32)
+            feedrates = numpy.empty((vertex_count), numpy.float32)
+            extruders = numpy.empty((vertex_count), numpy.float32)
+            line_types = numpy.empty((vertex_count), numpy.float32)
 
         vertex_offset = 0
         index_offset = 0
@@ -71,18 +82,16 @@ class LayerDataBuilder(MeshBuilder):
             self._element_counts[layer] = data.elementCount
 
         self.addVertices(vertices)
-        colors[:, 0:3] *= line_type_brightness
-        self.addColors(colors)
         self.addIndices(indices.flatten())
 
-        # Note: we're using numpy indexing here.
-        # See also: https://docs.scipy.org/doc/numpy/reference/arrays.indexing.html
-        material_colors = numpy.zeros((line_dimensions.shape[0], 4), dtype=numpy.float32)
-        for extruder_nr in range(material_color_map.shape[0]):
-            material_colors[extruders == extruder_nr] = material_color_map[extruder_nr]
-        # Set material_colors with indices where line_types (also numpy array) == MoveCombingType
-        material_colors[line_types == LayerPolygon.MoveCombingType] = colors[line_types == LayerPolygon.MoveCombingType]
-        material_colors[line_types == LayerPolygon.MoveRetractionType] = colors[line_types == LayerPolygon.MoveRetractionType]
+        line_type_color_map = numpy.array(LayerPolygon.getColorMap(), dtype = numpy.float32)
+        line_type_color_map[:, 0:3] *= line_type_brightness
+        if compact:
+            material_colors = None  # Looked up from the extruders and line types.
+        else:
+            colors[:, 0:3] *= line_type_brightness
+            self.addColors(colors)
+            material_colors = LayerData.materialColors(extruders, line_types, colors, material_color_map)
 
         attributes = {
             "line_dimensions": {
@@ -115,4 +124,6 @@ class LayerDataBuilder(MeshBuilder):
         return LayerData(vertices=self.getVertices(), normals=self.getNormals(), indices=self.getIndices(),
                         colors=self.getColors(), uvs=self.getUVCoordinates(), file_name=self.getFileName(),
                         center_position=self.getCenterPosition(), layers=self._layers,
-                        element_counts=self._element_counts, attributes=attributes)
+                        element_counts=self._element_counts, attributes=attributes,
+                        palettes=(material_color_map, line_type_color_map) if compact else None,
+                        statistics=LayerStatistics(self._layers))
@@ -29,6 +29,13 @@ class LayerPolygon:
                                                    numpy.arange(__number_of_types) == MoveCombingType),
                                                    numpy.arange(__number_of_types) == MoveRetractionType)
 
+    # When type is used as index returns true if type == LayerPolygon.InfillType
+    # or type == LayerPolygon.SkinType
+    # or type == LayerPolygon.SupportInfillType
+    # Should be generated in better way, not hardcoded.
+    # Shared by all the polygons, as there can be hundreds of thousands of them.
+    __is_infill_or_skin_type_map = numpy.array([0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0], dtype=bool)
+
     def __init__(self, extruder: int, line_types: numpy.ndarray, data: numpy.ndarray,
                  line_widths: numpy.ndarray, line_thicknesses: numpy.ndarray, line_feedrates: numpy.ndarray) -> None:
         """LayerPolygon, used in ProcessSlicedLayersJob
@@ -69,11 +76,7 @@ class LayerPolygon:
         self._color_map = LayerPolygon.getColorMap()
         self._colors: numpy.ndarray = self._color_map[self._types]
 
-        # When type is used as index returns true if type == LayerPolygon.InfillType
-        # or type == LayerPolygon.SkinType
-        # or type == LayerPolygon.SupportInfillType
-        # Should be generated in better way, not hardcoded.
-        self._is_infill_or_skin_type_map = numpy.array([0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0], dtype=bool)
+        self._is_infill_or_skin_type_map = self.__is_infill_or_skin_type_map
 
         self._build_cache_line_mesh_mask: Optional[numpy.ndarray] = None
         self._build_cache_needed_points: Optional[numpy.ndarray] = None
@@ -94,7 +97,7 @@ class LayerPolygon:
         self._vertex_end = cast(int, numpy.sum(self._build_cache_needed_points))
 
     def build(self, vertex_offset: int, index_offset: int, vertices: numpy.ndarray,
-              colors: numpy.ndarray, line_dimensions: numpy.ndarray, feedrates: numpy.ndarray,
+              colors: Optional[numpy.ndarray], line_dimensions: numpy.ndarray, feedrates: numpy.ndarray,
               extruders: numpy.ndarray, line_types: numpy.ndarray, indices: numpy.ndarray) -> None:
         """Set all the arrays provided by the function caller, representing the LayerPolygon
 
@@ -103,7 +106,7 @@ class LayerPolygon:
         :param vertex_offset: determines where to start and end filling the arrays
         :param index_offset: determines where to start and end filling the arrays
         :param vertices: vertex numpy array to be filled
-        :param colors: vertex numpy array to be filled
+        :param colors: vertex numpy array to be filled, or None to skip the colors
         :param line_dimensions: vertex numpy array to be filled
         :param feedrates: vertex numpy array to be filled
         :param extruders: vertex numpy array to be filled
@@ -135,7 +138,9 @@ class LayerPolygon:
         vertices[self._vertex_begin:self._vertex_end, :] = self._data[index_list, :]
 
         # Create an array with colors for each vertex and remove the color data for the points that has been thrown away.
-        colors[self._vertex_begin:self._vertex_end, :] = numpy.tile(self._colors, (1, 2)).reshape((-1, 4))[needed_points_list.ravel()]
+        # Compact layer data has no colors per vertex, they are looked up from the line types.
+        if colors is not None:
+            colors[self._vertex_begin:self._vertex_end, :] = numpy.tile(self._colors, (1, 2)).reshape((-1, 4))[needed_points_list.ravel()]
 
         # Create an array with line widths and thicknesses for each vertex.
         line_dimensions[self._vertex_begin:self._vertex_end, 0] = numpy.tile(self._line_widths, (1, 2)).reshape((-1, 1))[needed_points_list.ravel()][:, 0]
@@ -0,0 +1,87 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING
+
+import numpy
+
+from cura.LayerPolygon import LayerPolygon
+
+if TYPE_CHECKING:
+    from cura.Layer import Layer
+
+
+class LayerStatistics:
+    """Minimum and maximum feedrate, line width, thickness and flow rate of the lines of every type in every layer.
+
+    The color schemes of the simulation view need these ranges over the visible line types. Summarizing the lines
+    once when the layer data is made lets the view combine the ranges per layer and line type, instead of going over
+    every line again whenever the visible line types change.
+    """
+
+    Feedrate = 0
+    LineWidth = 1
+    Thickness = 2  # The minimum thickness leaves out the lines without thickness.
+    FlowRate = 3
+    __number_of_statistics = 4
+
+    __number_of_types = LayerPolygon.PrimeTowerType + 1
+
+    def __init__(self, layers: Dict[int, "Layer"]) -> None:
+        self._layer_numbers = sorted(layer_number for layer_number, layer in layers.items() if layer.polygons)
+
+        shape = (len(self._layer_numbers), self.__number_of_types, self.__number_of_statistics)
+        self._minimums = numpy.full(shape, numpy.inf)
+        self._maximums = numpy.full(shape, -numpy.inf)
+        self._line_counts = numpy.zeros(shape[:2], dtype = numpy.int64)
+
+        for row, layer_number in enumerate(self._layer_numbers):
+            self._addLayer(row, layers[layer_number].polygons)
+
+    def _addLayer(self, row: int, polygons: List[LayerPolygon]) -> None:
+        line_types = numpy.concatenate([polygon.types.ravel() for polygon in polygons])
+        feedrates = numpy.concatenate([polygon.lineFeedrates.ravel() for polygon in polygons])
+        line_widths = numpy.concatenate([polygon.lineWidths.ravel() for polygon in polygons])
+        thicknesses = numpy.concatenate([polygon.lineThicknesses.ravel() for polygon in polygons])
+
+        known_types = line_types < self.__number_of_types
+        if not known_types.all():
+            line_types, feedrates, line_widths, thicknesses = line_types[known_types], feedrates[known_types], line_widths[known_types], thicknesses[known_types]
+        line_types = line_types.astype(numpy.intp)
+
+        values = numpy.stack([feedrates, line_widths, thicknesses, feedrates * line_widths * thicknesses], axis = 1)
+        minimums = self._minimums[row]
+        maximums = self._maximums[row]
+        numpy.minimum.at(minimums, line_types, values)
+        numpy.maximum.at(maximums, line_types, values)
+        numpy.add.at(self._line_counts[row], line_types, 1)
+
+        # Lines without thickness don't count for the minimum thickness.
+        minimums[:, self.Thickness] = numpy.inf
+        has_thickness = thicknesses != 0
+        numpy.minimum.at(minimums[:, self.Thickness], line_types[has_thickness], thicknesses[has_thickness])
+
+    def getLayerNumbers(self) -> List[int]:
+        """The numbers of the layers that have lines, in increasing order."""
+
+        return self._layer_numbers
+
+    def hasLines(self, line_types: Iterable[int]) -> bool:
+        """Whether any layer has lines of these types."""
+
+        return bool(self._line_counts[:, self._typeIndices(line_types)].any())
+
+    def getRange(self, statistic: int, line_types: Iterable[int]) -> Tuple[float, float]:
+        """The minimum and maximum of a statistic over the lines of these types in all layers.
+
+        :param statistic: ``Feedrate``, ``LineWidth``, ``Thickness`` or ``FlowRate``.
+        :return: The minimum and maximum, or infinity and minus infinity if there are no such lines.
+        """
+
+        type_indices = self._typeIndices(line_types)
+        minimum = self._minimums[:, type_indices, statistic].min(initial = numpy.inf)
+        maximum = self._maximums[:, type_indices, statistic].max(initial = -numpy.inf)
+        return float(minimum), float(maximum)
+
+    def _typeIndices(self, line_types: Iterable[int]) -> List[int]:
+        return [line_type for line_type in line_types if 0 <= line_type < self.__number_of_types]
@@ -12,6 +12,7 @@ from UM.Scene.Selection import Selection
 from UM.Scene.SceneNodeSettings import SceneNodeSettings
 
 from cura.Scene.ConvexHullDecorator import ConvexHullDecorator
+from cura.Scene.ConvexHullGrid import ConvexHullGrid, getPolygonBounds
 
 from cura.Operations import PlatformPhysicsOperation
 from cura.Scene import ZOffsetDecorator
@@ -64,11 +65,12 @@ class PlatformPhysics:
         build_volume = app_instance.getBuildVolume()
         build_volume.updateNodeBoundaryCheck()
 
-        # Keep a list of nodes that are moving. We use this so that we don't move two intersecting objects in the
+        # Keep the nodes that are moving. We use this so that we don't move two intersecting objects in the
         # same direction.
-        transformed_nodes = []
+        transformed_nodes = set()
 
         nodes = list(BreadthFirstIterator(root))
+        grids = self._buildConvexHullGrids(root, nodes) if app_automatic_push_free else {}
 
         # Only check nodes inside build area.
         nodes = [node for node in nodes if (hasattr(node, "_outside_buildarea") and not node._outside_buildarea)]
@@ -99,77 +101,79 @@ class PlatformPhysics:
                 if node.getSetting(SceneNodeSettings.LockPosition):
                     continue
 
-                # Check for collisions between convex hulls
-                for other_node in BreadthFirstIterator(root):
-                    # Ignore root, ourselves and anything that is not a normal SceneNode.
-                    if other_node is root or not issubclass(type(other_node), SceneNode) or other_node is node or other_node.callDecoration("getBuildPlateNumber") != node.callDecoration("getBuildPlateNumber"):
-                        continue
-
-                    # Ignore collisions of a group with it's own children
-                    if other_node in node.getAllChildren() or node in other_node.getAllChildren():
-                        continue
-
-                    # Ignore collisions within a group
-                    if other_node.getParent() and node.getParent() and (other_node.getParent().callDecoration("isGroup") is not None or node.getParent().callDecoration("isGroup") is not None):
-                        continue
-
-                    # Ignore nodes that do not have the right properties set.
-                    if not other_node.callDecoration("getConvexHull") or not other_node.getBoundingBox():
-                        continue
-
-                    if other_node in transformed_nodes:
-                        continue  # Other node is already moving, wait for next pass.
-
-                    if other_node.callDecoration("isNonPrintingMesh"):
-                        continue
-
-                    overlap = (0, 0)  # Start loop with no overlap
-                    current_overlap_checks = 0
-                    # Continue to check the overlap until we no longer find one.
-                    while overlap and current_overlap_checks < self._max_overlap_checks:
-                        current_overlap_checks += 1
-                        head_hull = node.callDecoration("getConvexHullHead")
-                        if head_hull:  # One at a time intersection.
-                            overlap = head_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_node.callDecoration("getConvexHull"))
-                            if not overlap:
-                                other_head_hull = other_node.callDecoration("getConvexHullHead")
-                                if other_head_hull:
-                                    overlap = node.callDecoration("getConvexHull").translate(move_vector.x, move_vector.z).intersectsPolygon(other_head_hull)
-                                    if overlap:
-                                        # Moving ensured that overlap was still there. Try anew!
-                                        move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                                      z = move_vector.z + overlap[1] * self._move_factor)
+                # Check for collisions between convex hulls. Only the nodes on the same build plate whose hulls reach
+                # the hulls of this node can overlap with it. When the node is pushed away, the nodes around its new
+                # spot are checked as well.
+                grid = grids.get(node.callDecoration("getBuildPlateNumber"))
+                # Ignore collisions within a group
+                if node.getParent() and node.getParent().callDecoration("isGroup") is not None:
+                    grid = None
+                own_bounds = getPolygonBounds(node.callDecoration("getConvexHull"), node.callDecoration("getConvexHullHead"))
+                checked_nodes = set()
+                while grid is not None and own_bounds is not None:
+                    moved_bounds = (own_bounds[0] + move_vector.x, own_bounds[1] + move_vector.z, own_bounds[2] + move_vector.x, own_bounds[3] + move_vector.z)
+                    other_nodes = [other_node for other_node in grid.query(moved_bounds) if other_node not in checked_nodes]
+                    if not other_nodes:
+                        break
+                    checked_nodes.update(other_nodes)
+                    for other_node in other_nodes:
+                        if other_node is node:
+                            continue
+
+                        # Ignore collisions of a group with it's own children
+                        if self._isAncestor(node, other_node) or self._isAncestor(other_node, node):
+                            continue
+
+                        if other_node in transformed_nodes:
+                            continue  # Other node is already moving, wait for next pass.
+
+                        overlap = (0, 0)  # Start loop with no overlap
+                        current_overlap_checks = 0
+                        # Continue to check the overlap until we no longer find one.
+                        while overlap and current_overlap_checks < self._max_overlap_checks:
+                            current_overlap_checks += 1
+                            head_hull = node.callDecoration("getConvexHullHead")
+                            if head_hull:  # One at a time intersection.
+                                overlap = head_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_node.callDecoration("getConvexHull"))
+                                if not overlap:
+                                    other_head_hull = other_node.callDecoration("getConvexHullHead")
+                                    if other_head_hull:
+                                        overlap = node.callDecoration("getConvexHull").translate(move_vector.x, move_vector.z).intersectsPolygon(other_head_hull)
+                                        if overlap:
+                                            # Moving ensured that overlap was still there. Try anew!
+                                            move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                                          z = move_vector.z + overlap[1] * self._move_factor)
+                                else:
+                                    # Moving ensured that overlap was still there. Try anew!
+                                    move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                                  z = move_vector.z + overlap[1] * self._move_factor)
                             else:
-                                # Moving ensured that overlap was still there. Try anew!
-                                move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                              z = move_vector.z + overlap[1] * self._move_factor)
-                        else:
-                            own_convex_hull = node.callDecoration("getConvexHull")
-                            other_convex_hull = other_node.callDecoration("getConvexHull")
-                            if own_convex_hull and other_convex_hull:
-                                overlap = own_convex_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_convex_hull)
-                                if overlap:  # Moving ensured that overlap was still there. Try anew!
-                                    temp_move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                                       z = move_vector.z + overlap[1] * self._move_factor)
-
-                                    # if the distance between two models less than 2mm then try to find a new factor
-                                    if abs(temp_move_vector.x - overlap[0]) < self._minimum_gap and abs(temp_move_vector.y - overlap[1]) < self._minimum_gap:
-                                        temp_x_factor = (abs(overlap[0]) + self._minimum_gap) / overlap[0] if overlap[0] != 0 else 0 # find x move_factor, like (3.4 + 2) / 3.4 = 1.58
-                                        temp_y_factor = (abs(overlap[1]) + self._minimum_gap) / overlap[1] if overlap[1] != 0 else 0 # find y move_factor
-
-                                        temp_scale_factor = temp_x_factor if abs(temp_x_factor) > abs(temp_y_factor) else temp_y_factor
-
-                                        move_vector = move_vector.set(x = move_vector.x + overlap[0] * temp_scale_factor,
-                                                                      z = move_vector.z + overlap[1] * temp_scale_factor)
-                                    else:
-                                        move_vector = temp_move_vector
-                            else:
-                                # This can happen in some cases if the object is not yet done with being loaded.
-                                # Simply waiting for the next tick seems to resolve this correctly.
-                                overlap = None
+                                own_convex_hull = node.callDecoration("getConvexHull")
+                                other_convex_hull = other_node.callDecoration("getConvexHull")
+                                if own_convex_hull and other_convex_hull:
+                                    overlap = own_convex_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_convex_hull)
+                                    if overlap:  # Moving ensured that overlap was still there. Try anew!
+                                        temp_move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                                           z = move_vector.z + overlap[1] * self._move_factor)
+
+                                        # if the distance between two models less than 2mm then try to find a new factor
+                                        if abs(temp_move_vector.x - overlap[0]) < self._minimum_gap and abs(temp_move_vector.y - overlap[1]) < self._minimum_gap:
+                                            temp_x_factor = (abs(overlap[0]) + self._minimum_gap) / overlap[0] if overlap[0] != 0 else 0 # find x move_factor, like (3.4 + 2) / 3.4 = 1.58
+                                            temp_y_factor = (abs(overlap[1]) + self._minimum_gap) / overlap[1] if overlap[1] != 0 else 0 # find y move_factor
+
+                                            temp_scale_factor = temp_x_factor if abs(temp_x_factor) > abs(temp_y_factor) else temp_y_factor
+
+                                            move_vector = move_vector.set(x = move_vector.x + overlap[0] * temp_scale_factor,
+                                                                          z = move_vector.z + overlap[1] * temp_scale_factor)
+                                        else:
+                                            move_vector = temp_move_vector
+                                else:
+                                    # This can happen in some cases if the object is not yet done with being loaded.
+                                    # Simply waiting for the next tick seems to resolve this correctly.
+                                    overlap = None
 
             if not Vector.Null.equals(move_vector, epsilon = 1e-5):
-                transformed_nodes.append(node)
+                transformed_nodes.add(node)
                 op = PlatformPhysicsOperation.PlatformPhysicsOperation(node, move_vector)
                 op.push()
 
@@ -178,6 +182,43 @@ class PlatformPhysics:
         # After moving, we have to evaluate the boundary checks for nodes
         build_volume.updateNodeBoundaryCheck()
 
+    @staticmethod
+    def _buildConvexHullGrids(root, nodes):
+        """The nodes that other nodes can be pushed away from, in a grid per build plate."""
+
+        grid_nodes = {}
+        grid_bounds = {}
+        for node in nodes:
+            # Ignore root and anything that is not a normal SceneNode.
+            if node is root or not issubclass(type(node), SceneNode):
+                continue
+
+            # Ignore collisions within a group
+            if node.getParent() and node.getParent().callDecoration("isGroup") is not None:
+                continue
+
+            # Ignore nodes that do not have the right properties set.
+            convex_hull = node.callDecoration("getConvexHull")
+            if not convex_hull or not node.getBoundingBox() or node.callDecoration("isNonPrintingMesh"):
+                continue
+
+            bounds = getPolygonBounds(convex_hull, node.callDecoration("getConvexHullHead"))
+            if bounds is None:
+                continue
+            build_plate_number = node.callDecoration("getBuildPlateNumber")
+            grid_nodes.setdefault(build_plate_number, []).append(node)
+            grid_bounds.setdefault(build_plate_number, []).append(bounds)
+        return {build_plate_number: ConvexHullGrid(grid_nodes[build_plate_number], grid_bounds[build_plate_number]) for build_plate_number in grid_nodes}
+
+    @staticmethod
+    def _isAncestor(ancestor, node):
+        parent = node.getParent()
+        while parent is not None:
+            if parent is ancestor:
+                return True
+            parent = parent.getParent()
+        return False
+
     def _onToolOperationStarted(self, tool):
         self._enabled = False
 
@@ -0,0 +1,174 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+import numpy
+
+from UM.Logger import Logger
+from UM.Math.Matrix import Matrix
+from UM.Math.Polygon import Polygon
+
+if TYPE_CHECKING:
+    from UM.Mesh.MeshData import MeshData
+
+
+def computeConvexHull2D(mesh: "MeshData", rotation_scale: Matrix) -> Polygon:
+    """The convex hull of a mesh seen from above, after rotating and scaling it, without offsets."""
+
+    vertex_data = mesh.getConvexHullTransformedVertices(rotation_scale)
+    # Don't use data below 0.
+    # TODO; We need a better check for this as this gives poor results for meshes with long edges.
+    # Do not throw away vertices: the convex hull may be too small and objects can collide.
+    # vertex_data = vertex_data[vertex_data[:,1] >= -0.01]
+
+    if vertex_data is None or len(vertex_data) < 4:  # type: ignore # mypy and numpy don't play along well just yet.
+        return Polygon([])
+
+    # Round the vertex data to 1/10th of a mm, then remove all duplicate vertices
+    # This is done to greatly speed up further convex hull calculations as the convex hull
+    # becomes much less complex when dealing with highly detailed models.
+    vertex_data = numpy.round(vertex_data, 1)
+
+    vertex_data = vertex_data[:, [0, 2]]  # Drop the Y components to project to 2D.
+
+    # Grab the set of unique points.
+    #
+    # This basically finds the unique rows in the array by treating them as opaque groups of bytes
+    # which are as long as the 2 float64s in each row, and giving this view to numpy.unique() to munch.
+    # See http://stackoverflow.com/questions/16970982/find-unique-rows-in-numpy-array
+    vertex_byte_view = numpy.ascontiguousarray(vertex_data).view(
+        numpy.dtype((numpy.void, vertex_data.dtype.itemsize * vertex_data.shape[1])))
+    _, idx = numpy.unique(vertex_byte_view, return_index = True)
+    vertex_data = vertex_data[idx]  # Select the unique rows by index.
+
+    if len(vertex_data) < 3:
+        return Polygon([])
+    return Polygon(vertex_data).getConvexHull()
+
+
+class ConvexHullCache:
+    """The 2D convex hulls of the meshes, per mesh data and rotation and scale, shared by all scene nodes.
+
+    Moving a node only moves its hull, so the hull is computed without the translation of the node and moved
+    afterwards. The copies made by "Multiply selected" share their mesh data and usually their rotation and scale, so
+    the hull is computed once for all of them. The cache does not keep the mesh data alive.
+
+    Hulls can be computed ahead in a background thread with ``prefetch``. Asking for a hull that is being computed
+    waits for it, instead of computing it again.
+
+    :param capacity: The number of hulls to keep.
+    :param background: Whether ``prefetch`` computes hulls in a background thread. If not, it does nothing.
+    """
+
+    __instance = None  # type: Optional[ConvexHullCache]
+
+    def __init__(self, capacity: int = 256, background: bool = True) -> None:
+        self._capacity = capacity
+        self._background = background
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        # (id of the mesh data, rotation and scale) -> (reference to the mesh data, the hull when it's computed)
+        self._entries = OrderedDict()  # type: OrderedDict[Tuple[int, bytes], Tuple[weakref.ref, Future]]
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def getInstance(cls) -> "ConvexHullCache":
+        if cls.__instance is None:
+            cls.__instance = ConvexHullCache()
+        return cls.__instance
+
+    def getHull(self, mesh: "MeshData", world_transform: Matrix) -> Polygon:
+        """The convex hull of a mesh seen from above, in the world, without offsets."""
+
+        rotation_scale, key = self._getRotationScale(mesh, world_transform)
+        with self._lock:
+            future = self._find(mesh, key)
+            if future is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+                pending = self._add(mesh, key)
+        if future is not None:
+            hull = future.result()  # Waits if it's computed in the background.
+        else:
+            hull = self._compute(pending, mesh, key, rotation_scale)
+
+        translation = world_transform.getData()[[0, 2], 3]
+        if len(hull.getPoints()) == 0:
+            return hull
+        return hull.translate(float(translation[0]), float(translation[1]))
+
+    def prefetch(self, mesh: "MeshData", world_transform: Matrix) -> None:
+        """Starts computing the hull of a mesh in the background, if it's not in the cache."""
+
+        if not self._background:
+            return
+        rotation_scale, key = self._getRotationScale(mesh, world_transform)
+        with self._lock:
+            if self._find(mesh, key) is not None:
+                return
+            future = self._add(mesh, key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "ConvexHullCache")
+        self._executor.submit(self._computeInBackground, future, mesh, key, rotation_scale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def getStatistics(self) -> Dict[str, int]:
+        """The number of hulls that were found and not found in the cache, and the number of hulls it holds."""
+
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": len(self._entries)}
+
+    def _compute(self, future: Future, mesh: "MeshData", key: Tuple[int, bytes], rotation_scale: Matrix) -> Polygon:
+        try:
+            hull = computeConvexHull2D(mesh, rotation_scale)
+        except Exception as e:
+            self._remove(key, future)
+            future.set_exception(e)
+            raise
+        future.set_result(hull)
+        return hull
+
+    def _computeInBackground(self, future: Future, mesh: "MeshData", key: Tuple[int, bytes], rotation_scale: Matrix) -> None:
+        try:
+            self._compute(future, mesh, key, rotation_scale)
+        except Exception:  # Nothing would report the exceptions of the background thread.
+            Logger.logException("w", "Unable to compute the convex hull of %s", mesh)
+
+    def _find(self, mesh: "MeshData", key: Tuple[int, bytes]) -> Optional[Future]:
+        entry = self._entries.get(key)
+        # Another mesh data can get the id of one that was removed.
+        if entry is None or entry[0]() is not mesh:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _add(self, mesh: "MeshData", key: Tuple[int, bytes]) -> Future:
+        future = Future()  # type: Future
+        self._entries[key] = (weakref.ref(mesh), future)
+        if len(self._entries) > self._capacity:
+            self._entries = OrderedDict((other_key, entry) for other_key, entry in self._entries.items() if entry[0]() is not None)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last = False)
+        return future
+
+    def _remove(self, key: Tuple[int, bytes], future: Future) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is future:
+                del self._entries[key]
+
+    @staticmethod
+    def _getRotationScale(mesh: "MeshData", world_transform: Matrix) -> Tuple[Matrix, Tuple[int, bytes]]:
+        data = numpy.array(world_transform.getData(), dtype = numpy.float64)
+        data[:3, 3] = 0
+        return Matrix(data), (id(mesh), data[:3, :3].tobytes())
@@ -10,6 +10,7 @@ from UM.Settings.ContainerRegistry import ContainerRegistry
 
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.Scene import ConvexHullNode
+from cura.Scene.ConvexHullCache import ConvexHullCache
 
 import numpy
 
@@ -74,6 +75,11 @@ class ConvexHullDecorator(SceneNodeDecorator):
 
         node.boundingBoxChanged.connect(self._onChanged)
 
+        mesh = node.getMeshData()
+        if mesh is not None and not node.callDecoration("isGroup"):
+            # Start computing the hull, so it's ready when the hull is recomputed.
+            ConvexHullCache.getInstance().prefetch(mesh, node.getWorldTransformation(copy = False))
+
         per_object_stack = node.callDecoration("getStack")
         if per_object_stack:
             per_object_stack.propertyChanged.connect(self._onSettingValueChanged)
@@ -259,7 +265,6 @@ class ConvexHullDecorator(SceneNodeDecorator):
             return offset_hull
 
         else:
-            convex_hull = Polygon([])
             offset_hull = Polygon([])
             mesh = self._node.getMeshData()
             if mesh is None:
@@ -271,35 +276,10 @@ class ConvexHullDecorator(SceneNodeDecorator):
             if mesh is self._2d_convex_hull_mesh and world_transform == self._2d_convex_hull_mesh_world_transform:
                 return self._offsetHull(self._2d_convex_hull_mesh_result)
 
-            vertex_data = mesh.getConvexHullTransformedVertices(world_transform)
-            # Don't use data below 0.
-            # TODO; We need a better check for this as this gives poor results for meshes with long edges.
-            # Do not throw away vertices: the convex hull may be too small and objects can collide.
-            # vertex_data = vertex_data[vertex_data[:,1] >= -0.01]
-
-            if vertex_data is not None and len(vertex_data) >= 4:  # type: ignore # mypy and numpy don't play along well just yet.
-                # Round the vertex data to 1/10th of a mm, then remove all duplicate vertices
-                # This is done to greatly speed up further convex hull calculations as the convex hull
-                # becomes much less complex when dealing with highly detailed models.
-                vertex_data = numpy.round(vertex_data, 1)
-
-                vertex_data = vertex_data[:, [0, 2]]  # Drop the Y components to project to 2D.
-
-                # Grab the set of unique points.
-                #
-                # This basically finds the unique rows in the array by treating them as opaque groups of bytes
-                # which are as long as the 2 float64s in each row, and giving this view to numpy.unique() to munch.
-                # See http://stackoverflow.com/questions/16970982/find-unique-rows-in-numpy-array
-                vertex_byte_view = numpy.ascontiguousarray(vertex_data).view(
-                    numpy.dtype((numpy.void, vertex_data.dtype.itemsize * vertex_data.shape[1])))
-                _, idx = numpy.unique(vertex_byte_view, return_index = True)
-                vertex_data = vertex_data[idx]  # Select the unique rows by index.
-
-                hull = Polygon(vertex_data)
-
-                if len(vertex_data) >= 3:
-                    convex_hull = hull.getConvexHull()
-                    offset_hull = self._offsetHull(convex_hull)
+            # Copies of the node share its mesh data, so their hull is only computed once.
+            convex_hull = ConvexHullCache.getInstance().getHull(mesh, world_transform)
+            if len(convex_hull.getPoints()) > 0:
+                offset_hull = self._offsetHull(convex_hull)
 
             # Store the result in the cache
             self._2d_convex_hull_mesh = mesh
@@ -0,0 +1,91 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy
+
+if TYPE_CHECKING:
+    from UM.Math.Polygon import Polygon
+
+# The smallest and largest x and y of a rectangle.
+Bounds = Tuple[float, float, float, float]
+
+
+def getPolygonBounds(*polygons: Optional["Polygon"]) -> Optional[Bounds]:
+    """The rectangle around the polygons that are not None or empty, or None if there are none."""
+
+    points = [polygon.getPoints() for polygon in polygons if polygon is not None]
+    points = [polygon_points for polygon_points in points if polygon_points is not None and len(polygon_points) > 0]
+    if not points:
+        return None
+    all_points = numpy.concatenate(points)
+    minimum = all_points.min(axis = 0)
+    maximum = all_points.max(axis = 0)
+    return float(minimum[0]), float(minimum[1]), float(maximum[0]), float(maximum[1])
+
+
+class ConvexHullGrid:
+    """A uniform grid of the rectangles around the convex hulls of the nodes, to find the nodes that can overlap an area.
+
+    Every item is put in the cells its rectangle touches. A query collects the items of the cells of the queried
+    rectangle and tests their rectangles against it at once, so only those items need the exact polygon test. Items
+    whose rectangle would take too many cells are tested for every query.
+
+    :param items: The items, for instance scene nodes.
+    :param bounds: The rectangle around every item.
+    :param cell_size: The width of the cells. By default the median size of the rectangles.
+    """
+
+    _max_cells_per_item = 256
+
+    def __init__(self, items: Sequence[Any], bounds: Sequence[Bounds], cell_size: Optional[float] = None) -> None:
+        self._items = list(items)
+        self._bounds = numpy.array(bounds, dtype = numpy.float64).reshape((-1, 4))
+        if cell_size is None:
+            sizes = numpy.maximum(self._bounds[:, 2] - self._bounds[:, 0], self._bounds[:, 3] - self._bounds[:, 1])
+            cell_size = float(numpy.median(sizes)) if len(sizes) > 0 else 1.0
+        self._cell_size = max(cell_size, 1.0)
+
+        self._cells = {}  # type: Dict[Tuple[int, int], List[int]]
+        self._oversized = []  # type: List[int]
+        for index, item_bounds in enumerate(self._bounds):
+            min_column, min_row, max_column, max_row = self._getCellRange(item_bounds)
+            if (max_column - min_column + 1) * (max_row - min_row + 1) > self._max_cells_per_item:
+                self._oversized.append(index)
+                continue
+            for column in range(min_column, max_column + 1):
+                for row in range(min_row, max_row + 1):
+                    self._cells.setdefault((column, row), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def query(self, bounds: Bounds) -> List[Any]:
+        """The items whose rectangle overlaps or touches the rectangle, in the order they were given."""
+
+        if not self._items:
+            return []
+        min_column, min_row, max_column, max_row = self._getCellRange(bounds)
+        candidates = set(self._oversized)
+        if (max_column - min_column + 1) * (max_row - min_row + 1) > len(self._cells):
+            for (column, row), indices in self._cells.items():
+                if min_column <= column <= max_column and min_row <= row <= max_row:
+                    candidates.update(indices)
+        else:
+            for column in range(min_column, max_column + 1):
+                for row in range(min_row, max_row + 1):
+                    candidates.update(self._cells.get((column, row), ()))
+        if not candidates:
+            return []
+
+        indices = numpy.fromiter(sorted(candidates), dtype = numpy.int64, count = len(candidates))
+        candidate_bounds = self._bounds[indices]
+        overlaps = (candidate_bounds[:, 0] <= bounds[2]) & (candidate_bounds[:, 2] >= bounds[0]) & \
+                   (candidate_bounds[:, 1] <= bounds[3]) & (candidate_bounds[:, 3] >= bounds[1])
+        return [self._items[index] for index in indices[overlaps]]
+
+    def _getCellRange(self, bounds: Sequence[float]) -> Tuple[int, int, int, int]:
+        return (math.floor(bounds[0] / self._cell_size), math.floor(bounds[1] / self._cell_size),
+                math.floor(bounds[2] / self._cell_size), math.floor(bounds[3] / self._cell_size))
@@ -153,10 +153,10 @@ def setParentOperationUndo(set_parent, parent, old_parent, node, scene_root) ->
     if print_mode_enabled and is_duplicated_node :
         _fixAndSetParent(set_parent, old_parent, scene_root)
         if type(parent) == DuplicatedNode:
-            if parent in PrintModeManager.getInstance().getDuplicatedNodes():
+            if PrintModeManager.getInstance().hasDuplicatedNode(parent):
                 PrintModeManager.getInstance().deleteDuplicatedNode(parent, False)
             elif type(old_parent) == DuplicatedNode:
-                if old_parent not in PrintModeManager.getInstance().getDuplicatedNodes():
+                if not PrintModeManager.getInstance().hasDuplicatedNode(old_parent):
                     PrintModeManager.getInstance().addDuplicatedNode(old_parent)
     else:
         set_parent(old_parent)
@@ -169,10 +169,10 @@ def setParentOperationRedo(set_parent, parent, old_parent, node, scene_root) ->
     if print_mode_enabled and is_duplicated_node:
         _fixAndSetParent(set_parent, parent, scene_root)
         if type(parent) == DuplicatedNode:
-            if parent not in PrintModeManager.getInstance().getDuplicatedNodes():
+            if not PrintModeManager.getInstance().hasDuplicatedNode(parent):
                 PrintModeManager.getInstance().addDuplicatedNode(parent)
         elif type(old_parent) == DuplicatedNode:
-            if old_parent in PrintModeManager.getInstance().getDuplicatedNodes():
+            if PrintModeManager.getInstance().hasDuplicatedNode(old_parent):
                 PrintModeManager.getInstance().deleteDuplicatedNode( old_parent, False)
     else:
         set_parent(parent)
@@ -0,0 +1,64 @@
+import threading
+from typing import Dict, Optional
+
+from UM.Logger import Logger
+
+
+class PostSliceBarrier:
+    """Lets writers wait for the post-slice processing of the G-code of a build plate.
+
+    The BCN3DPostSlicing plugin fixes the G-code of every build plate in a separate job when a write starts. Those jobs
+    run on the job queue, so a writer that reads ``scene.gcode_dict`` right after ``writeStarted`` could otherwise see
+    half processed G-code. The plugin calls ``start`` before queueing the job of a build plate and the job calls
+    ``finish`` when it is done; writers call ``wait`` before reading the G-code.
+    """
+
+    def __init__(self) -> None:
+        if PostSliceBarrier._instance is not None:
+            raise ValueError("Duplicate singleton creation")
+
+        PostSliceBarrier._instance = self
+        self._lock = threading.Lock()
+        self._pending = {}  # type: Dict[int, threading.Event]
+
+    def start(self, build_plate: int) -> None:
+        with self._lock:
+            event = self._pending.get(build_plate)
+            if event is None or event.is_set():
+                self._pending[build_plate] = threading.Event()
+
+    def finish(self, build_plate: int) -> None:
+        with self._lock:
+            event = self._pending.pop(build_plate, None)
+        if event is not None:
+            event.set()
+
+    def isPending(self, build_plate: int) -> bool:
+        with self._lock:
+            return build_plate in self._pending
+
+    def wait(self, build_plate: Optional[int] = None, timeout: Optional[float] = 60) -> bool:
+        """Blocks until the post-slice processing of ``build_plate`` (or of all build plates) is done.
+
+        :return: False if the processing did not finish within ``timeout`` seconds.
+        """
+        with self._lock:
+            if build_plate is None:
+                events = list(self._pending.values())
+            else:
+                events = [self._pending[build_plate]] if build_plate in self._pending else []
+        for event in events:
+            if not event.wait(timeout):
+                Logger.log("w", "Post-slice processing did not finish within %s seconds", timeout)
+                return False
+        return True
+
+    @classmethod
+    def getInstance(cls) -> "PostSliceBarrier":
+        # Note: Explicit use of class name to prevent issues with inheritance.
+        if not PostSliceBarrier._instance:
+            PostSliceBarrier._instance = cls()
+
+        return PostSliceBarrier._instance
+
+    _instance = None
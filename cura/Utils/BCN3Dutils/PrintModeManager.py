@@ -1,13 +1,20 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
 from UM.Application import Application
 
-from UM.Signal import Signal
+from UM.Signal import Signal, postponeSignals, CompressTechnique
 from UM.Operations.AddSceneNodeOperation import AddSceneNodeOperation
+from UM.Operations.GroupedOperation import GroupedOperation
 from UM.Operations.RemoveSceneNodeOperation import RemoveSceneNodeOperation
+from UM.Operations.SetTransformOperation import SetTransformOperation
 from UM.Math.Vector import Vector
 from UM.Message import Message
 import cura.CuraApplication
 from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Utils.BCN3Dutils.Scene.DuplicatedNode import DuplicatedNode
+from cura.Utils.BCN3Dutils.Scene.DuplicatedNodeRegistry import DuplicatedNodeRegistry
 from cura.Settings.ExtruderManager import ExtruderManager
 from UM.Scene.Selection import Selection
 from UM.Logger import Logger
@@ -21,7 +28,7 @@ class PrintModeManager:
             raise ValueError("Duplicate singleton creation")
 
         PrintModeManager._instance = self
-        self._duplicated_nodes = []
+        self._duplicated_nodes = DuplicatedNodeRegistry()
         self._scene = Application.getInstance().getController().getScene()
         application = cura.CuraApplication.CuraApplication.getInstance()
         self._global_stack = application.getGlobalContainerStack()
@@ -30,6 +37,7 @@ class PrintModeManager:
         self.openedFromMFReader : bool = False
         self.savedMode : str = "singleT0"
         self._loading_message : Message = None
+        self._switch_times = deque(maxlen = 20)
 
         if self._global_stack is not None:
             self._global_stack.setProperty("print_mode", "value", "singleT0")
@@ -92,30 +100,29 @@ class PrintModeManager:
     def addDuplicatedNode(self, node) -> None:
         node.callDecoration("setBuildPlateNumber", 0)
         if node not in self._duplicated_nodes:
-            self._duplicated_nodes.append(node)
+            self._duplicated_nodes.add(node)
         for child in node.getChildren():
             if isinstance(child, CuraSceneNode):
                 self.addDuplicatedNode(child)
 
     def deleteDuplicatedNodes(self) -> None:
-        del self._duplicated_nodes[:]
+        self._duplicated_nodes.clear()
 
     def deleteDuplicatedNode(self, node, delete_children = True) -> None:
-        if node in self._duplicated_nodes:
-            self._duplicated_nodes.remove(node)
+        self._duplicated_nodes.remove(node)
         if delete_children:
             for child in node.getChildren():
                 if isinstance(child, CuraSceneNode):
                     self.deleteDuplicatedNode(child)
 
     def getDuplicatedNode(self, node):
-        for node_dup in self._duplicated_nodes:
-            if node_dup.node == node:
-                return node_dup
-        return None
+        return self._duplicated_nodes.get(node)
+
+    def hasDuplicatedNode(self, node_dup) -> bool:
+        return node_dup in self._duplicated_nodes
 
     def getDuplicatedNodes(self):
-        return self._duplicated_nodes
+        return self._duplicated_nodes.toList()
 
     def renderDuplicatedNode(self, node) -> None:
         node.callDecoration("setBuildPlateNumber", 0)
@@ -161,54 +168,82 @@ class PrintModeManager:
         if key == "print_mode" and property_name == "value":
             self.printModeChanged.emit()
 
+    @contextmanager
+    def printModeTransition(self, from_mode: str, to_mode: str):
+        """Batches the scene changes of a print mode switch.
+
+        Inside the block the scene emits sceneChanged at most once, when the block ends, and DuplicatedNodes follow
+        their source only once, instead of after every translation. The time the switch took is logged and kept, see
+        getPrintModeSwitchTimes.
+        """
+        start = time.monotonic()
+        with postponeSignals(self._scene.sceneChanged, compress = CompressTechnique.CompressSingle):
+            DuplicatedNode.suspendUpdates()
+            try:
+                yield
+            finally:
+                DuplicatedNode.resumeUpdates()
+        duration = time.monotonic() - start
+        self._switch_times.append((from_mode, to_mode, duration))
+        Logger.log("d", "Print mode switch from %s to %s took %.0f ms", from_mode, to_mode, duration * 1000)
+
+    def getPrintModeSwitchTimes(self):
+        """(from mode, to mode, seconds) of the last print mode switches, oldest first."""
+        return list(self._switch_times)
+
     # Add/remove duplicated node
     def _onPrintModeChanged(self) -> None:
         if self._global_stack:
             print_mode = self._global_stack.getProperty("print_mode", "value")
             Logger.info("Print mode has changed from %s to %s" % (self._last_mode, print_mode)) 
-            nodes = self._scene.getRoot().getChildren()
-            # ::::: TO SINGLE/DUAL :::::
-            if print_mode in ["singleT0", "singleT1", "dual"] and self._last_mode in ["mirror", "duplication"]:
-                if self._mesh_on_buildplate(nodes):
-                    #remove duplicate nodes
-                    self.removeDuplicatedNodes()
-                    Logger.info("Moving nodes to the right")  
-                    self._moveNodes(nodes, 1)
-            
-            # ::::: TO IDEX :::::
-            if print_mode in ["mirror", "duplication"]:
-                #Set active extruder for diasable bed area
-                for node in nodes:
-                    self._setActiveExtruder(node)
-                    if self._last_mode in ["singleT0", "singleT1", "dual"] and type(node) == CuraSceneNode:
-                        self.addDuplicatedNode(DuplicatedNode(node, node.getParent()))
-                if self._last_mode in ["singleT0", "singleT1", "dual"]:
-                    Logger.info("Moving nodes to the left")
-                    self._moveNodes(nodes, -1)
+            with self.printModeTransition(self._last_mode, print_mode):
+                self._applyPrintMode(print_mode)
 
             # Set last print mode
             self._last_mode = print_mode
 
+    def _applyPrintMode(self, print_mode: str) -> None:
+        nodes = self._scene.getRoot().getChildren()
+        # ::::: TO SINGLE/DUAL :::::
+        if print_mode in ["singleT0", "singleT1", "dual"] and self._last_mode in ["mirror", "duplication"]:
+            if self._mesh_on_buildplate(nodes):
+                #remove duplicate nodes
+                self.removeDuplicatedNodes()
+                Logger.info("Moving nodes to the right")  
+                self._moveNodes(nodes, 1)
+        
+        # ::::: TO IDEX :::::
+        if print_mode in ["mirror", "duplication"]:
+            #Set active extruder for diasable bed area
+            for node in nodes:
+                self._setActiveExtruder(node)
+                if self._last_mode in ["singleT0", "singleT1", "dual"] and type(node) == CuraSceneNode:
+                    self.addDuplicatedNode(DuplicatedNode(node, node.getParent()))
+            if self._last_mode in ["singleT0", "singleT1", "dual"]:
+                Logger.info("Moving nodes to the left")
+                self._moveNodes(nodes, -1)
+
     def _moveNodes(self, nodes, direcction) -> None:
         #If a file is opened from MFReader, the nodes are already moved
         if self.openedFromMFReader:
             Logger.info("File opened from MFReader, not need to move nodes")
             self.openedFromMFReader = False
         else:
-            nodesMoved = 0
             machine_width = self._global_stack.getProperty("machine_width", "value")
-            offset = machine_width/4 * direcction
-            for node in nodes:
-                if self._is_node_a_mesh(node):
-                    position = node.getPosition()
-                    node.setPosition(Vector(position.x + offset, position.y, position.z))
-                    nodesMoved += 1
-                    for child in node.getChildren():
-                        nodesMoved += 1
-                        # Looks like al childrens are moved with it parents, no need to move them, we leave the code for if this behavior is changed in the future 
-                        if isinstance(child, CuraSceneNode):
-                            self._moveNodes([child], direcction)
+            op = GroupedOperation()
+            nodesMoved = self._addMoveOperations(op, nodes, machine_width/4 * direcction)
+            op.redo()
             Logger.info("Nodes moved: %s" % nodesMoved)
+
+    def _addMoveOperations(self, op, nodes, offset) -> int:
+        nodesMoved = 0
+        for node in nodes:
+            if self._is_node_a_mesh(node):
+                # SetTransformOperation translates in world space. The children of a group move with it.
+                position = node.getWorldPosition()
+                op.addOperation(SetTransformOperation(node, translation = Vector(position.x + offset, position.y, position.z)))
+                nodesMoved += 1
+        return nodesMoved
         
 
     # Check if there is a mesh (3D object) in the buildplate
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from UM.Math.Polygon import Polygon
+
+from cura.Scene.ConvexHullDecorator import ConvexHullDecorator
+from cura.Utils.BCN3Dutils.Scene.DuplicatedTransform import transformPoints2D
+
+
+class DuplicatedConvexHullDecorator(ConvexHullDecorator):
+    """Convex hull of a DuplicatedNode, derived from the convex hull of the node it duplicates.
+
+    The hull of the source is mirrored and/or moved with the transformation between the source and the duplicate
+    instead of being computed again from all the vertices of the (shared) mesh. Settings that offset the hull are
+    still applied by the base class, so adhesion and head margins behave like for any other node.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._shared_source_hull = None  # type: Optional[Polygon]
+        self._shared_relative_key = None  # type: Optional[bytes]
+        self._shared_hull = None  # type: Optional[Polygon]
+
+    def __deepcopy__(self, memo):
+        return DuplicatedConvexHullDecorator()
+
+    def _init2DConvexHullCache(self) -> None:
+        super()._init2DConvexHullCache()
+        self._shared_source_hull = None
+        self._shared_relative_key = None
+        self._shared_hull = None
+
+    def _compute2DConvexHull(self) -> Optional[Polygon]:
+        if self._node is None or self._node.callDecoration("isGroup"):
+            return super()._compute2DConvexHull()
+
+        source = getattr(self._node, "node", None)
+        source_decorator = source.getDecorator(ConvexHullDecorator) if source is not None else None
+        relative = self._node.getRelativeTransform() if source_decorator is not None else None
+        mesh = self._node.getMeshData()
+        if relative is None or mesh is None or source.getMeshData() is not mesh:
+            return super()._compute2DConvexHull()
+
+        source_decorator._compute2DConvexHull()  # Makes sure the unoffset hull of the source is cached.
+        source_hull = source_decorator._2d_convex_hull_mesh_result
+        if source_hull is None:
+            return super()._compute2DConvexHull()
+
+        relative_key = relative.tobytes()
+        if source_hull is not self._shared_source_hull or relative_key != self._shared_relative_key:
+            points = source_hull.getPoints()
+            self._shared_hull = Polygon(transformPoints2D(points, relative)) if len(points) else Polygon([])
+            self._shared_source_hull = source_hull
+            self._shared_relative_key = relative_key
+        return self._offsetHull(self._shared_hull)
@@ -1,4 +1,5 @@
 
+from UM.Math.AxisAlignedBox import AxisAlignedBox
 from UM.Math.Vector import Vector
 from UM.Operations.MirrorOperation import MirrorOperation
 from UM.Application import Application
@@ -6,18 +7,31 @@ from UM.Logger import Logger
 
 from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Scene.BuildPlateDecorator import BuildPlateDecorator
-from cura.Settings.ExtruderManager import ExtruderManager
-from cura.Settings.SetObjectExtruderOperation import SetObjectExtruderOperation
+from cura.Scene.ConvexHullDecorator import ConvexHullDecorator
+from cura.Settings.SettingOverrideDecorator import SettingOverrideDecorator
 from cura.Scene.SliceableObjectDecorator import SliceableObjectDecorator
+from cura.Utils.BCN3Dutils.Scene.DuplicatedConvexHullDecorator import DuplicatedConvexHullDecorator
+from cura.Utils.BCN3Dutils.Scene.DuplicatedSettingsDecorator import DuplicatedSettingsDecorator
+from cura.Utils.BCN3Dutils.Scene.DuplicatedTransform import getRelativeTransform, isAxisAligned, transformBox
 
 
 from copy import deepcopy
+from typing import Dict, Tuple
 
 class DuplicatedNode(CuraSceneNode):
+    """Shadow of a node that is printed a second time by the other extruder in mirror and duplication mode.
+
+    The duplicate shares the mesh data and the per-object settings of its source. Its convex hull and bounding box
+    are derived from the ones of the source through the transformation between both, and only when they are needed.
+    """
 
     def __init__(self, node, parent = None):
         super().__init__(parent)
         self.node = node
+        self._relative_transform_key = None
+        self._relative_transform = None
+        self._update_key = None
+        self._update_transformation = None
         self.setTransformation(node.getLocalTransformation())
         self.setMeshData(node.getMeshData())
         self.setVisible(deepcopy(node.isVisible()))
@@ -27,9 +41,15 @@ class DuplicatedNode(CuraSceneNode):
         build_plate_decorator = node.getDecorator(BuildPlateDecorator)
         if build_plate_decorator is not None:
             self.addDecorator(deepcopy(build_plate_decorator))
+        # Added before the convex hull decorator, which looks the per-object stack up when it is added.
+        self.addDecorator(DuplicatedSettingsDecorator(node))
         for decorator in node.getDecorators():
             if type (decorator) ==  SliceableObjectDecorator:
                 Logger.log("e", "Skip SliceableObjectDecorator")
+            elif type(decorator) == SettingOverrideDecorator:
+                continue
+            elif isinstance(decorator, ConvexHullDecorator):
+                self.addDecorator(DuplicatedConvexHullDecorator())
             else:
                 self.addDecorator(deepcopy(decorator))
 
@@ -39,11 +59,36 @@ class DuplicatedNode(CuraSceneNode):
             else:
                 self.addChild(deepcopy(child))
 
-        node.calculateBoundingBoxMesh()
         self.node.transformationChanged.connect(self._onTransformationChanged)
         self.node.parentChanged.connect(self._someParentChanged)
         self.parentChanged.connect(self._someParentChanged)
-        SetObjectExtruderOperation(self, ExtruderManager.getInstance().getExtruderStack(0).getId()).redo()
+
+    def getDecorator(self, dec_type):
+        # Also match subclasses, so a DuplicatedConvexHullDecorator is found as the ConvexHullDecorator of the node
+        # and nobody adds a second one that computes the hull from the vertices again.
+        for decorator in self.getDecorators():
+            if isinstance(decorator, dec_type):
+                return decorator
+        return None
+
+    def getRelativeTransform(self):
+        """The world transformation that takes the source node to this duplicate, see getRelativeTransform."""
+        source_world = self.node.getWorldTransformation(copy = False).getData()
+        own_world = self.getWorldTransformation(copy = False).getData()
+        key = source_world.tobytes() + own_world.tobytes()
+        if key != self._relative_transform_key:
+            self._relative_transform = getRelativeTransform(source_world, own_world)
+            self._relative_transform_key = key
+        return self._relative_transform
+
+    def _calculateAABB(self) -> None:
+        relative = self.getRelativeTransform()
+        source_box = self.node.getBoundingBox() if relative is not None and isAxisAligned(relative) else None
+        if source_box is None or len(self.getChildren()) != len(self.node.getChildren()):
+            super()._calculateAABB()
+            return
+        minimum, maximum = transformBox(source_box.minimum.getData(), source_box.maximum.getData(), relative)
+        self._aabb = AxisAlignedBox(minimum = Vector(*minimum), maximum = Vector(*maximum))
 
     def setSelectable(self, select: bool):
         self._selectable = False
@@ -54,25 +99,67 @@ class DuplicatedNode(CuraSceneNode):
             return
         print_mode = Application.getInstance().getGlobalContainerStack().getProperty("print_mode", "value")
         machine_width = Application.getInstance().getGlobalContainerStack().getProperty("machine_width", "value")
-        self.setScale(self.node.getScale())
         node_pos = self.node.getPosition()
-        self.setTransformation(self.node.getLocalTransformation())
+        source_transformation = self.node.getLocalTransformation()
+        update_key = (print_mode, machine_width, id(self.getParent()), source_transformation.getData().tobytes())
 
-        if print_mode == "mirror":
-            MirrorOperation(self, Vector(-1, 1, 1)).redo()
-            self.setPosition(Vector(-node_pos.x, node_pos.y, node_pos.z))
-        elif print_mode == "duplication":
-            self.setPosition(Vector(node_pos.x + (machine_width/2), node_pos.y, node_pos.z))
-        else:
+        if print_mode not in ["mirror", "duplication"]:
+            self.setScale(self.node.getScale())
+            self.setTransformation(source_transformation)
             return
 
+        if update_key == self._update_key:
+            # Same source transformation as last time: reuse the mirrored/offset result instead of setting,
+            # mirroring and moving the node again, which recomputes the world transformation of all children 3 times.
+            if self.getLocalTransformation(copy = False) != self._update_transformation:
+                self.setTransformation(self._update_transformation)
+        else:
+            self.setScale(self.node.getScale())
+            self.setTransformation(source_transformation)
+            if print_mode == "mirror":
+                MirrorOperation(self, Vector(-1, 1, 1)).redo()
+                self.setPosition(Vector(-node_pos.x, node_pos.y, node_pos.z))
+            else:
+                self.setPosition(Vector(node_pos.x + (machine_width/2), node_pos.y, node_pos.z))
+            self._update_key = update_key
+            self._update_transformation = self.getLocalTransformation()
+
         if node_pos.x > 0:
             self.node.setPosition(Vector(0, node_pos.y, node_pos.z))
 
+    @classmethod
+    def suspendUpdates(cls) -> None:
+        """Makes DuplicatedNodes stop following their source until resumeUpdates, e.g. while all nodes are moved."""
+        cls._updates_suspended += 1
+
+    @classmethod
+    def resumeUpdates(cls) -> None:
+        """Updates every DuplicatedNode whose source changed while updates were suspended, once."""
+        cls._updates_suspended = max(0, cls._updates_suspended - 1)
+        if cls._updates_suspended == 0:
+            pending = list(cls._pending_updates.values())
+            cls._pending_updates.clear()
+            for node_dup, check_print_mode in pending:
+                node_dup._update(check_print_mode)
+
+    def _update(self, check_print_mode: bool) -> None:
+        if DuplicatedNode._updates_suspended:
+            previous = DuplicatedNode._pending_updates.get(id(self))
+            # A parent change updates in any print mode, so it wins over a transformation change.
+            if previous is None or previous[1]:
+                DuplicatedNode._pending_updates[id(self)] = (self, check_print_mode)
+            return
+        if check_print_mode:
+            print_mode = Application.getInstance().getGlobalContainerStack().getProperty("print_mode", "value")
+            if print_mode in ["singleT0", "singleT1", "dual"]:
+                return
+        self.update()
+
     def _onTransformationChanged(self, node):
-        print_mode = Application.getInstance().getGlobalContainerStack().getProperty("print_mode", "value")
-        if print_mode not in ["singleT0", "singleT1", "dual"]:
-            self.update()
+        self._update(check_print_mode = True)
 
     def _someParentChanged(self, node=None):
-        self.update()
\ No newline at end of file
+        self._update(check_print_mode = False)
+
+    _updates_suspended = 0
+    _pending_updates = {}  # type: Dict[int, Tuple[DuplicatedNode, bool]]
\ No newline at end of file
@@ -0,0 +1,50 @@
+from typing import Dict, Iterator, List, Optional
+
+
+class DuplicatedNodeRegistry:
+    """The DuplicatedNodes of the scene, indexed by the node they duplicate.
+
+    Lookups by source node, membership tests and removals are O(1), where the plain list used before made every
+    delete, group, ungroup and undo/redo hook O(n). Nodes are indexed by ``id()`` because scene nodes are not hashed
+    by value; every lookup also checks the node itself, so a reused id of a collected node never matches.
+
+    A source node has at most one DuplicatedNode: registering a new one for the same source replaces the old one,
+    which would otherwise linger in the list after switching from a single to a duplication/mirror mode and back.
+    """
+
+    def __init__(self) -> None:
+        # id(source node) -> DuplicatedNode, in registration order.
+        self._by_source = {}  # type: Dict[int, "DuplicatedNode"]
+
+    def add(self, node_dup: "DuplicatedNode") -> None:
+        key = id(node_dup.node)
+        if key in self._by_source:
+            # Keep the order of registration, like appending to the list did.
+            del self._by_source[key]
+        self._by_source[key] = node_dup
+
+    def remove(self, node_dup: "DuplicatedNode") -> None:
+        key = id(node_dup.node)
+        if self._by_source.get(key) is node_dup:
+            del self._by_source[key]
+
+    def clear(self) -> None:
+        self._by_source.clear()
+
+    def get(self, node) -> Optional["DuplicatedNode"]:
+        node_dup = self._by_source.get(id(node))
+        if node_dup is not None and node_dup.node is node:
+            return node_dup
+        return None
+
+    def __contains__(self, node_dup) -> bool:
+        return self._by_source.get(id(getattr(node_dup, "node", None))) is node_dup
+
+    def __iter__(self) -> Iterator["DuplicatedNode"]:
+        return iter(list(self._by_source.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_source)
+
+    def toList(self) -> List["DuplicatedNode"]:
+        return list(self._by_source.values())
@@ -0,0 +1,51 @@
+from UM.Scene.SceneNodeDecorator import SceneNodeDecorator
+
+
+class DuplicatedSettingsDecorator(SceneNodeDecorator):
+    """Gives a DuplicatedNode the per-object settings of the node it duplicates.
+
+    Deep copying the SettingOverrideDecorator of the source registered a new container stack for every duplicate and
+    made it go stale as soon as the user changed a per-object setting. The duplicate prints with the same settings as
+    its source, so every call is forwarded to the source instead.
+    """
+
+    def __init__(self, source) -> None:
+        super().__init__()
+        self._source = source
+
+    def __deepcopy__(self, memo):
+        return DuplicatedSettingsDecorator(self._source)
+
+    def getStack(self):
+        return self._source.callDecoration("getStack")
+
+    def getActiveExtruder(self):
+        return self._source.callDecoration("getActiveExtruder")
+
+    def getActiveExtruderPosition(self):
+        return self._source.callDecoration("getActiveExtruderPosition")
+
+    def getActiveExtruderChangedSignal(self):
+        return self._source.callDecoration("getActiveExtruderChangedSignal")
+
+    def setActiveExtruder(self, extruder_stack_id) -> None:
+        # The duplicate follows the extruder of its source.
+        pass
+
+    def isCuttingMesh(self):
+        return self._source.callDecoration("isCuttingMesh")
+
+    def isSupportMesh(self):
+        return self._source.callDecoration("isSupportMesh")
+
+    def isInfillMesh(self):
+        return self._source.callDecoration("isInfillMesh")
+
+    def isAntiOverhangMesh(self):
+        return self._source.callDecoration("isAntiOverhangMesh")
+
+    def isNonPrintingMesh(self):
+        return self._source.callDecoration("isNonPrintingMesh")
+
+    def isNonThumbnailVisibleMesh(self):
+        return self._source.callDecoration("isNonThumbnailVisibleMesh")
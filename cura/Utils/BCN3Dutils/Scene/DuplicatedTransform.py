@@ -0,0 +1,52 @@
+from typing import Optional, Tuple
+
+import numpy
+
+# Tolerance when checking that a transformation leaves the Y axis alone.
+_EPSILON = 1e-6
+
+
+def getRelativeTransform(source_world: numpy.ndarray, duplicated_world: numpy.ndarray) -> Optional[numpy.ndarray]:
+    """The transformation that takes the source node to its duplicate in world space.
+
+    The duplicate of a mirror or duplication print is its source mirrored in X and/or moved over the build plate, so
+    anything derived from the source geometry (convex hull, bounding box) can be derived for the duplicate by applying
+    this transformation instead of going through all vertices again.
+
+    :return: The 4x4 transformation, or None if it also moves things up or down (e.g. rotates around X or Z), in which
+    case the projection on the build plate can not be derived from the one of the source.
+    """
+    try:
+        relative = duplicated_world.dot(numpy.linalg.inv(source_world))
+    except numpy.linalg.LinAlgError:
+        return None
+    if abs(relative[0, 1]) > _EPSILON or abs(relative[2, 1]) > _EPSILON \
+            or abs(relative[1, 0]) > _EPSILON or abs(relative[1, 2]) > _EPSILON \
+            or abs(relative[1, 1] - 1) > _EPSILON:
+        return None
+    return relative
+
+
+def isAxisAligned(relative: numpy.ndarray) -> bool:
+    """Whether the transformation only mirrors and translates, so axis aligned boxes stay axis aligned and tight."""
+    return abs(relative[0, 2]) <= _EPSILON and abs(relative[2, 0]) <= _EPSILON \
+        and abs(abs(relative[0, 0]) - 1) <= _EPSILON and abs(abs(relative[2, 2]) - 1) <= _EPSILON
+
+
+def transformPoints2D(points: numpy.ndarray, relative: numpy.ndarray) -> numpy.ndarray:
+    """Applies the transformation to (X, Z) build plate points, like the ones of a convex hull Polygon.
+
+    The order of the points is reversed if the transformation mirrors, so a hull keeps its winding.
+    """
+    planar = relative[numpy.ix_([0, 2], [0, 2])]
+    offset = relative[[0, 2], 3]
+    result = points.dot(planar.T) + offset
+    if numpy.linalg.det(planar) < 0:
+        result = result[::-1]
+    return result
+
+
+def transformBox(minimum: numpy.ndarray, maximum: numpy.ndarray, relative: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Applies an axis aligned transformation to the (X, Y, Z) corners of a box."""
+    corners = numpy.array([minimum, maximum], dtype = numpy.float64).dot(relative[:3, :3].T) + relative[:3, 3]
+    return corners.min(axis = 0), corners.max(axis = 0)
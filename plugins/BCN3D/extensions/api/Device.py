@@ -8,6 +8,7 @@ from UM.Logger import Logger
 
 from .DataService import DataService
 from cura.PrinterOutput.NetworkedPrinterOutputDevice import NetworkedPrinterOutputDevice
+from cura.Utils.BCN3Dutils.PostSliceBarrier import PostSliceBarrier
 
 
 from UM.i18n import i18nCatalog
@@ -67,6 +68,7 @@ class Device(NetworkedPrinterOutputDevice):
 
         self.writeStarted.emit(self)
         active_build_plate = CuraApplication.getInstance().getMultiBuildPlateModel().activeBuildPlate
+        PostSliceBarrier.getInstance().wait(active_build_plate)
         self._gcode = getattr(Application.getInstance().getController().getScene(), "gcode_dict")[active_build_plate]
         gcode = self._joinGcode()
         file_name_with_extension = file_name + ".gcode"
@@ -1,5 +1,6 @@
 from typing import Any
 from PyQt6.QtCore import QObject, pyqtSlot, pyqtProperty, pyqtSignal
+from cura.CuraApplication import CuraApplication
 from cura.OAuth2.Models import UserProfile
 from UM.Message import Message
 from UM.Logger import Logger
@@ -9,8 +10,9 @@ import os
 import json
 
 from .SessionManager import SessionManager
-from .http_helper import get, post
+from .http_helper import get, post, submit, getSession, TIMEOUT
 from threading import Lock
+from types import SimpleNamespace
 
 
 class AuthApiService(QObject):
@@ -18,6 +20,7 @@ class AuthApiService(QObject):
     client_id = None
     app_secret = None
     scope = None
+    gcode_compression = None
     _session_manager = None
     grant_type = 'password'
     authStateChanged = pyqtSignal(bool, arguments=["isLoggedIn"])
@@ -50,11 +53,23 @@ class AuthApiService(QObject):
             self.client_id = apiData['client_id']
             self.app_secret = apiData['app_secret']
             self.scope = apiData['scope']
+            # Only compress uploads when the API is known to accept them, see GcodeUploadJob.
+            self.gcode_compression = apiData.get('gcode_compression')
             if not self._session_manager:
                 self._session_manager = SessionManager.getInstance()
                 self._session_manager.initialize()
-            if firstRun and self._session_manager.getAccessToken() and self.getToken():
-                self.getCurrentUser()
+            if firstRun and self._session_manager.getAccessToken():
+                # Don't keep the Qt thread waiting on the API during start up.
+                submit(self._requestCurrentUser).add_done_callback(self._onCurrentUserRequested)
+
+    def _onCurrentUserRequested(self, future):
+        # Runs on the worker thread.
+        try:
+            response = future.result()
+        except Exception:
+            Logger.logException("w", "Could not get the current user")
+            return
+        CuraApplication.getInstance().callLater(self._setCurrentUser, response)
 
     def email(self):
         return self._email
@@ -71,9 +86,17 @@ class AuthApiService(QObject):
         return self.client_id and self.api_url
 
     def getCurrentUser(self):
-        headers = {"authorization": "bearer {}".format(self.getToken()),
+        return self._setCurrentUser(self._requestCurrentUser())
+
+    def _requestCurrentUser(self):
+        token = self.getToken()
+        if not token:
+            return SimpleNamespace(status_code=0)
+        headers = {"authorization": "bearer {}".format(token),
                    'Content-Type': 'application/x-www-form-urlencoded'}
-        response = get(self.api_url + "/accounts/me", headers=headers)
+        return get(self.api_url + "/accounts/me", headers=headers)
+
+    def _setCurrentUser(self, response):
         if 200 <= response.status_code < 300:
             current_user = response.json()
             self._email = current_user["email"]
@@ -125,13 +148,14 @@ class AuthApiService(QObject):
     def refresh(self):
         Logger.log("i", "BCN3D Token expired, refreshed.")
         try:
-            response = requests.post(
+            response = getSession().post(
                 self.api_url + "/token",
                 data={
                     "client_id": self.client_id,
                     "grant_type": "refresh_token",
                     "refresh_token": self._session_manager.getRefreshToken()
-                }
+                },
+                timeout=TIMEOUT
             )
             response.raise_for_status()
             response_message = response.json()
@@ -0,0 +1,111 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtCore import QTimer
+
+from UM.Application import Application
+from UM.Logger import Logger
+from UM.Signal import Signal
+
+
+class ConnectedPrintersRegistry:
+    """Cache of the printers that are connected to the BCN3D cloud, indexed by serial number.
+
+    While the user is logged in the registry polls ``/devices/connected`` in the background every ``poll_interval``
+    seconds. Entries older than ``ttl`` seconds are considered unknown, so a send to a printer that has not been seen
+    recently still asks the API instead of trusting a stale ``ready_to_print``.
+    """
+
+    ttl_preference_key = "bcn3d_api/connected_printers_ttl"
+    default_ttl = 30  # seconds
+    default_poll_interval = 10  # seconds
+
+    printerAdded = Signal()  # (serial_number)
+    printerChanged = Signal()  # (serial_number)
+    printerRemoved = Signal()  # (serial_number)
+    printersChanged = Signal()
+
+    def __init__(self, data_api_service, poll_interval: int = default_poll_interval) -> None:
+        self._data_api_service = data_api_service
+        self._printers = {}  # type: Dict[str, Tuple[dict, float]]
+        self._fetching = False
+
+        preferences = Application.getInstance().getPreferences()
+        preferences.addPreference(self.ttl_preference_key, self.default_ttl)
+        self._ttl = float(preferences.getValue(self.ttl_preference_key))
+
+        self._poll_timer = QTimer()
+        self._poll_timer.setInterval(poll_interval * 1000)
+        self._poll_timer.timeout.connect(self.refresh)
+
+    def start(self) -> None:
+        self.refresh()
+        self._poll_timer.start()
+
+    def stop(self) -> None:
+        self._poll_timer.stop()
+        self._update({})
+
+    def setTtl(self, ttl: float) -> None:
+        self._ttl = ttl
+        Application.getInstance().getPreferences().setValue(self.ttl_preference_key, ttl)
+
+    def getPrinter(self, serial_number: str) -> Optional[dict]:
+        """The cached printer with this serial number, or None if it is unknown or its entry has expired."""
+        entry = self._printers.get(serial_number)
+        if entry is None or time.monotonic() - entry[1] > self._ttl:
+            return None
+        return entry[0]
+
+    def fetchPrinter(self, serial_number: str) -> Optional[dict]:
+        """Like getPrinter, but asks the API (blocking) when the printer is not in the cache."""
+        printer = self.getPrinter(serial_number)
+        if printer is None:
+            self._onConnectedPrintersReceived(self._data_api_service.getConnectedPrinter())
+            printer = self.getPrinter(serial_number)
+        return printer
+
+    def refresh(self) -> None:
+        """Fetches the connected printers on a worker thread. The cache is updated on the Qt thread."""
+        if self._fetching:
+            return
+        self._fetching = True
+        self._data_api_service.getConnectedPrinterAsync().add_done_callback(self._onRefreshDone)
+
+    def _onRefreshDone(self, future) -> None:
+        # Runs on the worker thread.
+        try:
+            response = future.result()
+        except Exception:
+            Logger.logException("w", "Could not get the connected printers")
+            response = {}
+        Application.getInstance().callLater(self._onConnectedPrintersReceived, response, True)
+
+    def _onConnectedPrintersReceived(self, response: dict, polled: bool = False) -> None:
+        if polled:
+            self._fetching = False
+        if not response or "data" not in response:
+            # Keep the entries we have, they expire on their own.
+            return
+        self._update({printer["serialNumber"]: printer for printer in response["data"] if "serialNumber" in printer})
+
+    def _update(self, printers: Dict[str, dict]) -> None:
+        now = time.monotonic()
+        changed = False
+        for serial_number in list(self._printers):
+            if serial_number not in printers:
+                del self._printers[serial_number]
+                self.printerRemoved.emit(serial_number)
+                changed = True
+        for serial_number, printer in printers.items():
+            previous = self._printers.get(serial_number)
+            self._printers[serial_number] = (printer, now)
+            if previous is None:
+                self.printerAdded.emit(serial_number)
+                changed = True
+            elif previous[0] != printer:
+                self.printerChanged.emit(serial_number)
+                changed = True
+        if changed:
+            Logger.log("d", "Connected BCN3D printers: %s", ", ".join(self._printers) or "none")
+            self.printersChanged.emit()
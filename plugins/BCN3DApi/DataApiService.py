@@ -1,7 +1,8 @@
 from UM.Message import Message
 
 from .AuthApiService import AuthApiService
-from .http_helper import get, post
+from .GcodeUpload import GcodeUploadJob
+from .http_helper import get, submit
 from UM.Logger import Logger
 
 
@@ -15,39 +16,32 @@ class DataApiService:
         DataApiService._instance = self
         self._auth_api_service = AuthApiService.getInstance()
 
-    def sendGcode(self, gcode, gcode_name, printerId, save = False):
-        headers = {"Authorization": "Bearer {}".format(self._auth_api_service.getToken())}
-        files = {"file": (gcode_name, gcode)}
-        if save:
-            data = {"setup": "{name : %s}" % gcode_name}
-            response = post(self._auth_api_service.api_url + "/printfiles", data, headers, files)
-            if 200 <= response.status_code < 300:
-                response_message = response.json()
-                print_file_id = response_message[0]["print_file_id"]
-                data = {"print_file_id" : print_file_id }
-                headers = {"Authorization": "Bearer {}".format(self._auth_api_service.getToken())}
-                response2 = post(self._auth_api_service.api_url + "/devices/" + printerId + "/print", data, headers)
-                if 200 <= response2.status_code < 300:
-                    message = Message("The gcode has been sent to the cloud and the printer successfully", title="Gcode sent")
-                    message.show()
-                else:
-                    message = Message("The gcode has been sent to the cloud successfully but there was an error sending the gcode to the printer", title="Gcode sent error")
-                    Logger.error("There was an error sending gcode to the printer: %s".format(response2.reason))
-                    message.show()
+    def sendGcode(self, gcode_list, gcode_name, printerId, save = False, progress_message = None, on_finished = None):
+        """Uploads the G-code on a background thread. ``on_finished`` is called with the job once it is done."""
+        job = GcodeUploadJob(self._auth_api_service.api_url, self._auth_api_service.getToken, gcode_list, gcode_name,
+                             printerId, save, self._auth_api_service.gcode_compression == "gzip", progress_message)
+        job.finished.connect(self._onSendGcodeFinished)
+        if on_finished is not None:
+            job.finished.connect(on_finished)
+        job.start()
+        return job
+
+    def _onSendGcodeFinished(self, job):
+        if job.sent_to_printer:
+            if job.sent_to_cloud:
+                message = Message("The gcode has been sent to the cloud and the printer successfully", title="Gcode sent")
             else:
-                message = Message("There was an error sending the gcode to the cloud", title="Gcode sent error")
-                reason = "No reason provided" if not hasattr(response, 'reason') else response.reason
-                Logger.error("There was an error sending gcode to cloud: %s" % reason)
-                message.show()
-        else :
-            response = post(self._auth_api_service.api_url + "/devices/" + printerId + "/print", [], headers, files)
-            if 200 <= response.status_code < 300:
                 message = Message("The gcode has been sent to the printer successfully", title="Gcode sent")
-                message.show()
-            else:
-                message = Message("There was an error sending the gcode to the printer", title="Gcode sent error")
-                message.show()
-
+        elif job.sent_to_cloud:
+            message = Message("The gcode has been sent to the cloud successfully but there was an error sending the gcode to the printer", title="Gcode sent error")
+            Logger.error("There was an error sending gcode to the printer: %s" % (job.error_reason or job.getError()))
+        elif job.savesToCloud():
+            message = Message("There was an error sending the gcode to the cloud", title="Gcode sent error")
+            Logger.error("There was an error sending gcode to cloud: %s" % (job.error_reason or job.getError()))
+        else:
+            message = Message("There was an error sending the gcode to the printer", title="Gcode sent error")
+            Logger.error("There was an error sending gcode: %s" % (job.error_reason or job.getError()))
+        message.show()
 
     def getPrinters(self):
         headers = {"authorization": "bearer {}".format(self._auth_api_service.getToken()), 'Content-Type' : 'application/x-www-form-urlencoded'}
@@ -59,6 +53,10 @@ class DataApiService:
             Logger.error("There was an error getting printers: %s" % reason)
             return []
 
+    def getPrintersAsync(self):
+        """Future that resolves to the result of getPrinters."""
+        return submit(self.getPrinters)
+
     def getConnectedPrinter(self):
         headers = {"Authorization": "Bearer {}".format(self._auth_api_service.getToken())}
         response = get(self._auth_api_service.api_url + "/devices/connected", headers=headers)
@@ -69,6 +67,10 @@ class DataApiService:
             Logger.error("There was an error getting connected printer: %s" % reason)
             return {}
 
+    def getConnectedPrinterAsync(self):
+        """Future that resolves to the result of getConnectedPrinter."""
+        return submit(self.getConnectedPrinter)
+
     @classmethod
     def getInstance(cls):
         if not DataApiService.__instance:
@@ -9,6 +9,7 @@ from UM.Logger import Logger
 from .DataApiService import DataApiService
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.PrinterOutput.NetworkedPrinterOutputDevice import NetworkedPrinterOutputDevice
+from cura.Utils.BCN3Dutils.PostSliceBarrier import PostSliceBarrier
 
 
 from UM.i18n import i18nCatalog
@@ -48,15 +49,10 @@ class Device(NetworkedPrinterOutputDevice):
             Message("The selected printer doesn't support this feature.", title="Can't send gcode to printer").show()
             return
         
-        connectedPrinters = self._data_api_service.getConnectedPrinter()
-        printer = None
-        
-        for p in connectedPrinters['data']:
-            if p['serialNumber'] == serial_number:
-                printer = p
-                print("sonia")
-                print(printer)
-                break
+        from .PrintersManager import PrintersManager
+        printers_manager = PrintersManager.getInstance()
+        # Served from the background polled cache; only asks the API when the printer wasn't seen recently.
+        printer = printers_manager.getConnectedPrinters().fetchPrinter(serial_number)
         if printer: 
             if not printer["ready_to_print"]:
                 self._progress_message.hide()
@@ -74,20 +70,8 @@ class Device(NetworkedPrinterOutputDevice):
             printMaterialWeights = printInformation.materialWeights
 
 
-            if not self.bcn3dModels : 
-                from UM.PluginRegistry import PluginRegistry  # For path plugin's directory.
-                import json
-                import os
-                pr = PluginRegistry.getInstance()
-                pluginPath = pr.getPluginPath("BCN3DApi")
-                try:
-                    with open(os.path.join(pluginPath, "bcn3d-mapped-models.json"), "r", encoding = "utf-8") as f:
-                        self.bcn3dModels = json.load(f)
-                except IOError as e:
-                    Logger.error("Could not open bcn3d-mapped-models.json for reading: %s".format(str(e)))
-                except Exception as e:
-                    Logger.error("Could not parse bcn3d-mapped-models.json: %s".format(str(e)))
-            
+            if not self.bcn3dModels:
+                self.bcn3dModels = printers_manager.getBcn3dModels()
 
             if self.bcn3dModels and ((not all(i==0 for i in printMaterialLengths)) or (not all(i==0 for i in printMaterialWeights))):
                 #We have gcode data, so we generated it, lets see if it is compatible with the printer
@@ -125,12 +109,17 @@ class Device(NetworkedPrinterOutputDevice):
         
         self.writeStarted.emit(self)
         active_build_plate = CuraApplication.getInstance().getMultiBuildPlateModel().activeBuildPlate
+        PostSliceBarrier.getInstance().wait(active_build_plate)
         self._gcode = getattr(Application.getInstance().getController().getScene(), "gcode_dict")[active_build_plate]
-        gcode = self._joinGcode()
         file_name_with_extension = file_name + ".gcode"
-        self._data_api_service.sendGcode(gcode, file_name_with_extension, printer['id'], self._name == "cloud_save")
+        self._progress_message.setProgress(0)
+        self._data_api_service.sendGcode(list(self._gcode), file_name_with_extension, printer['id'], self._name == "cloud_save",
+                                         self._progress_message, self._onSendGcodeFinished)
+
+    def _onSendGcodeFinished(self, job):
         self.writeFinished.emit()
         self._progress_message.hide()
+        self._progress_message.setProgress(-1)
   
     def get_material_id(self, printerMaterial):
         
@@ -179,12 +168,6 @@ class Device(NetworkedPrinterOutputDevice):
             return True
         return False
     
-    def _joinGcode(self):
-        gcode = ""
-        for line in self._gcode:
-            gcode += line
-        return gcode
-
     @pyqtSlot(str, result=str)
     def getProperty(self, key: str) -> str:
         return ""
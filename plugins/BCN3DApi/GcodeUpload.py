@@ -0,0 +1,181 @@
+import gzip
+import tempfile
+import time
+import uuid
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from UM.Job import Job
+from UM.Logger import Logger
+
+from .http_helper import post, postBody
+
+# Above this size the encoded G-code is spooled to a temporary file instead of being kept in memory.
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+UPLOAD_ATTEMPTS = 3
+RETRY_DELAY = 2  # seconds, doubled after every failed attempt
+
+
+def gcodeChunks(gcode_list: Iterable[str]) -> Iterator[bytes]:
+    """Encodes the layers of a G-code list one by one, without ever joining the whole file in memory."""
+    for layer in gcode_list:
+        yield layer.encode("utf-8")
+
+
+def encodeGcode(gcode_list: Iterable[str], compress: bool = False):
+    """Writes the G-code, optionally gzipped, to a spooled temporary file.
+
+    :return: The file, positioned at the start, and its size in bytes.
+    """
+    payload = tempfile.SpooledTemporaryFile(max_size = SPOOL_MAX_SIZE)
+    if compress:
+        with gzip.GzipFile(fileobj = payload, mode = "wb", compresslevel = 6) as gzip_file:
+            for chunk in gcodeChunks(gcode_list):
+                gzip_file.write(chunk)
+    else:
+        for chunk in gcodeChunks(gcode_list):
+            payload.write(chunk)
+    size = payload.tell()
+    payload.seek(0)
+    return payload, size
+
+
+class MultipartBody:
+    """A ``multipart/form-data`` request body that streams its file part from a file object.
+
+    requests sends objects with a ``read`` method and a known length in blocks instead of loading them in memory. Every
+    block that is read is reported to ``on_progress`` as a fraction of the total size. ``rewind`` makes the body
+    ready to be sent again after a dropped connection without encoding the G-code again.
+    """
+
+    def __init__(self, fields: dict, file_field: str, file_name: str, payload, payload_size: int, content_type: str,
+                 on_progress: Optional[Callable[[float], None]] = None) -> None:
+        self.boundary = uuid.uuid4().hex
+        head = b""
+        for name, value in fields.items():
+            head += ("--%s\r\nContent-Disposition: form-data; name=\"%s\"\r\n\r\n%s\r\n" % (self.boundary, name, value)).encode("utf-8")
+        head += ("--%s\r\nContent-Disposition: form-data; name=\"%s\"; filename=\"%s\"\r\nContent-Type: %s\r\n\r\n"
+                 % (self.boundary, file_field, file_name, content_type)).encode("utf-8")
+        self._head = head
+        self._tail = ("\r\n--%s--\r\n" % self.boundary).encode("utf-8")
+        self._payload = payload
+        self._payload_size = payload_size
+        self._on_progress = on_progress
+        self.len = len(self._head) + payload_size + len(self._tail)
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self.len
+
+    @property
+    def content_type(self) -> str:
+        return "multipart/form-data; boundary=%s" % self.boundary
+
+    def rewind(self) -> None:
+        self._position = 0
+        self._payload.seek(0)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.len - self._position
+        result = b""
+        while size > 0 and self._position < self.len:
+            head_end = len(self._head)
+            payload_end = head_end + self._payload_size
+            if self._position < head_end:
+                block = self._head[self._position:self._position + size]
+            elif self._position < payload_end:
+                block = self._payload.read(min(size, payload_end - self._position))
+                if not block:  # The payload is shorter than announced; don't loop forever.
+                    break
+            else:
+                block = self._tail[self._position - payload_end:self._position - payload_end + size]
+            result += block
+            self._position += len(block)
+            size -= len(block)
+        if self._on_progress is not None and self.len:
+            self._on_progress(self._position / self.len)
+        return result
+
+
+class GcodeUploadJob(Job):
+    """Uploads G-code to the BCN3D cloud on a background thread.
+
+    When ``save`` is set the file is first stored with ``/printfiles`` and then printed by id through
+    ``/devices/{id}/print``, otherwise it is sent to ``/devices/{id}/print`` directly. The G-code is encoded once; if the
+    connection drops the same encoded body is sent again, up to ``UPLOAD_ATTEMPTS`` times.
+    """
+
+    def __init__(self, api_url: str, get_token: Callable[[], str], gcode_list: List[str], gcode_name: str,
+                 printer_id: str, save: bool = False, compress: bool = False, progress_message = None) -> None:
+        super().__init__()
+        self._api_url = api_url
+        self._get_token = get_token
+        self._gcode_list = gcode_list
+        self._gcode_name = gcode_name
+        self._printer_id = printer_id
+        self._save = save
+        self._compress = compress
+        self._progress_message = progress_message
+        self._last_progress = -1
+        self.sent_to_cloud = False
+        self.sent_to_printer = False
+        self.error_reason = None  # type: Optional[str]
+
+    def run(self) -> None:
+        start = time.monotonic()
+        payload, payload_size = encodeGcode(self._gcode_list, self._compress)
+        Logger.log("d", "Encoded %s for upload: %d bytes%s in %.2f s", self._gcode_name, payload_size,
+                   " (gzip)" if self._compress else "", time.monotonic() - start)
+        file_name = self._gcode_name + ".gz" if self._compress else self._gcode_name
+        content_type = "application/gzip" if self._compress else "text/x-gcode"
+        try:
+            if self._save:
+                body = MultipartBody({"setup": "{name : %s}" % self._gcode_name}, "file", file_name, payload, payload_size,
+                                     content_type, self._onUploadProgress)
+                response = self._send(self._api_url + "/printfiles", body)
+                if not 200 <= response.status_code < 300:
+                    self.error_reason = "No reason provided" if not hasattr(response, "reason") else response.reason
+                    return
+                self.sent_to_cloud = True
+                print_file_id = response.json()[0]["print_file_id"]
+                response = post(self._api_url + "/devices/" + self._printer_id + "/print", {"print_file_id": print_file_id},
+                                self._headers())
+            else:
+                body = MultipartBody({}, "file", file_name, payload, payload_size, content_type, self._onUploadProgress)
+                response = self._send(self._api_url + "/devices/" + self._printer_id + "/print", body)
+            if 200 <= response.status_code < 300:
+                self.sent_to_printer = True
+            else:
+                self.error_reason = "No reason provided" if not hasattr(response, "reason") else response.reason
+        finally:
+            payload.close()
+            Logger.log("d", "Upload of %s finished in %.2f s", self._gcode_name, time.monotonic() - start)
+
+    def savesToCloud(self) -> bool:
+        """Whether the G-code is stored with ``/printfiles`` before it is printed."""
+        return self._save
+
+    def _headers(self) -> dict:
+        return {"Authorization": "Bearer {}".format(self._get_token())}
+
+    def _send(self, url: str, body: MultipartBody):
+        delay = RETRY_DELAY
+        response = None
+        for attempt in range(UPLOAD_ATTEMPTS):
+            body.rewind()
+            headers = self._headers()
+            headers["Content-Type"] = body.content_type
+            response = postBody(url, body, headers)
+            if response.status_code != -1:  # -1 means the connection failed or dropped.
+                return response
+            Logger.log("w", "Connection lost while uploading %s (attempt %d of %d)", self._gcode_name, attempt + 1, UPLOAD_ATTEMPTS)
+            if attempt + 1 < UPLOAD_ATTEMPTS:
+                time.sleep(delay)
+                delay *= 2
+        return response
+
+    def _onUploadProgress(self, fraction: float) -> None:
+        progress = int(fraction * 100)
+        if self._progress_message is not None and progress != self._last_progress:
+            self._last_progress = progress
+            self._progress_message.setProgress(progress)
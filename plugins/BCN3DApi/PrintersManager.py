@@ -1,9 +1,14 @@
+import json
+import os
+
 from PyQt6.QtCore import QObject, pyqtSlot
 
+from UM.PluginRegistry import PluginRegistry  # For path plugin's directory.
 from UM.Scene.Selection import Selection
 from cura.CuraApplication import CuraApplication
 
 from  .AuthApiService import AuthApiService
+from .ConnectedPrintersRegistry import ConnectedPrintersRegistry
 from .DataApiService import DataApiService
 from .Device import Device
 from UM.Logger import Logger
@@ -17,18 +22,52 @@ class PrintersManager(QObject):
             raise ValueError("Duplicate singleton creation")
         self._cura_application = CuraApplication.getInstance()
         self._data_api_service = DataApiService.getInstance()
+        self._connected_printers = ConnectedPrintersRegistry(self._data_api_service)
+        self._bcn3d_models = None
+        self._bcn3d_models_loaded = False
         AuthApiService.getInstance().authStateChanged.connect(self._authStateChanged)
 
 
     def _authStateChanged(self, logged_in):
         if logged_in:
             self._addPrinters()
+            self._connected_printers.start()
         else:
             self._resetPrinters()
+            self._connected_printers.stop()
+
+    def getConnectedPrinters(self) -> ConnectedPrintersRegistry:
+        return self._connected_printers
+
+    def getBcn3dModels(self):
+        """The contents of bcn3d-mapped-models.json, read only once."""
+        if not self._bcn3d_models_loaded:
+            self._bcn3d_models_loaded = True
+            plugin_path = PluginRegistry.getInstance().getPluginPath("BCN3DApi")
+            try:
+                with open(os.path.join(plugin_path, "bcn3d-mapped-models.json"), "r", encoding = "utf-8") as f:
+                    self._bcn3d_models = json.load(f)
+            except IOError as e:
+                Logger.error("Could not open bcn3d-mapped-models.json for reading: {}".format(str(e)))
+            except Exception as e:
+                Logger.error("Could not parse bcn3d-mapped-models.json: {}".format(str(e)))
+        return self._bcn3d_models
 
 
     def _addPrinters(self):
-        printers = self._data_api_service.getPrinters()
+        # Fetch the printers on a worker thread and add them to the model back on the Qt thread.
+        self._data_api_service.getPrintersAsync().add_done_callback(self._onPrintersRequested)
+
+    def _onPrintersRequested(self, future):
+        # Runs on the worker thread.
+        try:
+            printers = future.result()
+        except Exception:
+            Logger.logException("w", "Could not get the printers")
+            return
+        self._cura_application.callLater(self._onPrintersReceived, printers)
+
+    def _onPrintersReceived(self, printers):
         discovered_printers_model = self._cura_application.getDiscoveredPrintersModel()
         for printer in printers:
             discovered_printers_model.addDiscoveredPrinter(printer["serialnumber"], printer["serialnumber"], printer["printername"], self._createMachine, printer["printermodel"], Device(printer["printername"]))
@@ -1,29 +1,125 @@
-import requests
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from types import SimpleNamespace
+from typing import Dict
+from urllib.parse import urlparse
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get(url, headers=None):
+from UM.Logger import Logger
+
+# (connect, read) timeouts in seconds. Uploads wait longer for the answer, the server still has to store the file.
+TIMEOUT = (5, 30)
+UPLOAD_TIMEOUT = (5, 300)
+# Idempotent requests are retried on connection errors and on these answers, waiting 0.5, 1, 2... seconds in between.
+RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 502, 503, 504)
+POOL_SIZE = 8
+MAX_WORKERS = 4
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+_latencies = {}  # type: Dict[str, Dict[str, float]]
+_latencies_lock = threading.Lock()
+
+
+def getSession() -> requests.Session:
+    """The session shared by all requests to the BCN3D API, so connections are kept alive and reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=RETRIES, backoff_factor=RETRY_BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES,
+                          raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _getExecutor() -> ThreadPoolExecutor:
+    global _executor
+    with _session_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="BCN3DApi")
+        return _executor
+
+
+def _endpoint(method, url):
+    """Name under which the latency of a request is recorded, e.g. "GET /devices/{id}/print"."""
+    path = urlparse(url).path
+    # Segments of at least 4 characters with a digit in them are ids (printer serials, uuids), "v2" is not.
+    return method + " " + re.sub(r"/(?=[^/]*\d)[^/]{4,}", "/{id}", path)
+
+
+def _recordLatency(endpoint, seconds):
+    with _latencies_lock:
+        stats = _latencies.setdefault(endpoint, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+    Logger.log("d", "BCN3D API %s took %.0f ms", endpoint, seconds * 1000)
+
+
+def getLatencies():
+    """Per endpoint request count, total and maximum duration in seconds."""
+    with _latencies_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _latencies.items()}
+
+
+def _request(method, url, **kwargs):
+    start = time.monotonic()
     try:
-        response = requests.get(url, headers=headers)
+        response = getSession().request(method, url, **kwargs)
     except requests.exceptions.ConnectionError:
         response = SimpleNamespace(status_code=-1)
     except Exception as e:
         response = SimpleNamespace(status_code=0)
-
+    _recordLatency(_endpoint(method, url), time.monotonic() - start)
     return response
 
 
+def get(url, headers=None):
+    return _request("GET", url, headers=headers, timeout=TIMEOUT)
+
+
 def post(url, body, headers=None, files=None):
     if headers is None:
         headers = {}
-    try:
-        if not files:
-            response = requests.post(url, json=body, headers=headers, files=files)
-        else:
-            response = requests.post(url, data=body, headers=headers, files=files)
-    except requests.exceptions.ConnectionError:
-        response = SimpleNamespace(status_code=-1)
-    except Exception as e:
-        response = SimpleNamespace(status_code=0)
+    if not files:
+        return _request("POST", url, json=body, headers=headers, files=files, timeout=TIMEOUT)
+    else:
+        return _request("POST", url, data=body, headers=headers, files=files, timeout=TIMEOUT)
 
-    return response
+
+def postBody(url, body, headers=None):
+    """Posts a prepared request body, e.g. a file like object that requests streams instead of loading it in memory."""
+    if headers is None:
+        headers = {}
+    return _request("POST", url, data=body, headers=headers, timeout=UPLOAD_TIMEOUT)
+
+
+def submit(function, *args, **kwargs) -> Future:
+    """Runs a (blocking) API call on one of the worker threads, so it doesn't block the Qt thread.
+
+    Callbacks added to the returned future also run on a worker thread; use CuraApplication.callLater to get back to
+    the Qt thread before touching models or emitting Qt signals.
+    """
+    return _getExecutor().submit(function, *args, **kwargs)
+
+
+def getAsync(url, headers=None) -> Future:
+    """Like get, but runs on a worker thread. The returned future resolves to the response."""
+    return submit(get, url, headers)
+
+
+def postAsync(url, body, headers=None, files=None) -> Future:
+    """Like post, but runs on a worker thread. The returned future resolves to the response."""
+    return submit(post, url, body, headers, files)
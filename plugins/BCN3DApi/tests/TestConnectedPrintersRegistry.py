@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from .. import ConnectedPrintersRegistry as registry_module
+from ..ConnectedPrintersRegistry import ConnectedPrintersRegistry
+
+
+def connectedPrinters(*printers):
+    return {"data": [{"serialNumber": serial_number, "ready_to_print": ready} for serial_number, ready in printers]}
+
+
+@pytest.fixture()
+def registry():
+    application = MagicMock()
+    application.getPreferences().getValue = MagicMock(return_value = 30)
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value = application)):
+        with patch.object(registry_module, "QTimer", MagicMock()):
+            yield ConnectedPrintersRegistry(MagicMock())
+
+
+def test_indexedBySerialNumber(registry):
+    registry._onConnectedPrintersReceived(connectedPrinters(("A", True), ("B", False)))
+
+    assert registry.getPrinter("A")["ready_to_print"]
+    assert not registry.getPrinter("B")["ready_to_print"]
+    assert registry.getPrinter("C") is None
+
+
+def test_entriesExpire(registry):
+    registry._onConnectedPrintersReceived(connectedPrinters(("A", True)))
+    with patch.object(registry_module.time, "monotonic", MagicMock(return_value = registry_module.time.monotonic() + 31)):
+        assert registry.getPrinter("A") is None
+
+
+def test_fetchPrinterOnlyAsksTheApiWhenNeeded(registry):
+    registry._data_api_service.getConnectedPrinter = MagicMock(return_value = connectedPrinters(("A", True)))
+
+    assert registry.fetchPrinter("A")["ready_to_print"]
+    assert registry.fetchPrinter("A")["ready_to_print"]
+    assert registry._data_api_service.getConnectedPrinter.call_count == 1
+
+
+def test_changeSignals(registry):
+    added, changed, removed = MagicMock(), MagicMock(), MagicMock()
+    registry.printerAdded.connect(added)
+    registry.printerChanged.connect(changed)
+    registry.printerRemoved.connect(removed)
+
+    registry._onConnectedPrintersReceived(connectedPrinters(("A", True), ("B", True)))
+    registry._onConnectedPrintersReceived(connectedPrinters(("A", False)))
+
+    assert added.call_count == 2
+    changed.assert_called_once_with("A")
+    removed.assert_called_once_with("B")
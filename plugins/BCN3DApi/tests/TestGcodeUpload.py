@@ -0,0 +1,148 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from .. import DataApiService as DataApiServiceModule
+from .. import GcodeUpload
+from ..DataApiService import DataApiService
+from ..GcodeUpload import GcodeUploadJob, MultipartBody
+
+GCODE = [";Generated with StratosEngine\n", ";LAYER:0\nG1 X10 Y10\n", ";LAYER:1\nG1 X20 Y20\n"]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Stands in for the /printfiles and /devices/{id}/print endpoints of the BCN3D cloud."""
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if server.drop_connections > 0:
+            server.drop_connections -= 1
+            self.close_connection = True
+            self.connection.close()
+            return
+        server.requests.append((self.path, self.headers, body))
+        if self.path in server.failing_paths:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        response = b"{}"
+        if self.path == "/printfiles":
+            response = json.dumps([{"print_file_id": "file-1"}]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    http_server.requests = []
+    http_server.drop_connections = 0
+    http_server.failing_paths = set()
+    thread = threading.Thread(target = http_server.serve_forever, daemon = True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def apiUrl(server):
+    return "http://127.0.0.1:%d" % server.server_address[1]
+
+
+def filePart(headers, body):
+    boundary = headers["Content-Type"].split("boundary=")[1].encode("utf-8")
+    for part in body.split(b"--" + boundary):
+        if b"filename=" in part:
+            return part.split(b"\r\n\r\n", 1)[1][:-2]
+    return None
+
+
+def test_multipartBodyProgress():
+    progress = []
+    payload, size = GcodeUpload.encodeGcode(GCODE)
+    body = MultipartBody({"setup": "x"}, "file", "test.gcode", payload, size, "text/x-gcode", progress.append)
+
+    data = b""
+    block = body.read(16)
+    while block:
+        data += block
+        block = body.read(16)
+
+    assert len(data) == len(body)
+    assert progress[-1] == 1.0
+    body.rewind()
+    assert body.read() == data
+
+
+def test_printDirectly(server):
+    job = GcodeUploadJob(apiUrl(server), lambda: "token", GCODE, "test.gcode", "printer-1")
+    job.run()
+
+    assert job.sent_to_printer
+    path, headers, body = server.requests[0]
+    assert path == "/devices/printer-1/print"
+    assert headers["Authorization"] == "Bearer token"
+    assert filePart(headers, body) == "".join(GCODE).encode("utf-8")
+
+
+def test_saveCompressedAndPrint(server):
+    job = GcodeUploadJob(apiUrl(server), lambda: "token", GCODE, "test.gcode", "printer-1", save = True, compress = True)
+    job.run()
+
+    assert job.sent_to_cloud and job.sent_to_printer
+    path, headers, body = server.requests[0]
+    assert path == "/printfiles"
+    assert b"filename=\"test.gcode.gz\"" in body
+    assert gzip.decompress(filePart(headers, body)) == "".join(GCODE).encode("utf-8")
+    path, headers, body = server.requests[1]
+    assert path == "/devices/printer-1/print"
+    assert json.loads(body) == {"print_file_id": "file-1"}
+
+
+@patch.object(GcodeUpload, "RETRY_DELAY", 0)
+def test_resumeAfterDroppedConnection(server):
+    server.drop_connections = 1
+    job = GcodeUploadJob(apiUrl(server), lambda: "token", GCODE, "test.gcode", "printer-1")
+    job.run()
+
+    assert job.sent_to_printer
+    assert len(server.requests) == 1
+    path, headers, body = server.requests[0]
+    assert filePart(headers, body) == "".join(GCODE).encode("utf-8")
+
+
+def finishedMessage(job):
+    """The text of the message DataApiService shows when the job is finished."""
+    with patch.object(DataApiServiceModule, "Message", MagicMock()) as message, patch.object(DataApiServiceModule, "Logger", MagicMock()):
+        DataApiService.__new__(DataApiService)._onSendGcodeFinished(job)
+    return message.call_args[0][0]
+
+
+def test_saveFailed(server):
+    server.failing_paths.add("/printfiles")
+    job = GcodeUploadJob(apiUrl(server), lambda: "token", GCODE, "test.gcode", "printer-1", save = True)
+    job.run()
+
+    assert not job.sent_to_cloud and not job.sent_to_printer
+    assert [path for path, headers, body in server.requests] == ["/printfiles"]
+    assert finishedMessage(job) == "There was an error sending the gcode to the cloud"
+
+
+def test_printFailed(server):
+    server.failing_paths.add("/devices/printer-1/print")
+    job = GcodeUploadJob(apiUrl(server), lambda: "token", GCODE, "test.gcode", "printer-1")
+    job.run()
+
+    assert not job.sent_to_printer
+    assert finishedMessage(job) == "There was an error sending the gcode to the printer"
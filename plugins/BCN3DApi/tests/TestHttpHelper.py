@@ -0,0 +1,54 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from .. import http_helper
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the session can reuse the connection.
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    http_server.connections = set()
+    thread = threading.Thread(target = http_server.serve_forever, daemon = True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def test_endpointName():
+    assert http_helper._endpoint("GET", "https://api.cloud.bcn3d.com/v2/devices/connected") == "GET /v2/devices/connected"
+    assert http_helper._endpoint("POST", "https://api.cloud.bcn3d.com/v2/devices/5f3a9/print") == "POST /v2/devices/{id}/print"
+
+
+def test_sessionIsReused(server):
+    url = "http://127.0.0.1:%d/devices" % server.server_address[1]
+    assert http_helper.get(url).status_code == 200
+    assert http_helper.get(url).status_code == 200
+    assert len(server.connections) == 1
+    assert http_helper.getLatencies()["GET /devices"]["count"] >= 2
+
+
+def test_getAsync(server):
+    url = "http://127.0.0.1:%d/devices/connected" % server.server_address[1]
+    futures = [http_helper.getAsync(url) for _ in range(4)]
+    assert all(future.result(timeout = 10).status_code == 200 for future in futures)
+
+
+def test_connectionError():
+    assert http_helper.get("http://127.0.0.1:1/devices").status_code == -1
@@ -5,6 +5,7 @@ from UM.Logger import Logger
 from UM.Message import Message
 from UM.i18n import i18nCatalog
 
+from cura.Utils.BCN3Dutils.PostSliceBarrier import PostSliceBarrier
 from .Bcn3DFixes import Bcn3DFixes
 
 catalog = i18nCatalog("cura")
@@ -13,17 +14,36 @@ class BCN3DPostSlicing(QObject, Extension):
     def __init__(self, parent=None):
         QObject.__init__(self, parent)
         Extension.__init__(self)
-        self._bcn3d_fixes_job = None
+        self._bcn3d_fixes_jobs = {}  # Build plate number -> Bcn3DFixes job
         Application.getInstance().getOutputDeviceManager().writeStarted.connect(self.applyPostSlice)
 
     def applyPostSlice(self, output_device)  -> None:
-        if self._bcn3d_fixes_job is not None and self._bcn3d_fixes_job.isRunning():
-            return
+        '''
+            Starts one Bcn3DFixes job per build plate. The jobs run in parallel on the job queue; writers wait for
+            them through the PostSliceBarrier before reading the G-code.
+        '''
         container = Application.getInstance().getGlobalContainerStack()
         scene = Application.getInstance().getController().getScene()
         if hasattr(scene, "gcode_dict"):
             gcode_dict = getattr(scene, "gcode_dict")
             if gcode_dict:
+                barrier = PostSliceBarrier.getInstance()
+                # Per build plate record of the fixes applied to its G-code, see PostSlicingState.
+                post_processing_dict = getattr(scene, "gcode_post_processing_dict", {})
                 for i in gcode_dict:
-                    self._bcn3d_fixes_job = Bcn3DFixes(container, gcode_dict[i])
-                    self._bcn3d_fixes_job.start()
\ No newline at end of file
+                    if barrier.isPending(i):
+                        continue
+                    state = post_processing_dict.get(i)
+                    if state is not None and state.isUpToDate(gcode_dict[i]):
+                        Logger.log("d", "G-code of build plate %s was already post processed, skipping the BCN3D fixes", i)
+                        continue
+                    barrier.start(i)
+                    job = Bcn3DFixes(container, gcode_dict[i], i)
+                    job.finished.connect(self._onJobFinished)
+                    self._bcn3d_fixes_jobs[i] = job
+                    job.start()
+
+    def _onJobFinished(self, job) -> None:
+        for build_plate, running_job in list(self._bcn3d_fixes_jobs.items()):
+            if running_job is job:
+                del self._bcn3d_fixes_jobs[build_plate]
@@ -0,0 +1,228 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+#   Markers written at the top of the header layer once a fix has been applied, so a second write of the same
+#   G-code does not apply it twice.
+ALL_TOOL_CHANGE_FIXED_MARKER = ";firstAllToolChangeFixed"
+FIRST_TOOL_CHANGE_FIXED_MARKER = ";firstToolChangeFixed"
+KNOWN_MARKERS = (ALL_TOOL_CHANGE_FIXED_MARKER, FIRST_TOOL_CHANGE_FIXED_MARKER)
+
+END_TOOL_CHANGE = ";endTC"
+STRATOS_ENGINE_HEADER = ";Generated with StratosEngine"
+CURA_ENGINE_HEADER = ";Generated with Cura_SteamEngine"
+EXTRUDERS_USED = ";Extruders used:"
+SWITCH_EXTRUDER_RETRACTION_AMOUNT = ";switch_extruder_retraction_amount:"
+
+
+def findLine(layer: str, line: str, start: int = 0) -> int:
+    """Returns the offset of the first line in ``layer`` that is exactly ``line``, or -1.
+
+    Equivalent to ``layer.split("\\n").index(line)`` but without splitting the layer.
+    """
+    position = layer.find(line, start)
+    while position != -1:
+        end = position + len(line)
+        if (position == 0 or layer[position - 1] == "\n") and (end == len(layer) or layer[end] == "\n"):
+            return position
+        position = layer.find(line, end)
+    return -1
+
+
+class GCodeRule:
+    """A single fix applied by the RuleEngine.
+
+    Rules are evaluated once per layer. ``matches`` is a cheap test on the raw layer text that decides whether the
+    rule has to look at the layer at all; ``apply`` returns the fixed layer, or None if it did not change anything.
+    Rules with ``header_only`` set are only offered the first layer.
+    """
+
+    name = ""
+    header_only = False
+    # Markers that, when present at the top of the header, mean this rule has already been applied.
+    applied_markers = ()  # type: Tuple[str, ...]
+    # Marker written at the top of the header the first time this rule runs.
+    marker = None  # type: Optional[str]
+
+    def reset(self) -> None:
+        """Called before every pass so rules that only act once per file can start over."""
+        pass
+
+    def matches(self, index: int, layer: str) -> bool:
+        return True
+
+    def apply(self, index: int, layer: str) -> Optional[str]:
+        raise NotImplementedError()
+
+
+class ExtrudersNameRule(GCodeRule):
+    """Uppercases the nozzle type in the ``;Extruders used:`` header line, e.g. ``0.4m`` to ``0.4M``."""
+
+    name = "updateExtrusorsName"
+    header_only = True
+
+    _line_index = 6
+    _nozzle_types = ("0.4m", "0.6x", "0.4rx", "0.6rx", "0.4r", "0.6r")
+
+    def matches(self, index: int, layer: str) -> bool:
+        return EXTRUDERS_USED in layer
+
+    def apply(self, index: int, layer: str) -> Optional[str]:
+        lines = layer.split("\n")
+        if len(lines) <= self._line_index:
+            return None
+        line = lines[self._line_index]
+        if not line.startswith(EXTRUDERS_USED):
+            return None
+        for tool in ("T0", "T1"):
+            for nozzle_type in self._nozzle_types:
+                if line.startswith("{} {} {}".format(EXTRUDERS_USED, tool, nozzle_type)):
+                    lines[self._line_index] = "{} {} {}".format(EXTRUDERS_USED, tool, nozzle_type.upper())
+                    return "\n".join(lines)
+        return None
+
+
+class StratosEngineNameRule(GCodeRule):
+    """Replaces ``;Generated with Cura_SteamEngine`` by ``;Generated with StratosEngine <version>``."""
+
+    name = "changeCuraForStratos"
+    header_only = True
+
+    def __init__(self, stratos_version: str) -> None:
+        self._stratos_version = stratos_version
+
+    def matches(self, index: int, layer: str) -> bool:
+        return layer.startswith(CURA_ENGINE_HEADER)
+
+    def apply(self, index: int, layer: str) -> Optional[str]:
+        newline = layer.find("\n")
+        return STRATOS_ENGINE_HEADER + " " + str(self._stratos_version) + (layer[newline:] if newline != -1 else "")
+
+
+class FixAllToolChangeRule(GCodeRule):
+    """DST-205: removes the two lines that follow the ``;endTC`` of every tool change."""
+
+    name = "fixAllToolchange"
+    applied_markers = (ALL_TOOL_CHANGE_FIXED_MARKER, )
+    marker = ALL_TOOL_CHANGE_FIXED_MARKER
+
+    def matches(self, index: int, layer: str) -> bool:
+        return END_TOOL_CHANGE in layer
+
+    def apply(self, index: int, layer: str) -> Optional[str]:
+        position = findLine(layer, END_TOOL_CHANGE)
+        if position == -1:
+            return None
+        end = position + len(END_TOOL_CHANGE)
+        # Drop the two lines after ;endTC, each together with the newline in front of it.
+        cut = end
+        for _ in range(2):
+            if cut == len(layer):
+                break
+            newline = layer.find("\n", cut + 1)
+            cut = newline if newline != -1 else len(layer)
+        if cut == end:
+            return None
+        return layer[:end] + layer[cut:]
+
+
+class AfterFirstToolChangeRule(GCodeRule):
+    """D-142: resets the extruder position right after the first tool change.
+
+    The retraction amount is read from the ``;switch_extruder_retraction_amount:`` comment that the extruder start
+    G-code writes just above ``;endTC``.
+    """
+
+    name = "afterFirstToolChangeFix"
+    # Both tool change fixes are always applied together, so either marker means this one is done as well.
+    applied_markers = KNOWN_MARKERS
+
+    def __init__(self) -> None:
+        self._done = False
+
+    def reset(self) -> None:
+        self._done = False
+
+    def matches(self, index: int, layer: str) -> bool:
+        return not self._done and END_TOOL_CHANGE in layer
+
+    def apply(self, index: int, layer: str) -> Optional[str]:
+        position = findLine(layer, END_TOOL_CHANGE)
+        if position == -1:
+            return None
+        retraction_amount = ""
+        if position > 0:
+            previous_line = layer[layer.rfind("\n", 0, position - 1) + 1:position - 1]
+            retraction_amount = previous_line.replace(SWITCH_EXTRUDER_RETRACTION_AMOUNT, "")
+        end = position + len(END_TOOL_CHANGE)
+        self._done = True
+        return layer[:end] + "\nG92 E-" + retraction_amount + "\n;First TC fixed" + layer[end:]
+
+
+def readHeaderMarkers(header: str) -> List[str]:
+    """Returns the fix markers found at the top of the header layer."""
+    markers = []
+    for line in header.split("\n", len(KNOWN_MARKERS))[:len(KNOWN_MARKERS)]:
+        if line not in KNOWN_MARKERS:
+            break
+        markers.append(line)
+    return markers
+
+
+class RuleEngine:
+    """Applies a list of GCodeRules to a G-code list in a single pass.
+
+    Every layer is looked at once: layers that no active rule matches are skipped with a substring test, and only the
+    layers that a rule actually changed are written back into the list. The time spent in every rule is accumulated in
+    ``timings`` (seconds, keyed by rule name).
+    """
+
+    def __init__(self, rules: Sequence[GCodeRule]) -> None:
+        self._rules = list(rules)
+        self.timings = {}  # type: Dict[str, float]
+        self.applied = []  # type: List[str]
+        self.skipped = []  # type: List[str]
+        self.changed_layers = 0
+
+    def run(self, gcode_list: List[str]) -> bool:
+        """Applies all rules to ``gcode_list`` in place. Returns whether any layer was changed."""
+        self.timings = {rule.name: 0.0 for rule in self._rules}
+        self.applied = []
+        self.skipped = []
+        self.changed_layers = 0
+        if not gcode_list:
+            return False
+
+        header_markers = readHeaderMarkers(gcode_list[0])
+        rules = []
+        for rule in self._rules:
+            if any(marker in header_markers for marker in rule.applied_markers):
+                self.skipped.append(rule.name)
+                continue
+            rule.reset()
+            rules.append(rule)
+        body_rules = [rule for rule in rules if not rule.header_only]
+
+        new_markers = []  # type: List[str]
+        for index, layer in enumerate(gcode_list):
+            changed = False
+            for rule in (rules if index == 0 else body_rules):
+                start = time.perf_counter()
+                if rule.matches(index, layer):
+                    result = rule.apply(index, layer)
+                    if result is not None:
+                        layer = result
+                        changed = True
+                        if rule.name not in self.applied:
+                            self.applied.append(rule.name)
+                self.timings[rule.name] += time.perf_counter() - start
+            if index == 0:
+                # Only G-code that has been renamed to StratosEngine gets marked, like the old per-fix passes did.
+                if layer.startswith(STRATOS_ENGINE_HEADER):
+                    new_markers = [rule.marker for rule in rules if rule.marker is not None]
+                if new_markers:
+                    layer = "\n".join(new_markers) + "\n" + layer
+                    changed = True
+            if changed:
+                gcode_list[index] = layer
+                self.changed_layers += 1
+        return self.changed_layers > 0
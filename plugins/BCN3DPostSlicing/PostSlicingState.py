@@ -0,0 +1,30 @@
+from typing import List, Tuple
+
+
+def gcodeFingerprint(gcode_list: List[str]) -> Tuple[int, int, int]:
+    """Cheap content hash of a G-code list: its length and the hashes of the header and the last layer.
+
+    Python caches the hash of a string object, so for a list whose layers were not replaced this is O(1). Every fix
+    rewrites the header (markers, engine name) and a new slice produces new layer strings, so any change that matters
+    to the fixes changes the fingerprint.
+    """
+    if not gcode_list:
+        return 0, 0, 0
+    return len(gcode_list), hash(gcode_list[0]), hash(gcode_list[-1])
+
+
+class PostSlicingState:
+    """Post processing record of the G-code of one build plate.
+
+    Stored per build plate in ``scene.gcode_post_processing_dict``, next to ``scene.gcode_dict``, so that writing the
+    same slice to several output devices only applies the BCN3D fixes once.
+    """
+
+    def __init__(self, gcode_list: List[str], applied_fixes: List[str]) -> None:
+        self.applied_fixes = applied_fixes
+        self._gcode_list_id = id(gcode_list)
+        self._fingerprint = gcodeFingerprint(gcode_list)
+
+    def isUpToDate(self, gcode_list: List[str]) -> bool:
+        """Whether ``gcode_list`` is still the G-code this record was made for, i.e. the fixes need not run again."""
+        return id(gcode_list) == self._gcode_list_id and gcodeFingerprint(gcode_list) == self._fingerprint
@@ -0,0 +1,35 @@
+from ..GCodeRules import RuleEngine, ExtrudersNameRule, StratosEngineNameRule, FixAllToolChangeRule, AfterFirstToolChangeRule
+
+HEADER = ";Generated with Cura_SteamEngine 4.8\n;FLAVOR:RepRap\n;TIME:100\n;Filament used: 1m\n;Layer height: 0.2\n;Machine Model: Sigma\n;Extruders used: T0 0.4m\n;Print mode: dual\n"
+TOOL_CHANGE_LAYER = ";LAYER:0\nT1\n;switch_extruder_retraction_amount:8\n;endTC\nG1 F1500 E-8\nG92 E0\nG1 X10 Y10\n"
+PLAIN_LAYER = ";LAYER:1\nG1 X20 Y20\n"
+
+
+def createEngine():
+    return RuleEngine([ExtrudersNameRule(), StratosEngineNameRule("2.0.0"), FixAllToolChangeRule(), AfterFirstToolChangeRule()])
+
+
+def test_singlePass():
+    gcode_list = [HEADER, TOOL_CHANGE_LAYER, PLAIN_LAYER, TOOL_CHANGE_LAYER]
+    engine = createEngine()
+
+    assert engine.run(gcode_list)
+
+    assert gcode_list[0].startswith(";firstAllToolChangeFixed\n;Generated with StratosEngine 2.0.0\n")
+    assert ";Extruders used: T0 0.4M\n" in gcode_list[0]
+    assert gcode_list[1] == ";LAYER:0\nT1\n;switch_extruder_retraction_amount:8\n;endTC\nG92 E-8\n;First TC fixed\nG1 X10 Y10\n"
+    assert gcode_list[2] is PLAIN_LAYER  # Untouched layers are not rewritten.
+    assert gcode_list[3] == ";LAYER:0\nT1\n;switch_extruder_retraction_amount:8\n;endTC\nG1 X10 Y10\n"
+    assert engine.changed_layers == 3
+    assert set(engine.timings) == {"updateExtrusorsName", "changeCuraForStratos", "fixAllToolchange", "afterFirstToolChangeFix"}
+
+
+def test_alreadyApplied():
+    gcode_list = [HEADER, TOOL_CHANGE_LAYER]
+    engine = createEngine()
+    engine.run(gcode_list)
+    fixed = list(gcode_list)
+
+    assert not engine.run(gcode_list)
+    assert gcode_list == fixed
+    assert engine.skipped == ["fixAllToolchange", "afterFirstToolChangeFix"]
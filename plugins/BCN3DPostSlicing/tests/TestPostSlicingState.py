@@ -0,0 +1,20 @@
+from ..PostSlicingState import PostSlicingState
+
+
+def test_upToDate():
+    gcode_list = [";Generated with StratosEngine\n", ";LAYER:0\n"]
+    state = PostSlicingState(gcode_list, ["fixAllToolchange"])
+
+    assert state.isUpToDate(gcode_list)
+    assert state.applied_fixes == ["fixAllToolchange"]
+
+
+def test_changedGCodeIsNotUpToDate():
+    gcode_list = [";Generated with StratosEngine\n", ";LAYER:0\n"]
+    state = PostSlicingState(gcode_list, [])
+
+    assert not state.isUpToDate(list(gcode_list))  # A new slice produces a new list.
+    gcode_list[0] += ";POSTPROCESSED\n"
+    assert not state.isUpToDate(gcode_list)
+    gcode_list.append(";LAYER:1\n")
+    assert not state.isUpToDate(gcode_list)
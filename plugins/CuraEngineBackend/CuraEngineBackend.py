@@ -4,10 +4,12 @@
 import argparse #To run the engine in debug mode if the front-end is in debug mode.
 from collections import defaultdict
 import os
+import re
 from PyQt6.QtCore import QObject, QTimer, QUrl, pyqtSlot
 import sys
 from time import time
-from typing import Any, cast, Dict, List, Optional, Set, TYPE_CHECKING
+import uuid
+from typing import Any, cast, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 from PyQt6.QtGui import QDesktopServices, QImage
 
@@ -17,6 +19,7 @@ from UM.Signal import Signal
 from UM.Logger import Logger
 from UM.Message import Message
 from UM.PluginRegistry import PluginRegistry
+from UM.Resources import Resources
 from UM.Platform import Platform
 from UM.Qt.Duration import DurationFormat
 from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
@@ -28,7 +31,11 @@ from cura.CuraApplication import CuraApplication
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.Snapshot import Snapshot
 from cura.Utils.Threading import call_on_qt_thread
+from .GcodeTemplate import POST_SLICE_DATA_VARIABLES
+from .MeshTransformationCache import MeshTransformationCache
 from .ProcessSlicedLayersJob import ProcessSlicedLayersJob
+from .SettingValueCache import SettingValueCache
+from .SliceResultCache import SliceResult, SliceResultCache
 from .StartSliceJob import StartSliceJob, StartJobResult
 
 import pyArcus as Arcus
@@ -44,6 +51,9 @@ catalog = i18nCatalog("cura")
 
 
 class CuraEngineBackend(QObject, Backend):
+    # The placeholders in the g-code for the print information, which is only known when slicing is finished.
+    _placeholder_regex = re.compile(r"\{(%s)\}" % "|".join(sorted(POST_SLICE_DATA_VARIABLES)))
+
     backendError = Signal()
 
     printDurationMessage = Signal()
@@ -119,6 +129,8 @@ class CuraEngineBackend(QObject, Backend):
 
         # key is build plate number, then arrays are stored until they go to the ProcessSlicesLayersJob
         self._stored_optimized_layer_data: Dict[int, List[Arcus.PythonMessage]] = {}
+        # key is build plate number, then the indices of the g-code layers with placeholders for the print information
+        self._gcode_placeholder_layers: Dict[int, List[int]] = {}
 
         self._scene: Scene = application.getController().getScene()
         self._scene.sceneChanged.connect(self._onSceneChanged)
@@ -145,6 +157,10 @@ class CuraEngineBackend(QObject, Backend):
 
         self._start_slice_job: Optional[StartSliceJob] = None
         self._start_slice_job_build_plate: Optional[int] = None
+        # The vertices of the objects as sent in the previous slice, so they aren't transformed again when only settings changed.
+        self._mesh_transformation_cache = MeshTransformationCache()
+        # The setting values of the previous slice, so only the changed settings are evaluated again.
+        self._setting_value_cache = SettingValueCache()
         self._slicing: bool = False  # Are we currently slicing?
         self._restart: bool = False  # Back-end is currently restarting?
         self._tool_active: bool = False  # If a tool is active, some tasks do not have to do anything
@@ -166,6 +182,15 @@ class CuraEngineBackend(QObject, Backend):
         application.getPreferences().addPreference("general/auto_slice", False)
         application.getPreferences().addPreference("info/send_engine_crash", True)
         application.getPreferences().addPreference("info/anonymous_engine_crash_report", True)
+        # Process the layers for the layer view while the engine is still slicing.
+        application.getPreferences().addPreference("view/process_layers_while_slicing", True)
+        # The size in MB of the results of earlier slices kept on disk, to restore them without slicing again. 0 keeps none.
+        application.getPreferences().addPreference("general/slice_result_cache_size", 512)
+        self._slice_result_cache = SliceResultCache(os.path.join(Resources.getCacheStoragePath(), "slice_results"),
+                                                    self._getSliceResultCacheSize())
+        # The fingerprint and the estimates of the slice that the engine is doing, to store its result when it's done.
+        self._slice_fingerprint: Optional[str] = None
+        self._slice_estimates: Optional[Tuple[Dict[str, float], List[float]]] = None
 
         self._use_timer: bool = False
 
@@ -390,13 +415,14 @@ class CuraEngineBackend(QObject, Backend):
         self.backendStateChange.emit(BackendState.NotStarted)
 
         self._scene.gcode_dict[build_plate_to_be_sliced] = []  # type: ignore #[] indexed by build plate number
+        self._gcode_placeholder_layers[build_plate_to_be_sliced] = []
         self._slicing = True
         self.slicingStarted.emit()
 
         self.determineAutoSlicing()  # Switch timer on or off if appropriate
 
         slice_message = self._socket.createMessage("cura.proto.Slice")
-        self._start_slice_job = StartSliceJob(slice_message)
+        self._start_slice_job = StartSliceJob(slice_message, self._mesh_transformation_cache, self._setting_value_cache, self._slice_result_cache)
         self._start_slice_job_build_plate = build_plate_to_be_sliced
         self._start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
         self._start_slice_job.start()
@@ -409,6 +435,11 @@ class CuraEngineBackend(QObject, Backend):
         """
         self._slicing = False
         self._stored_layer_data = []
+        if self._process_layers_job is not None and self._process_layers_job.isStreaming():
+            # The engine won't send the rest of the layers the job waits for.
+            Logger.log("i", "Aborting process layers job of the terminated slice...")
+            self._process_layers_job.abort()
+            self._process_layers_job = None
         if self._start_slice_job_build_plate in self._stored_optimized_layer_data:
             del self._stored_optimized_layer_data[self._start_slice_job_build_plate]
         if self._start_slice_job is not None:
@@ -568,7 +599,14 @@ class CuraEngineBackend(QObject, Backend):
             self._invokeSlice()
             return
 
+        cached_result = job.getCachedResult()
+        if cached_result is not None:
+            self._restoreSliceResult(cached_result)
+            return
+
         # Preparation completed, send it to the backend.
+        self._slice_fingerprint = job.getFingerprint()
+        self._slice_estimates = None
         self._socket.sendMessage(job.getSliceMessage())
 
         # Notify the user that it's now up to the backend to do its job
@@ -787,6 +825,11 @@ class CuraEngineBackend(QObject, Backend):
                 self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
             self._stored_optimized_layer_data[self._start_slice_job_build_plate].append(message)
 
+            if self._process_layers_job is not None and self._process_layers_job.isStreaming():
+                self._process_layers_job.notifyLayerReceived()
+            elif self._canStreamLayers():
+                self._startProcessSlicedLayersJob(self._start_slice_job_build_plate, streaming = True)
+
     def _onProgressMessage(self, message: Arcus.PythonMessage) -> None:
         """Called when a progress message is received from the engine.
 
@@ -815,6 +858,37 @@ class CuraEngineBackend(QObject, Backend):
         :param message: The protobuf message signalling that slicing is finished.
         """
 
+        self._storeSliceResult()
+        self._finishSlicing()
+
+    def _storeSliceResult(self) -> None:
+        """Stores the result of the slice that the engine finished, so the same slice can be restored later."""
+
+        build_plate = self._start_slice_job_build_plate
+        if self._slice_fingerprint is None or self._slice_estimates is None or build_plate not in self._scene.gcode_dict:  # type: ignore
+            return
+        times, material_amounts = self._slice_estimates
+        self._slice_result_cache.put(self._slice_fingerprint, list(self._scene.gcode_dict[build_plate]),  # type: ignore
+                                     list(self._gcode_placeholder_layers.get(build_plate, [])), times, material_amounts,
+                                     list(self._stored_optimized_layer_data.get(build_plate, [])))
+        self._slice_fingerprint = None
+
+    def _restoreSliceResult(self, result: SliceResult) -> None:
+        """Finishes the slice with the stored result of an earlier slice of the same scene and settings."""
+
+        build_plate = self._start_slice_job_build_plate
+        Logger.log("i", "Restoring the result of an earlier slice of build plate %s", build_plate)
+        self._scene.gcode_dict[build_plate] = list(result.gcode)  # type: ignore
+        self._gcode_placeholder_layers[build_plate] = list(result.placeholder_layers)
+        self._stored_optimized_layer_data[build_plate] = result.getLayerMessages()
+        CuraApplication.getInstance().getPrintInformation().slice_uuid = str(uuid.uuid4())
+        # Like the engine, the estimates come before slicing is finished, so they're filled in the g-code.
+        self.printDurationMessage.emit(build_plate, result.print_times, result.material_amounts)
+        self._finishSlicing()
+
+    def _finishSlicing(self) -> None:
+        """Fills in the print information in the g-code, processes the layers if needed and slices what's next."""
+
         self.stopPlugins()
 
         self.setState(BackendState.Done)
@@ -828,14 +902,20 @@ class CuraEngineBackend(QObject, Backend):
             # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
             gcode_list = []
         application = CuraApplication.getInstance()
-        for index, line in enumerate(gcode_list):
-            replaced = line.replace("{print_time}", str(application.getPrintInformation().currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)))
-            replaced = replaced.replace("{filament_amount}", str(application.getPrintInformation().materialLengths))
-            replaced = replaced.replace("{filament_weight}", str(application.getPrintInformation().materialWeights))
-            replaced = replaced.replace("{filament_cost}", str(application.getPrintInformation().materialCosts))
-            replaced = replaced.replace("{jobname}", str(application.getPrintInformation().jobName))
-
-            gcode_list[index] = replaced
+        # Only the layers that had placeholders when they arrived are searched, usually just the header.
+        placeholder_layers = self._gcode_placeholder_layers.pop(self._start_slice_job_build_plate, [])
+        if placeholder_layers:
+            print_information = application.getPrintInformation()
+            replacements = {
+                "print_time": str(print_information.currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)),
+                "filament_amount": str(print_information.materialLengths),
+                "filament_weight": str(print_information.materialWeights),
+                "filament_cost": str(print_information.materialCosts),
+                "jobname": str(print_information.jobName)
+            }
+            for index in placeholder_layers:
+                if index < len(gcode_list):
+                    gcode_list[index] = self._placeholder_regex.sub(lambda match: replacements[match.group(1)], gcode_list[index])
 
         self._slicing = False
         if self._time_start_process:
@@ -845,6 +925,13 @@ class CuraEngineBackend(QObject, Backend):
         # See if we need to process the sliced layers job.
         active_build_plate = application.getMultiBuildPlateModel().activeBuildPlate
         if (
+            self._process_layers_job is not None and
+            self._process_layers_job.isStreaming() and
+            self._process_layers_job.getBuildPlate() == self._start_slice_job_build_plate):
+
+            # The layers are already being processed, they are complete now.
+            self._process_layers_job.setSlicingFinished()
+        elif (
             self._layer_view_active and
             (self._process_layers_job is None or not self._process_layers_job.isRunning()) and
             active_build_plate == self._start_slice_job_build_plate and
@@ -869,7 +956,11 @@ class CuraEngineBackend(QObject, Backend):
         """
 
         try:
-            self._scene.gcode_dict[self._start_slice_job_build_plate].append(message.data.decode("utf-8", "replace")) #type: ignore #Because we generate this attribute dynamically.
+            gcode_list = self._scene.gcode_dict[self._start_slice_job_build_plate] #type: ignore #Because we generate this attribute dynamically.
+            layer = message.data.decode("utf-8", "replace")
+            if self._placeholder_regex.search(layer):
+                self._gcode_placeholder_layers.setdefault(self._start_slice_job_build_plate, []).append(len(gcode_list))
+            gcode_list.append(layer)
         except KeyError:
             # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
             pass  # Throw the message away.
@@ -882,7 +973,14 @@ class CuraEngineBackend(QObject, Backend):
         """
 
         try:
-            self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data.decode("utf-8", "replace")) #type: ignore #Because we generate this attribute dynamically.
+            gcode_list = self._scene.gcode_dict[self._start_slice_job_build_plate] #type: ignore #Because we generate this attribute dynamically.
+            prefix = message.data.decode("utf-8", "replace")
+            # The prefix moves all layers with placeholders one down.
+            placeholder_layers = [index + 1 for index in self._gcode_placeholder_layers.get(self._start_slice_job_build_plate, [])]
+            if self._placeholder_regex.search(prefix):
+                placeholder_layers.insert(0, 0)
+            self._gcode_placeholder_layers[self._start_slice_job_build_plate] = placeholder_layers
+            gcode_list.insert(0, prefix)
         except KeyError:
             # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
             pass  # Throw the message away.
@@ -937,6 +1035,7 @@ class CuraEngineBackend(QObject, Backend):
             material_amounts.append(message.getRepeatedMessage("materialEstimates", index).material_amount)
 
         times = self._parseMessagePrintTimes(message)
+        self._slice_estimates = (times, material_amounts)
         self.printDurationMessage.emit(self._start_slice_job_build_plate, times, material_amounts)
 
     def _parseMessagePrintTimes(self, message: Arcus.PythonMessage) -> Dict[str, float]:
@@ -999,8 +1098,19 @@ class CuraEngineBackend(QObject, Backend):
             source = self._postponed_scene_change_sources.pop(0)
             self._onSceneChanged(source)
 
-    def _startProcessSlicedLayersJob(self, build_plate_number: int) -> None:
-        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number])
+    def _canStreamLayers(self) -> bool:
+        """Whether the layers that the engine is slicing right now can be shown before it finishes."""
+
+        if not self._slicing or not self._layer_view_active or self._process_layers_job is not None:
+            return False
+        if not CuraApplication.getInstance().getPreferences().getValue("view/process_layers_while_slicing"):
+            return False
+        active_build_plate = CuraApplication.getInstance().getMultiBuildPlateModel().activeBuildPlate
+        return (active_build_plate == self._start_slice_job_build_plate and
+                active_build_plate not in self._build_plates_to_be_sliced)
+
+    def _startProcessSlicedLayersJob(self, build_plate_number: int, streaming: bool = False) -> None:
+        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number], streaming = streaming)
         self._process_layers_job.setBuildPlate(build_plate_number)
         self._process_layers_job.finished.connect(self._onProcessLayersFinished)
         self._process_layers_job.start()
@@ -1023,6 +1133,9 @@ class CuraEngineBackend(QObject, Backend):
                     active_build_plate not in self._build_plates_to_be_sliced):
 
                     self._startProcessSlicedLayersJob(active_build_plate)
+                elif active_build_plate in self._stored_optimized_layer_data and self._canStreamLayers():
+                    # Show the layers that the engine sliced so far, and the rest as they come in.
+                    self._startProcessSlicedLayersJob(active_build_plate, streaming = True)
             else:
                 self._layer_view_active = False
 
@@ -1062,6 +1175,7 @@ class CuraEngineBackend(QObject, Backend):
                 extruder.containersChanged.disconnect(self._onChanged)
 
         self._global_container_stack = CuraApplication.getInstance().getMachineManager().activeMachine
+        self._setting_value_cache.clear()
 
         if self._global_container_stack:
             # Note: Only starts slicing when the value changed.
@@ -1074,11 +1188,15 @@ class CuraEngineBackend(QObject, Backend):
             self._onChanged()
 
     def _onProcessLayersFinished(self, job: ProcessSlicedLayersJob) -> None:
-        if job.getBuildPlate() in self._stored_optimized_layer_data:
-            del self._stored_optimized_layer_data[job.getBuildPlate()]
+        if job is not self._process_layers_job:
+            # An aborted job. The layer data that is stored now belongs to the next slice.
+            Logger.log("d", "Process layers job for buildplate %s was aborted", job.getBuildPlate())
         else:
-            Logger.log("w", "The optimized layer data was already deleted for buildplate %s", job.getBuildPlate())
-        self._process_layers_job = None
+            if job.getBuildPlate() in self._stored_optimized_layer_data:
+                del self._stored_optimized_layer_data[job.getBuildPlate()]
+            else:
+                Logger.log("w", "The optimized layer data was already deleted for buildplate %s", job.getBuildPlate())
+            self._process_layers_job = None
         Logger.log("d", "See if there is more to slice(2)...")
         self._invokeSlice()
 
@@ -1098,7 +1216,17 @@ class CuraEngineBackend(QObject, Backend):
             self._use_timer = False
             self._change_timer.timeout.disconnect(self.slice)
 
+    def _getSliceResultCacheSize(self) -> int:
+        size = CuraApplication.getInstance().getPreferences().getValue("general/slice_result_cache_size")
+        try:
+            return max(0, int(size)) * 1024 * 1024
+        except (TypeError, ValueError):
+            return 0
+
     def _onPreferencesChanged(self, preference: str) -> None:
+        if preference == "general/slice_result_cache_size":
+            self._slice_result_cache.setMaxSize(self._getSliceResultCacheSize())
+            return
         if preference != "general/auto_slice" and preference != "info/send_engine_crash" and preference != "info/anonymous_engine_crash_report":
             return
         if preference == "general/auto_slice":
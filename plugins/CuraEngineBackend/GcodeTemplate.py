@@ -0,0 +1,129 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import re
+import threading
+from collections import OrderedDict
+from string import Formatter
+from types import CodeType
+from typing import List, Optional, Set, Tuple, Union
+
+from UM.Settings.SettingFunction import SettingFunction
+
+# The following variables are not settings, but only become available after slicing. They are kept as they are, and
+# replaced when the actual values are known.
+POST_SLICE_DATA_VARIABLES = {"filament_cost", "print_time", "filament_amount", "filament_weight", "jobname"}
+
+
+class GcodeField:
+    """An expression between curly braces in start or end g-code, with the extruder to evaluate it for.
+
+    If the expression is formatted as "{[expression], [extruder_nr]}", it is evaluated with the extruder stack of the
+    specified extruder_nr. The extruder_nr can be a number or the name of a setting of the global stack.
+    """
+
+    _extruder_regex = re.compile(r"^\s*(?P<expression>.*)\s*,\s*(?P<extruder_nr_expr>.*)\s*$")
+
+    def __init__(self, field_name: str, format_spec: Union[str, "GcodeTemplate"], conversion: Optional[str]) -> None:
+        self.field_name = field_name
+        self.format_spec = format_spec
+        self.conversion = conversion
+
+        self.is_post_slice_data = field_name in POST_SLICE_DATA_VARIABLES
+        self.expression = field_name
+        self.extruder_nr_expression = None  # type: Optional[str]
+        match = self._extruder_regex.match(field_name)
+        if match:
+            self.expression = match.group("expression")
+            self.extruder_nr_expression = match.group("extruder_nr_expr")
+
+        self._function = None  # type: Optional[SettingFunction]
+        self.names = self._findNames(self.expression) if not self.is_post_slice_data else set()  # type: Set[str]
+
+    def getFunction(self) -> SettingFunction:
+        """The expression as setting function. Made when it's first evaluated."""
+
+        if self._function is None:
+            self._function = SettingFunction(self.expression)
+        return self._function
+
+    @staticmethod
+    def _findNames(expression: str) -> Set[str]:
+        """All names that the expression could read, so only those need to be given to it."""
+
+        try:
+            code = compile(expression, "<g-code>", "eval")
+        except SyntaxError:
+            return set()
+        names = set()  # type: Set[str]
+        codes = [code]
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(constant for constant in code.co_consts if isinstance(constant, CodeType))
+        return names
+
+
+class GcodeTemplate:
+    """Start or end g-code, parsed once into its literal text and its fields.
+
+    Parsing and compiling the expressions of the fields is done once per text, instead of every time the g-code is
+    expanded. Every field knows which names its expression reads, so only those settings are given to it.
+    """
+
+    __cache = OrderedDict()  # type: OrderedDict[Tuple[str, str], GcodeTemplate]
+    __cache_lock = threading.Lock()
+    __cache_capacity = 64
+
+    def __init__(self, text: str) -> None:
+        self._parts = []  # type: List[Tuple[str, Optional[GcodeField]]]
+        auto_field_number = 0
+        for literal_text, field_name, format_spec, conversion in Formatter().parse(text):
+            if field_name is None:
+                self._parts.append((literal_text, None))
+                continue
+            if field_name == "":
+                # Like str.format, empty braces are numbered.
+                field_name = str(auto_field_number)
+                auto_field_number += 1
+            spec = GcodeTemplate(format_spec) if "{" in format_spec else format_spec  # type: Union[str, GcodeTemplate]
+            self._parts.append((literal_text, GcodeField(field_name, spec, conversion)))
+
+    @classmethod
+    def getTemplate(cls, definition_id: str, text: str) -> "GcodeTemplate":
+        """The template of a text, parsed once per machine definition and kept while it is in use."""
+
+        key = (definition_id, text)
+        with cls.__cache_lock:
+            template = cls.__cache.get(key)
+            if template is not None:
+                cls.__cache.move_to_end(key)
+                return template
+
+        template = GcodeTemplate(text)
+
+        with cls.__cache_lock:
+            cls.__cache[key] = template
+            while len(cls.__cache) > cls.__cache_capacity:
+                cls.__cache.popitem(last = False)
+        return template
+
+    def getFields(self) -> List[GcodeField]:
+        return [field for _, field in self._parts if field is not None]
+
+    def render(self, formatter: Formatter) -> str:
+        """Expands the template.
+
+        :param formatter: Evaluates the fields with ``evaluate(field)`` and formats their values.
+        """
+
+        result = []  # type: List[str]
+        for literal_text, field in self._parts:
+            result.append(literal_text)
+            if field is None:
+                continue
+            value = formatter.evaluate(field)
+            value = formatter.convert_field(value, field.conversion)
+            format_spec = field.format_spec.render(formatter) if isinstance(field.format_spec, GcodeTemplate) else field.format_spec
+            result.append(formatter.format_field(value, format_spec))
+        return "".join(result)
@@ -0,0 +1,99 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from itertools import accumulate
+from typing import Any, Iterator, List, Tuple
+
+import numpy
+
+# What a decoded path segment looks like: extruder, line types, points, widths, thicknesses and feedrates.
+DecodedSegment = Tuple[int, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+
+
+def _offsets(sizes: List[int]) -> List[int]:
+    """Where every segment starts in the joined array, followed by the total size."""
+    return list(accumulate(sizes, initial = 0))
+
+
+class DecodedLayer:
+    """The path segments of one ``LayerOptimized`` message, decoded into contiguous arrays.
+
+    All the buffers of a field are joined and converted with a single NumPy call, instead of four or five calls per
+    segment. Every field has an offsets table with where each segment starts, so the arrays of a segment are views
+    into the arrays of the layer.
+    """
+
+    def __init__(self, layer: Any) -> None:
+        segment_count = layer.repeatedMessageCount("path_segment")
+        segments = [layer.getRepeatedMessage("path_segment", index) for index in range(segment_count)]
+
+        self.extruders = [segment.extruder for segment in segments]
+
+        # The line types can be changed by LayerPolygon when they are invalid, so they must be writable.
+        line_types = b"".join(segment.line_type for segment in segments)
+        self.line_types = numpy.frombuffer(line_types, dtype = "u1").reshape((-1, 1)).copy()
+        self.line_type_offsets = _offsets([len(segment.line_type) for segment in segments])
+        self.line_widths, self.line_width_offsets = self._joinFloats(segments, "line_width")
+        self.line_thicknesses, self.line_thickness_offsets = self._joinFloats(segments, "line_thickness")
+        self.line_feedrates, self.line_feedrate_offsets = self._joinFloats(segments, "line_feedrate")
+
+        self.points, self.point_offsets = self._decodePoints(segments, layer.height / 1000)  # layer height value is in backend representation
+
+    @staticmethod
+    def _joinFloats(segments: List[Any], field: str) -> Tuple[numpy.ndarray, List[int]]:
+        buffers = [getattr(segment, field) for segment in segments]
+        values = numpy.frombuffer(b"".join(buffers), dtype = "f4").reshape((-1, 1))
+        return values, _offsets([len(buffer) // 4 for buffer in buffers])
+
+    @staticmethod
+    def _decodePoints(segments: List[Any], height: float) -> Tuple[numpy.ndarray, List[int]]:
+        """Converts the 2D or 3D points of the engine into the X, Z, -Y points of the layer view.
+
+        2D points get the height of the layer.
+        """
+        buffers = [segment.points for segment in segments]
+        coordinates = numpy.frombuffer(b"".join(buffers), dtype = "f4")
+        dimensions = numpy.array([2 if segment.point_type == 0 else 3 for segment in segments], dtype = numpy.int64)
+        coordinate_counts = numpy.array([len(buffer) // 4 for buffer in buffers], dtype = numpy.int64)
+        point_counts = coordinate_counts // dimensions
+        point_offsets = _offsets(point_counts.tolist())
+
+        points = numpy.empty((point_offsets[-1], 3), numpy.float32)
+        if (dimensions == 2).all():
+            coordinates = coordinates.reshape((-1, 2))
+            points[:, 0] = coordinates[:, 0]
+            points[:, 1] = height
+            points[:, 2] = -coordinates[:, 1]
+        elif (dimensions == 3).all():
+            coordinates = coordinates.reshape((-1, 3))
+            points[:, 0] = coordinates[:, 0]
+            points[:, 1] = coordinates[:, 2]
+            points[:, 2] = -coordinates[:, 1]
+        else:
+            # Mixed 2D and 3D segments: index the first coordinate of every point in the joined buffer.
+            point_dimensions = numpy.repeat(dimensions, point_counts)
+            segment_starts = numpy.repeat(numpy.array(_offsets(coordinate_counts.tolist())[:-1], dtype = numpy.int64), point_counts)
+            index_in_segment = numpy.arange(len(points)) - numpy.repeat(numpy.array(point_offsets[:-1], dtype = numpy.int64), point_counts)
+            first = segment_starts + index_in_segment * point_dimensions
+            points[:, 0] = coordinates[first]
+            points[:, 1] = height
+            is_3d = point_dimensions == 3
+            points[is_3d, 1] = coordinates[first[is_3d] + 2]
+            points[:, 2] = -coordinates[first + 1]
+        return points, point_offsets
+
+    def __len__(self) -> int:
+        return len(self.extruders)
+
+    def segment(self, index: int) -> DecodedSegment:
+        """The arrays of one path segment, in the order the LayerPolygon constructor takes them."""
+        return (self.extruders[index],
+                self.line_types[self.line_type_offsets[index]:self.line_type_offsets[index + 1]],
+                self.points[self.point_offsets[index]:self.point_offsets[index + 1]],
+                self.line_widths[self.line_width_offsets[index]:self.line_width_offsets[index + 1]],
+                self.line_thicknesses[self.line_thickness_offsets[index]:self.line_thickness_offsets[index + 1]],
+                self.line_feedrates[self.line_feedrate_offsets[index]:self.line_feedrate_offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[DecodedSegment]:
+        for index in range(len(self)):
+            yield self.segment(index)
@@ -0,0 +1,124 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy
+
+if TYPE_CHECKING:
+    from UM.Math.Matrix import Matrix
+    from UM.Mesh.MeshData import MeshData
+    from UM.Scene.SceneNode import SceneNode
+
+
+def transformVertices(mesh_data: "MeshData", transformation: "Matrix") -> numpy.ndarray:
+    """The corners of the faces of a mesh in the world, in the Z up axes of CuraEngine."""
+
+    rot_scale = transformation.getTransposed().getData()[0:3, 0:3]
+    translate = transformation.getData()[:3, 3]
+
+    # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
+    verts = mesh_data.getVertices()
+    verts = verts.dot(rot_scale)
+    verts += translate
+
+    # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
+    verts[:, [1, 2]] = verts[:, [2, 1]]
+    verts[:, 1] *= -1
+
+    indices = mesh_data.getIndices()
+    if indices is not None:
+        return numpy.take(verts, indices.flatten(), axis=0)
+    return numpy.array(verts)
+
+
+class MeshTransformationCache:
+    """The vertices that StartSliceJob sends for the scene nodes, per mesh data and world transformation.
+
+    Making them takes a matrix product and an index look up over every vertex of every object. After a change of only
+    the settings no mesh moved, so the vertices of the previous slice are sent again. The shadow nodes of the
+    duplication print modes share the mesh data of their original and only differ in their transformation.
+
+    The vertices that are not cached are made in a thread pool, since NumPy releases the GIL for them. Only the
+    vertices of the last slice are kept, and the cache does not keep the mesh data alive.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        # id of the mesh data -> (reference to the mesh data, transformation -> vertices)
+        self._entries = {}  # type: Dict[int, Tuple[weakref.ref, Dict[bytes, numpy.ndarray]]]
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def getVertices(self, nodes: List["SceneNode"]) -> List[Optional[numpy.ndarray]]:
+        """The vertices to send for every node, or None for the nodes without mesh data.
+
+        The vertices are shared with the cache, so they must not be changed.
+        """
+
+        keys = []  # type: List[Optional[Tuple[MeshData, Matrix, bytes]]]
+        for node in nodes:
+            mesh_data = node.getMeshData()
+            if mesh_data is None:
+                keys.append(None)
+                continue
+            transformation = node.getWorldTransformation()
+            keys.append((mesh_data, transformation, transformation.getData().tobytes()))
+
+        entries = {}  # type: Dict[int, Tuple[weakref.ref, Dict[bytes, numpy.ndarray]]]
+        missing = {}  # type: Dict[Tuple[int, bytes], Tuple[MeshData, Matrix]]
+        with self._lock:
+            for key in keys:
+                if key is None:
+                    continue
+                mesh_data, transformation, transformation_key = key
+                if id(mesh_data) in entries and transformation_key in entries[id(mesh_data)][1]:
+                    continue
+                entry = entries.setdefault(id(mesh_data), (weakref.ref(mesh_data), {}))
+                vertices = self._find(mesh_data, transformation_key)
+                if vertices is not None:
+                    entry[1][transformation_key] = vertices
+                    self._hits += 1
+                elif (id(mesh_data), transformation_key) not in missing:
+                    missing[(id(mesh_data), transformation_key)] = (mesh_data, transformation)
+                    self._misses += 1
+
+        if len(missing) > 1:
+            computed = list(self._getExecutor().map(lambda args: transformVertices(*args), missing.values()))
+        else:
+            computed = [transformVertices(*args) for args in missing.values()]
+        for (mesh_id, transformation_key), vertices in zip(missing.keys(), computed):
+            entries[mesh_id][1][transformation_key] = vertices
+
+        with self._lock:
+            self._entries = entries
+        return [entries[id(key[0])][1][key[2]] if key is not None else None for key in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+    def getStatistics(self) -> Dict[str, int]:
+        """The number of vertex lists that were found and not found in the cache, and the number of them it holds."""
+
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": sum(len(entry[1]) for entry in self._entries.values())}
+
+    def _find(self, mesh_data: "MeshData", transformation_key: bytes) -> Optional[numpy.ndarray]:
+        entry = self._entries.get(id(mesh_data))
+        # Another mesh data can get the id of one that was removed.
+        if entry is None or entry[0]() is not mesh_data:
+            return None
+        return entry[1].get(transformation_key)
+
+    def _getExecutor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="MeshTransformation")
+            return self._executor
@@ -3,6 +3,7 @@
 
 import gc
 import sys
+import threading
 
 from UM.Job import Job
 from UM.Application import Application
@@ -24,7 +25,9 @@ from cura import LayerPolygon
 
 import numpy
 from time import time
+from typing import Dict, List, Tuple
 from cura.Machines.Models.ExtrudersModel import ExtrudersModel
+from .LayerDecoder import DecodedLayer
 catalog = i18nCatalog("cura")
 
 
@@ -45,7 +48,17 @@ def colorCodeToRGBA(color_code):
 
 
 class ProcessSlicedLayersJob(Job):
-    def __init__(self, layers):
+    # While streaming, the layer view is first shown when this many layers are processed. Every next preview waits
+    # for twice as many layers, so rebuilding the previews takes at most as long as building the final layer data.
+    first_preview_layer_count = 16
+
+    def __init__(self, layers, streaming = False):
+        """
+        :param layers: The LayerOptimized messages of the engine.
+        :param streaming: Whether the engine is still slicing. The messages it sends are appended to ``layers`` and
+        the layers processed so far are shown until ``setSlicingFinished`` is called.
+        """
+
         super().__init__()
         self._layers = layers
         self._scene = Application.getInstance().getController().getScene()
@@ -53,6 +66,13 @@ class ProcessSlicedLayersJob(Job):
         self._abort_requested = False
         self._build_plate_number = None
 
+        self._streaming = streaming
+        self._slicing_finished = not streaming
+        self._layers_received = threading.Event()  # Set whenever the engine sent a layer or finished slicing.
+
+        # Decoded layers by layer number: height, thickness and polygons.
+        self._processed_layers = {}  # type: Dict[int, Tuple[float, float, List[LayerPolygon.LayerPolygon]]]
+
     def abort(self):
         """Aborts the processing of layers.
 
@@ -63,6 +83,7 @@ class ProcessSlicedLayersJob(Job):
         """
 
         self._abort_requested = True
+        self._layers_received.set()
 
     def setBuildPlate(self, new_value):
         self._build_plate_number = new_value
@@ -70,6 +91,22 @@ class ProcessSlicedLayersJob(Job):
     def getBuildPlate(self):
         return self._build_plate_number
 
+    def isStreaming(self) -> bool:
+        """Whether this job was started while the engine was still slicing."""
+
+        return self._streaming
+
+    def notifyLayerReceived(self) -> None:
+        """Called by the backend when it appended a layer message while streaming."""
+
+        self._layers_received.set()
+
+    def setSlicingFinished(self) -> None:
+        """Called by the backend when the engine sent all the layers."""
+
+        self._slicing_finished = True
+        self._layers_received.set()
+
     def run(self):
         Logger.log("d", "Processing new layer for build plate %s..." % self._build_plate_number)
         start_time = time()
@@ -88,6 +125,8 @@ class ProcessSlicedLayersJob(Job):
         # The no_setting_override is here because adding the SettingOverrideDecorator will trigger a reslice
         new_node = CuraSceneNode(no_setting_override = True)
         new_node.addDecorator(BuildPlateDecorator(self._build_plate_number))
+        decorator = LayerDataDecorator.LayerDataDecorator()
+        new_node.addDecorator(decorator)
 
         # Force garbage collection.
         # For some reason, Python has a tendency to keep the layer data
@@ -95,9 +134,85 @@ class ProcessSlicedLayersJob(Job):
         # sure any old layer data is really cleaned up before adding new.
         gc.collect()
 
-        mesh = MeshData()
+        next_layer = 0
+        next_preview_layer_count = self.first_preview_layer_count
+        while True:
+            # Read the flag before the messages, so that the last layers are not missed when slicing finishes meanwhile.
+            self._layers_received.clear()
+            slicing_finished = self._slicing_finished
+            while next_layer < len(self._layers):
+                self._processLayer(self._layers[next_layer])
+                next_layer += 1
+
+                Job.yieldThread()
+                if self._abort_requested:
+                    self._abortProcessing(new_node)
+                    return
+                if self._progress_message:
+                    # While streaming, the progress runs ahead and catches up with the engine.
+                    self._progress_message.setProgress((next_layer / len(self._layers)) * 99)
+
+            if slicing_finished:
+                break
+            if len(self._processed_layers) >= next_preview_layer_count:
+                # Show what the engine has sliced so far.
+                layer_mesh = self._buildLayerMesh()
+                if self._abort_requested:
+                    self._abortProcessing(new_node)
+                    return
+                self._showLayerMesh(new_node, decorator, layer_mesh)
+                next_preview_layer_count *= 2
+            self._layers_received.wait()
+            if self._abort_requested:
+                self._abortProcessing(new_node)
+                return
+
+        # We are done processing all the layers we got from the engine, now create a mesh out of the data
+        layer_mesh = self._buildLayerMesh()
+
+        if self._abort_requested:
+            self._abortProcessing(new_node)
+            return
+
+        self._showLayerMesh(new_node, decorator, layer_mesh)  # Note: After this we can no longer abort!
+
+        if self._progress_message:
+            self._progress_message.setProgress(100)
+
+        if self._progress_message:
+            self._progress_message.hide()
+
+        # Clear the unparsed layers. This saves us a bunch of memory if the Job does not get destroyed.
+        self._layers = None
+        self._processed_layers = {}
+
+        Logger.log("d", "Processing layers took %s seconds", time() - start_time)
+        memory_usage = layer_mesh.getMemoryUsage()
+        Logger.log("d", "The %slayer data takes %.1f MB: %s", "compact " if layer_mesh.isCompact() else "",
+                   sum(memory_usage.values()) / 1e6, ", ".join("%s %.1f MB" % (name, size / 1e6) for name, size in memory_usage.items()))
+
+    def _processLayer(self, layer) -> None:
+        """Converts the path segments of a LayerOptimized message into polygons."""
+
+        polygons = []
+        # All the path segments of the layer are decoded at once, the polygons are views into the layer arrays.
+        for extruder, line_types, points, line_widths, line_thicknesses, line_feedrates in DecodedLayer(layer):
+            this_poly = LayerPolygon.LayerPolygon(extruder, line_types, points, line_widths, line_thicknesses, line_feedrates)
+            this_poly.buildCache()
+
+            polygons.append(this_poly)
+
+        processed_layer = self._processed_layers.get(layer.id)
+        if processed_layer is not None:
+            # In one-at-a-time mode every mesh group sends its own layers with the same numbers.
+            processed_layer[2].extend(polygons)
+        else:
+            self._processed_layers[layer.id] = (layer.height, layer.thickness, polygons)
+
+    def _buildLayerMesh(self):
+        """Creates the layer data of the layers processed so far."""
+
         layer_data = LayerDataBuilder.LayerDataBuilder()
-        layer_count = len(self._layers)
 
         # Find the minimum layer number
         # When disabling the remove empty first layers setting, the minimum layer number will be a positive
@@ -108,90 +223,31 @@ class ProcessSlicedLayersJob(Job):
         # raft layer has value -8 but there are just 4 raft (negative) layers.
         min_layer_number = sys.maxsize
         negative_layers = 0
-        for layer in self._layers:
-            if layer.repeatedMessageCount("path_segment") > 0:
-                if layer.id < min_layer_number:
-                    min_layer_number = layer.id
-                if layer.id < 0:
+        for layer_id, (height, thickness, polygons) in self._processed_layers.items():
+            if polygons:
+                if layer_id < min_layer_number:
+                    min_layer_number = layer_id
+                if layer_id < 0:
                     negative_layers += 1
 
-        current_layer = 0
-
-        for layer in self._layers:
+        for layer_id, (height, thickness, polygons) in self._processed_layers.items():
             # If the layer is below the minimum, it means that there is no data, so that we don't create a layer
             # data. However, if there are empty layers in between, we compute them.
-            if layer.id < min_layer_number:
+            if layer_id < min_layer_number:
                 continue
 
             # Layers are offset by the minimum layer number. In case the raft (negative layers) is being used,
             # then the absolute layer number is adjusted by removing the empty layers that can be in between raft
             # and the model
-            abs_layer_number = layer.id - min_layer_number
-            if layer.id >= 0 and negative_layers != 0:
+            abs_layer_number = layer_id - min_layer_number
+            if layer_id >= 0 and negative_layers != 0:
                 abs_layer_number += (min_layer_number + negative_layers)
 
             layer_data.addLayer(abs_layer_number)
             this_layer = layer_data.getLayer(abs_layer_number)
-            layer_data.setLayerHeight(abs_layer_number, layer.height)
-            layer_data.setLayerThickness(abs_layer_number, layer.thickness)
-
-            for p in range(layer.repeatedMessageCount("path_segment")):
-                polygon = layer.getRepeatedMessage("path_segment", p)
-
-                extruder = polygon.extruder
-
-                line_types = numpy.fromstring(polygon.line_type, dtype = "u1")  # Convert bytearray to numpy array
-
-                line_types = line_types.reshape((-1,1))
-
-                points = numpy.fromstring(polygon.points, dtype = "f4")  # Convert bytearray to numpy array
-                if polygon.point_type == 0: # Point2D
-                    points = points.reshape((-1,2))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
-                else:  # Point3D
-                    points = points.reshape((-1,3))
-
-                line_widths = numpy.fromstring(polygon.line_width, dtype = "f4")  # Convert bytearray to numpy array
-                line_widths = line_widths.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
-
-                line_thicknesses = numpy.fromstring(polygon.line_thickness, dtype = "f4")  # Convert bytearray to numpy array
-                line_thicknesses = line_thicknesses.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
-
-                line_feedrates = numpy.fromstring(polygon.line_feedrate, dtype = "f4")  # Convert bytearray to numpy array
-                line_feedrates = line_feedrates.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
-
-                # Create a new 3D-array, copy the 2D points over and insert the right height.
-                # This uses manual array creation + copy rather than numpy.insert since this is
-                # faster.
-                new_points = numpy.empty((len(points), 3), numpy.float32)
-                if polygon.point_type == 0:  # Point2D
-                    new_points[:, 0] = points[:, 0]
-                    new_points[:, 1] = layer.height / 1000  # layer height value is in backend representation
-                    new_points[:, 2] = -points[:, 1]
-                else: # Point3D
-                    new_points[:, 0] = points[:, 0]
-                    new_points[:, 1] = points[:, 2]
-                    new_points[:, 2] = -points[:, 1]
-
-                this_poly = LayerPolygon.LayerPolygon(extruder, line_types, new_points, line_widths, line_thicknesses, line_feedrates)
-                this_poly.buildCache()
-
-                this_layer.polygons.append(this_poly)
-
-                Job.yieldThread()
-            Job.yieldThread()
-            current_layer += 1
-            progress = (current_layer / layer_count) * 99
-            # TODO: Rebuild the layer data mesh once the layer has been processed.
-            # This needs some work in LayerData so we can add the new layers instead of recreating the entire mesh.
-
-            if self._abort_requested:
-                if self._progress_message:
-                    self._progress_message.hide()
-                return
-            if self._progress_message:
-                self._progress_message.setProgress(progress)
-
-        # We are done processing all the layers we got from the engine, now create a mesh out of the data
+            layer_data.setLayerHeight(abs_layer_number, height)
+            layer_data.setLayerThickness(abs_layer_number, thickness)
+            this_layer.polygons.extend(polygons)
 
         # Find out colors per extruder
         global_container_stack = Application.getInstance().getGlobalContainerStack()
@@ -220,38 +276,39 @@ class ProcessSlicedLayersJob(Job):
             line_type_brightness = 0.5  # for compatibility mode
         else:
             line_type_brightness = 1.0
-        layer_mesh = layer_data.build(material_color_map, line_type_brightness)
+        compact = bool(Application.getInstance().getPreferences().getValue("view/compact_layer_data"))
+        return layer_data.build(material_color_map, line_type_brightness, compact)
 
-        if self._abort_requested:
-            if self._progress_message:
-                self._progress_message.hide()
-            return
+    def _showLayerMesh(self, new_node, decorator, layer_mesh) -> None:
+        """Puts the layer data on the scene, or replaces the layers shown while streaming."""
 
         # Add LayerDataDecorator to scene node to indicate that the node has layer data
-        decorator = LayerDataDecorator.LayerDataDecorator()
         decorator.setLayerData(layer_mesh)
-        new_node.addDecorator(decorator)
 
-        new_node.setMeshData(mesh)
+        view = Application.getInstance().getController().getActiveView()
+        if view.getPluginId() == "SimulationView":
+            view.resetLayerData()
+
+        # Setting the mesh data also lets the views know that the layers changed.
+        new_node.setMeshData(MeshData())
+        if new_node.getParent() is not None:
+            return
+
         # Set build volume as parent, the build volume can move as a result of raft settings.
         # It makes sense to set the build volume as parent: the print is actually printed on it.
         new_node_parent = Application.getInstance().getBuildVolume()
-        new_node.setParent(new_node_parent)  # Note: After this we can no longer abort!
+        new_node.setParent(new_node_parent)
 
         settings = Application.getInstance().getGlobalContainerStack()
         if not settings.getProperty("machine_center_is_zero", "value"):
             new_node.setPosition(Vector(-settings.getProperty("machine_width", "value") / 2, 0.0, settings.getProperty("machine_depth", "value") / 2))
 
-        if self._progress_message:
-            self._progress_message.setProgress(100)
-
+    def _abortProcessing(self, new_node) -> None:
         if self._progress_message:
             self._progress_message.hide()
-
-        # Clear the unparsed layers. This saves us a bunch of memory if the Job does not get destroyed.
-        self._layers = None
-
-        Logger.log("d", "Processing layers took %s seconds", time() - start_time)
+        if new_node.getParent() is not None:
+            # Remove the layers shown while streaming, they belong to a slice that won't finish.
+            new_node.setParent(None)
 
     def _onActiveViewChanged(self):
         if self.isRunning():
@@ -0,0 +1,156 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, TYPE_CHECKING
+
+from UM.Settings.SettingRelation import RelationType
+
+if TYPE_CHECKING:
+    from UM.Settings.ContainerStack import ContainerStack
+
+
+class SettingValueCache:
+    """The properties of the settings of the stacks, as StartSliceJob resolves them for every slice.
+
+    Evaluating the value functions of all settings takes most of the time of StartSliceJob, while between two slices
+    usually only a few settings change. The cache listens to the ``propertyChanged`` signal of every stack it was
+    asked about, and forgets a changed setting and the settings that depend on it in all stacks. The same goes for
+    ``propertiesChanged``, which is emitted for all settings when an extruder is enabled or disabled. A change of the
+    containers of a stack forgets everything. The cache does not keep the stacks alive.
+    """
+
+    def __init__(self) -> None:
+        # id of the stack -> (reference to the stack, reference to its next stack, key -> property name -> value)
+        self._stacks = {}  # type: Dict[int, Tuple[weakref.ref, Optional[weakref.ref], Dict[str, Dict[str, Any]]]]
+        # key -> the keys of the settings whose properties depend on it, including itself.
+        self._dependents = {}  # type: Dict[str, Set[str]]
+        # key -> the keys of the settings whose value or extruder depends on it, including itself.
+        self._related_keys = {}  # type: Dict[str, Set[str]]
+        self._lock = threading.RLock()
+        # Counts the changes, so that a value evaluated during a change isn't stored.
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def getProperty(self, stack: "ContainerStack", key: str, property_name: str = "value") -> Any:
+        with self._lock:
+            values = self._getValues(stack)
+            properties = values.get(key)
+            if properties is not None and property_name in properties:
+                self._hits += 1
+                return properties[property_name]
+            self._misses += 1
+            generation = self._generation
+
+        value = stack.getProperty(key, property_name)
+
+        with self._lock:
+            if generation == self._generation:
+                values.setdefault(key, {})[property_name] = value
+        return value
+
+    def getRelatedKeys(self, stack: "ContainerStack", keys: Iterable[str]) -> Set[str]:
+        """The keys and the keys of all settings whose value or extruder depends on them.
+
+        :param stack: A stack with the definitions of the settings.
+        """
+
+        result = set()  # type: Set[str]
+        with self._lock:
+            for key in keys:
+                related_keys = self._related_keys.get(key)
+                if related_keys is None:
+                    related_keys = self._findDependents(stack, key, roles = {"value", "limit_to_extruder"})
+                    self._related_keys[key] = related_keys
+                result |= related_keys
+        return result
+
+    def clear(self) -> None:
+        """Forgets all properties and relations, for instance because another printer was activated."""
+
+        with self._lock:
+            self._generation += 1
+            for stack_reference, _, values in self._stacks.values():
+                stack = stack_reference()
+                if stack is not None:
+                    self._disconnect(stack)
+            self._stacks = {}
+            self._dependents = {}
+            self._related_keys = {}
+
+    def getStatistics(self) -> Dict[str, int]:
+        """The number of properties that were found and not found in the cache, and the number of stacks it holds."""
+
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "stacks": len(self._stacks)}
+
+    def _getValues(self, stack: "ContainerStack") -> Dict[str, Dict[str, Any]]:
+        next_stack = stack.getNextStack()
+        entry = self._stacks.get(id(stack))
+        if entry is not None and entry[0]() is stack:
+            # A stack of the settings per object gets another next stack when the object moves to another extruder.
+            if (entry[1]() if entry[1] is not None else None) is next_stack:
+                return entry[2]
+        else:
+            # Another stack can get the id of one that was removed.
+            self._stacks = {stack_id: other for stack_id, other in self._stacks.items() if other[0]() is not None}
+            stack.propertyChanged.connect(self._onPropertyChanged)
+            stack.propertiesChanged.connect(self._onPropertiesChanged)
+            stack.containersChanged.connect(self._onContainersChanged)
+
+        values = {}  # type: Dict[str, Dict[str, Any]]
+        self._stacks[id(stack)] = (weakref.ref(stack), weakref.ref(next_stack) if next_stack is not None else None, values)
+        return values
+
+    def _disconnect(self, stack: "ContainerStack") -> None:
+        stack.propertyChanged.disconnect(self._onPropertyChanged)
+        stack.propertiesChanged.disconnect(self._onPropertiesChanged)
+        stack.containersChanged.disconnect(self._onContainersChanged)
+
+    def _onPropertyChanged(self, key: str, property_name: str) -> None:
+        with self._lock:
+            self._generation += 1
+            dependents = self._dependents.get(key)
+            if dependents is None:
+                dependents = {key}
+                for stack_reference, _, _ in self._stacks.values():
+                    stack = stack_reference()
+                    if stack is not None:
+                        dependents = self._findDependents(stack, key)
+                        break
+                self._dependents[key] = dependents
+            for _, _, values in self._stacks.values():
+                for dependent in dependents:
+                    values.pop(dependent, None)
+
+    def _onPropertiesChanged(self, key: str, property_names: Any) -> None:
+        # Enabling or disabling an extruder emits this for every setting, since the values that are resolved over the
+        # enabled extruders change without a change of the containers.
+        self._onPropertyChanged(key, "value")
+
+    def _onContainersChanged(self, *args: Any) -> None:
+        with self._lock:
+            self._generation += 1
+            for _, _, values in self._stacks.values():
+                values.clear()
+
+    @staticmethod
+    def _findDependents(stack: "ContainerStack", key: str, roles: Optional[Set[str]] = None) -> Set[str]:
+        """The key and the keys of the settings that depend on it, through the relations of its definition.
+
+        :param roles: The properties of the dependent settings to follow, or None to follow all of them.
+        """
+
+        dependents = {key}
+        definition = stack.getSettingDefinition(key)
+        relations = list(definition.relations) if definition is not None else []
+        while relations:
+            relation = relations.pop()
+            if relation.type == RelationType.RequiresTarget or (roles is not None and relation.role not in roles):
+                continue
+            if relation.target.key not in dependents:
+                dependents.add(relation.target.key)
+                relations.extend(relation.target.relations)
+        return dependents
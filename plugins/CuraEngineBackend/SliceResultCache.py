@@ -0,0 +1,188 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import gzip
+import os
+import pickle
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from UM.Logger import Logger
+
+# The fields of the PathSegment message of Cura.proto that ProcessSlicedLayersJob reads.
+PATH_SEGMENT_FIELDS = ("extruder", "point_type", "points", "line_type", "line_width", "line_thickness", "line_feedrate")
+
+
+class StoredMessage:
+    """A layer message of the engine restored from the cache, with the interface of the Arcus messages."""
+
+    def __init__(self, fields: Dict[str, Any]) -> None:
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def repeatedMessageCount(self, name: str) -> int:
+        return len(getattr(self, name))
+
+    def getRepeatedMessage(self, name: str, index: int) -> "StoredMessage":
+        # The repeated messages are wrapped when they are read, in the thread that processes the layers.
+        return StoredMessage(getattr(self, name)[index])
+
+
+def storeLayerMessage(message: Any) -> Dict[str, Any]:
+    """The fields of a LayerOptimized message of the engine, as plain values that can be stored."""
+
+    segments = []
+    for index in range(message.repeatedMessageCount("path_segment")):
+        segment = message.getRepeatedMessage("path_segment", index)
+        segments.append({name: getattr(segment, name) for name in PATH_SEGMENT_FIELDS})
+    return {"id": message.id, "height": message.height, "thickness": message.thickness, "path_segment": segments}
+
+
+class SliceResult:
+    """What the engine sent for a slice: the g-code, the estimates and the layers for the layer view.
+
+    :param gcode: The g-code layers, before the print information placeholders are replaced.
+    :param placeholder_layers: The indices of the g-code layers with placeholders.
+    :param print_times: The estimated print time per feature, in seconds.
+    :param material_amounts: The estimated material amount per extruder.
+    :param layers: The LayerOptimized messages, as stored by ``storeLayerMessage``.
+    """
+
+    def __init__(self, gcode: List[str], placeholder_layers: List[int], print_times: Dict[str, float], material_amounts: List[float], layers: List[Dict[str, Any]]) -> None:
+        self.gcode = gcode
+        self.placeholder_layers = placeholder_layers
+        self.print_times = print_times
+        self.material_amounts = material_amounts
+        self.layers = layers
+
+    def getLayerMessages(self) -> List[StoredMessage]:
+        return [StoredMessage(layer) for layer in self.layers]
+
+
+class _ValuesOnlyUnpickler(pickle.Unpickler):
+    """Only loads built-in values, so a damaged or foreign cache file can't run code."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError("Slice result cache files can't contain %s.%s" % (module, name))
+
+
+class SliceResultCache:
+    """The results of earlier slices on disk, by the fingerprint of what was sent to the engine.
+
+    The fingerprint covers the meshes, their transformations and the resolved settings, so slicing the same scene
+    with the same settings again restores the result without the engine. Every result is a file in the directory. The
+    least recently used files are removed when they take more than the maximum size together.
+    """
+
+    Version = 1  # Results stored with another version are not used.
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        """
+        :param directory: Where the results are stored.
+        :param max_size: The maximum number of bytes of all stored results. 0 stores nothing.
+        """
+
+        self._directory = directory
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "SliceResultCache")
+
+    def setMaxSize(self, max_size: int) -> None:
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def isEnabled(self) -> bool:
+        return self._max_size > 0
+
+    def get(self, fingerprint: str) -> Optional[SliceResult]:
+        """The stored result of the slice with this fingerprint, or None if there is none."""
+
+        if not self.isEnabled():
+            return None
+        path = self._getPath(fingerprint)
+        with self._lock:
+            try:
+                with gzip.open(path, "rb") as f:
+                    stored = _ValuesOnlyUnpickler(f).load()
+                os.utime(path)  # The modification time orders the results by use.
+            except FileNotFoundError:
+                return None
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                Logger.logException("w", "Unable to read stored slice result %s, removing it", path)
+                self._remove(path)
+                return None
+        if not isinstance(stored, dict) or stored.get("version") != self.Version:
+            return None
+        return SliceResult(stored["gcode"], stored["placeholder_layers"], stored["print_times"], stored["material_amounts"], stored["layers"])
+
+    def put(self, fingerprint: str, gcode: List[str], placeholder_layers: List[int], print_times: Dict[str, float], material_amounts: List[float], layer_messages: List[Any]) -> "Future[None]":
+        """Stores the result of a slice in the background.
+
+        :param layer_messages: The LayerOptimized messages of the engine. They are read in the background.
+        """
+
+        return self._executor.submit(self._put, fingerprint, gcode, placeholder_layers, print_times, material_amounts, layer_messages)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._getStoredPaths():
+                self._remove(path)
+
+    def _put(self, fingerprint: str, gcode: List[str], placeholder_layers: List[int], print_times: Dict[str, float], material_amounts: List[float], layer_messages: List[Any]) -> None:
+        if not self.isEnabled():
+            return
+        path = self._getPath(fingerprint)
+        temporary_path = path + ".tmp"
+        try:
+            stored = {
+                "version": self.Version,
+                "gcode": gcode,
+                "placeholder_layers": placeholder_layers,
+                "print_times": print_times,
+                "material_amounts": material_amounts,
+                "layers": [storeLayerMessage(message) for message in layer_messages]
+            }
+            os.makedirs(self._directory, exist_ok = True)
+            with gzip.open(temporary_path, "wb", compresslevel = 1) as f:
+                pickle.dump(stored, f, protocol = pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                os.replace(temporary_path, path)
+                self._evict()
+        except Exception:  # Nothing would report the exceptions of the background thread.
+            Logger.logException("w", "Unable to store the slice result in %s", path)
+            self._remove(temporary_path)
+
+    def _evict(self) -> None:
+        """Removes the least recently used results until the rest fits in the maximum size."""
+
+        stored = []
+        for path in self._getStoredPaths():
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            stored.append((status.st_mtime, status.st_size, path))
+        total_size = sum(size for _, size, _ in stored)
+        for _, size, path in sorted(stored):
+            if total_size <= self._max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def _getStoredPaths(self) -> List[str]:
+        try:
+            return [os.path.join(self._directory, name) for name in os.listdir(self._directory) if name.endswith(".slice")]
+        except OSError:
+            return []
+
+    def _getPath(self, fingerprint: str) -> str:
+        return os.path.join(self._directory, fingerprint + ".slice")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -2,13 +2,13 @@
 #  Cura is released under the terms of the LGPLv3 or higher.
 import uuid
 
+import hashlib
 import os
 
-import numpy
 from string import Formatter
 from enum import IntEnum
 import time
-from typing import Any, cast, Dict, List, Optional, Set, Tuple
+from typing import Any, cast, Dict, Optional, Tuple
 import re
 import pyArcus as Arcus  # For typing.
 from PyQt6.QtCore import QCoreApplication
@@ -20,13 +20,10 @@ from UM.Settings.ContainerStack import ContainerStack #For typing.
 from UM.Settings.InstanceContainer import InstanceContainer
 from UM.Settings.Interfaces import ContainerInterface
 from UM.Settings.SettingDefinition import SettingDefinition
-from UM.Settings.SettingRelation import SettingRelation #For typing.
 
 from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
 from UM.Scene.Scene import Scene #For typing.
 from UM.Settings.Validator import ValidatorState
-from UM.Settings.SettingRelation import RelationType
-from UM.Settings.SettingFunction import SettingFunction
 
 from cura.CuraApplication import CuraApplication
 from cura.Scene.CuraSceneNode import CuraSceneNode
@@ -34,9 +31,18 @@ from cura.OneAtATimeIterator import OneAtATimeIterator
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.CuraVersion import CuraVersion
 
+from .GcodeTemplate import GcodeField, GcodeTemplate
+from .MeshTransformationCache import MeshTransformationCache
+from .SettingValueCache import SettingValueCache
+from .SliceResultCache import SliceResult, SliceResultCache
+
 
 NON_PRINTING_MESH_SETTINGS = ["anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
 
+# Tokens sent along with the settings that change by the second. They only matter through the g-code they're expanded
+# in, so they are left out of the fingerprint of the slice.
+TIME_TOKENS = {"time", "date", "day"}
+
 
 class StartJobResult(IntEnum):
     Finished = 1
@@ -62,8 +68,7 @@ class GcodeStartEndFormatter(Formatter):
     # context of the provided default extruder. If no default extruder is provided, the global stack
     # will be used. Alternatively, if the expression is formatted as "{[expression], [extruder_nr]}",
     # then the expression will be evaluated with the extruder stack of the specified extruder_nr.
-
-    _extruder_regex = re.compile(r"^\s*(?P<expression>.*)\s*,\s*(?P<extruder_nr_expr>.*)\s*$")
+    # The g-code is parsed into a GcodeTemplate once per text, which evaluates its fields with this formatter.
 
     def __init__(self, all_extruder_settings: Dict[str, Any], default_extruder_nr: int = -1) -> None:
         super().__init__()
@@ -79,24 +84,23 @@ class GcodeStartEndFormatter(Formatter):
         return self.get_value(field_name, args, kwargs), field_name
 
     def get_value(self, expression: str, args: [str], kwargs: dict) -> str:
+        return self.evaluate(GcodeField(expression, "", None))
 
-        # The following variables are not settings, but only become available after slicing.
-        # when these variables are encountered, we return them as-is. They are replaced later
-        # when the actual values are known.
-        post_slice_data_variables = ["filament_cost", "print_time", "filament_amount", "filament_weight", "jobname"]
-        if expression in post_slice_data_variables:
-            return f"{{{expression}}}"
+    def evaluate(self, field: GcodeField) -> Any:
+        """Evaluates the expression of a field of a compiled template."""
+
+        # The variables that only become available after slicing are returned as-is.
+        if field.is_post_slice_data:
+            return f"{{{field.expression}}}"
 
         extruder_nr = str(self._default_extruder_nr)
 
         # The settings may specify a specific extruder to use. This is done by
         # formatting the expression as "{expression}, {extruder_nr_expr}". If the
-        # expression is formatted like this, we extract the extruder_nr and use
-        # it to get the value from the correct extruder stack.
-        match = self._extruder_regex.match(expression)
-        if match:
-            expression = match.group("expression")
-            extruder_nr_expr = match.group("extruder_nr_expr")
+        # expression is formatted like this, we use the extruder_nr to get the
+        # value from the correct extruder stack.
+        if field.extruder_nr_expression is not None:
+            extruder_nr_expr = field.extruder_nr_expression
 
             if extruder_nr_expr.isdigit():
                 extruder_nr = extruder_nr_expr
@@ -109,18 +113,13 @@ class GcodeStartEndFormatter(Formatter):
                 extruder_nr = str(self._all_extruder_settings["-1"].get(extruder_nr_expr, "-1"))
 
         if extruder_nr in self._all_extruder_settings:
-            additional_variables = self._all_extruder_settings[extruder_nr].copy()
+            settings = self._all_extruder_settings[extruder_nr]
         else:
             Logger.warning(f"Extruder {extruder_nr} does not exist, using global settings")
-            additional_variables = self._all_extruder_settings["-1"].copy()
+            settings = self._all_extruder_settings["-1"]
 
-        # Add the arguments and keyword arguments to the additional settings. These
-        # are currently _not_ used, but they are added for consistency with the
-        # base Formatter class.
-        for key, value in enumerate(args):
-            additional_variables[key] = value
-        for key, value in kwargs.items():
-            additional_variables[key] = value
+        # Only the names that the expression reads are passed, instead of a copy of all settings for every field.
+        additional_variables = {name: settings[name] for name in field.names if name in settings}
 
         if extruder_nr == "-1":
             container_stack = CuraApplication.getInstance().getGlobalContainerStack()
@@ -130,8 +129,7 @@ class GcodeStartEndFormatter(Formatter):
                 Logger.warning(f"Extruder {extruder_nr} does not exist, using global settings")
                 container_stack = CuraApplication.getInstance().getGlobalContainerStack()
 
-        setting_function = SettingFunction(expression)
-        value = setting_function(container_stack, additional_variables=additional_variables)
+        value = field.getFunction()(container_stack, additional_variables=additional_variables)
 
         return value
 
@@ -139,13 +137,26 @@ class GcodeStartEndFormatter(Formatter):
 class StartSliceJob(Job):
     """Job class that builds up the message of scene data to send to CuraEngine."""
 
-    def __init__(self, slice_message: Arcus.PythonMessage) -> None:
+    def __init__(self, slice_message: Arcus.PythonMessage, mesh_transformation_cache: Optional[MeshTransformationCache] = None,
+                 setting_value_cache: Optional[SettingValueCache] = None, slice_result_cache: Optional[SliceResultCache] = None) -> None:
         super().__init__()
 
         self._scene: Scene = CuraApplication.getInstance().getController().getScene()
         self._slice_message: Arcus.PythonMessage = slice_message
         self._is_cancelled: bool = False
         self._build_plate_number: Optional[int] = None
+        # Keeps the transformed vertices between slices, when it is shared by the jobs.
+        self._mesh_transformation_cache: MeshTransformationCache = mesh_transformation_cache if mesh_transformation_cache is not None else MeshTransformationCache()
+        # Keeps the setting values between slices, when it is shared by the jobs.
+        self._setting_value_cache: SettingValueCache = setting_value_cache if setting_value_cache is not None else SettingValueCache()
+        # Where the results of earlier slices are stored, by the fingerprint of everything sent to the engine.
+        self._slice_result_cache: Optional[SliceResultCache] = slice_result_cache
+        self._fingerprint = hashlib.sha256() if slice_result_cache is not None and slice_result_cache.isEnabled() else None
+        self._fingerprint_digest: Optional[str] = None
+        self._cached_result: Optional[SliceResult] = None
+        # How long each phase of the job took, in seconds.
+        self._phase_durations: Dict[str, float] = {}
+        self._phase_start: float = 0.0
 
         # cache for all setting values from all stacks (global & extruder) for the current machine
         self._all_extruders_settings: Optional[Dict[str, Any]] = None
@@ -156,21 +167,55 @@ class StartSliceJob(Job):
     def setBuildPlate(self, build_plate_number: int) -> None:
         self._build_plate_number = build_plate_number
 
+    def getFingerprint(self) -> Optional[str]:
+        """The hash of the meshes, their transformations and the settings sent to the engine.
+
+        None if there is no slice result cache to use it with.
+        """
+
+        return self._fingerprint_digest
+
+    def getCachedResult(self) -> Optional[SliceResult]:
+        """The stored result of an earlier slice with the same fingerprint, if there is one."""
+
+        return self._cached_result
+
+    def _addToFingerprint(self, section: str, values: Dict[str, Any]) -> None:
+        """Adds values sent to the engine to the fingerprint, in an order that doesn't depend on the order of the keys."""
+
+        if self._fingerprint is None:
+            return
+        self._updateFingerprint(section.encode("utf-8"))
+        for key in sorted(values):
+            value = values[key]
+            self._updateFingerprint(key.encode("utf-8"))
+            self._updateFingerprint(value if isinstance(value, memoryview) else str(value).encode("utf-8"))
+
+    def _updateFingerprint(self, data: Any) -> None:
+        # Every part is preceded by its length, so that parts can't run into each other.
+        self._fingerprint.update(b"%d:" % memoryview(data).nbytes)
+        self._fingerprint.update(data)
+
+    def getPhaseDurations(self) -> Dict[str, float]:
+        """How long each phase of the job took, in seconds, in the order of the phases."""
+
+        return self._phase_durations
+
+    def _finishPhase(self, name: str) -> None:
+        now = time.perf_counter()
+        self._phase_durations[name] = now - self._phase_start
+        self._phase_start = now
+
     def _checkStackForErrors(self, stack: ContainerStack) -> bool:
         """Check if a stack has any errors."""
 
         """returns true if it has errors, false otherwise."""
 
         top_of_stack = cast(InstanceContainer, stack.getTop())  # Cache for efficiency.
-        changed_setting_keys = top_of_stack.getAllKeys()
 
         # Add all relations to changed settings as well.
-        for key in top_of_stack.getAllKeys():
-            instance = top_of_stack.getInstance(key)
-            if instance is None:
-                continue
-            self._addRelations(changed_setting_keys, instance.definition.relations)
-            Job.yieldThread()
+        changed_setting_keys = self._setting_value_cache.getRelatedKeys(stack, top_of_stack.getAllKeys())
+        Job.yieldThread()
 
         for changed_setting_key in changed_setting_keys:
             if not stack.getProperty(changed_setting_key, "enabled"):
@@ -195,6 +240,7 @@ class StartSliceJob(Job):
     def run(self) -> None:
         """Runs the job that initiates the slicing."""
 
+        self._phase_start = time.perf_counter()
         if self._build_plate_number is None:
             self.setResult(StartJobResult.Error)
             return
@@ -245,6 +291,8 @@ class StartSliceJob(Job):
                 self.setResult(StartJobResult.ObjectSettingError)
                 return
 
+        self._finishPhase("validation")
+
         # Remove old layer data.
         for node in DepthFirstIterator(self._scene.getRoot()):
             if node.callDecoration("getLayerData") and node.callDecoration("getBuildPlateNumber") == self._build_plate_number:
@@ -344,8 +392,11 @@ class StartSliceJob(Job):
             self.setResult(StartJobResult.NothingToSlice)
             return
 
+        self._finishPhase("object groups")
+
         self._buildGlobalSettingsMessage(stack)
         self._buildGlobalInheritsStackMessage(stack)
+        self._finishPhase("global settings")
 
         user_id = uuid.getnode()  # On all of Cura's supported platforms, this returns the MAC address which is pseudonymical information (!= anonymous).
         user_id %= 2 ** 16  # So to make it anonymous, apply a bitmask selecting only the last 16 bits. This prevents it from being traceable to a specific user but still gives somewhat of an idea of whether it's just the same user hitting the same crash over and over again, or if it's widespread.
@@ -361,6 +412,7 @@ class StartSliceJob(Job):
         # Build messages for extruder stacks
         for extruder_stack in global_stack.extruderList:
             self._buildExtruderMessage(extruder_stack)
+        self._finishPhase("extruder settings")
 
         for plugin in CuraApplication.getInstance().getBackendPlugins():
             if not plugin.usePlugin():
@@ -378,44 +430,50 @@ class StartSliceJob(Job):
                 plugin_message.port = plugin.getPort()
                 plugin_message.plugin_name = plugin.getPluginId()
                 plugin_message.plugin_version = plugin.getVersion()
+                self._addToFingerprint("engine_plugin", {"slot": slot, "plugin_name": plugin.getPluginId(), "plugin_version": plugin.getVersion()})
+
+        self._finishPhase("engine plugins")
+
+        # The vertices of all objects are transformed at once, so that the ones that moved since the previous slice
+        # can be transformed in parallel.
+        objects = [object for group in filtered_object_groups for object in group]
+        vertices_per_object = dict(zip(map(id, objects), self._mesh_transformation_cache.getVertices(objects)))
+        Logger.log("d", "Mesh transformation cache: %s", self._mesh_transformation_cache.getStatistics())
+        self._finishPhase("mesh transformation")
 
         for group in filtered_object_groups:
             group_message = self._slice_message.addRepeatedMessage("object_lists")
+            self._addToFingerprint("object_list", {})
             parent = group[0].getParent()
             if parent is not None and parent.callDecoration("isGroup"):
                 self._handlePerObjectSettings(cast(CuraSceneNode, parent), group_message)
 
             for object in group:
-                mesh_data = object.getMeshData()
-                if mesh_data is None:
+                flat_verts = vertices_per_object[id(object)]
+                if flat_verts is None:
                     continue
-                rot_scale = object.getWorldTransformation().getTransposed().getData()[0:3, 0:3]
-                translate = object.getWorldTransformation().getData()[:3, 3]
-
-                # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
-                verts = mesh_data.getVertices()
-                verts = verts.dot(rot_scale)
-                verts += translate
-
-                # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
-                verts[:, [1, 2]] = verts[:, [2, 1]]
-                verts[:, 1] *= -1
 
                 obj = group_message.addRepeatedMessage("objects")
                 obj.id = id(object)
                 obj.name = object.getName()
-                indices = mesh_data.getIndices()
-                if indices is not None:
-                    flat_verts = numpy.take(verts, indices.flatten(), axis=0)
-                else:
-                    flat_verts = numpy.array(verts)
-
                 obj.vertices = flat_verts
+                self._addToFingerprint("object", {"name": object.getName(), "vertices": flat_verts.data})
 
                 self._handlePerObjectSettings(cast(CuraSceneNode, object), obj)
 
                 Job.yieldThread()
-
+        self._finishPhase("objects")
+
+        if self._fingerprint is not None:
+            self._addToFingerprint("cura", {"cura_version": CuraVersion})
+            self._fingerprint_digest = self._fingerprint.hexdigest()
+            self._cached_result = self._slice_result_cache.get(self._fingerprint_digest)
+            if self._cached_result is not None:
+                Logger.log("i", "Found the result of an earlier slice with fingerprint %s", self._fingerprint_digest)
+            self._finishPhase("slice result cache")
+
+        Logger.log("d", "StartSliceJob phases: %s", ", ".join("%s %.0f ms" % (name, duration * 1000) for name, duration in self._phase_durations.items()))
+        Logger.log("d", "Setting value cache: %s", self._setting_value_cache.getStatistics())
         self.setResult(StartJobResult.Finished)
 
     def cancel(self) -> None:
@@ -438,7 +496,7 @@ class StartSliceJob(Job):
 
         result = {}
         for key in stack.getAllKeys():
-            result[key] = stack.getProperty(key, "value")
+            result[key] = self._setting_value_cache.getProperty(stack, key, "value")
             Job.yieldThread()
 
         # Material identification in addition to non-human-readable GUID
@@ -490,7 +548,8 @@ class StartSliceJob(Job):
             # replacement values for the setting-keys. However, the values for `material_id`, `material_type`,
             # etc are not in the settings stack.
             fmt = GcodeStartEndFormatter(self._all_extruders_settings, default_extruder_nr=default_extruder_nr)
-            return str(fmt.format(value))
+            definition_id = CuraApplication.getInstance().getGlobalContainerStack().definition.getId()
+            return GcodeTemplate.getTemplate(definition_id, value).render(fmt)
         except:
             Logger.logException("w", "Unable to do token replacement on start/end g-code")
             return str(value)
@@ -526,6 +585,7 @@ class StartSliceJob(Job):
         global_definition = cast(ContainerInterface, cast(ContainerStack, stack.getNextStack()).getBottom())
         own_definition = cast(ContainerInterface, stack.getBottom())
 
+        sent_settings = {}
         for key, value in settings.items():
             # Do not send settings that are not settable_per_extruder.
             # Since these can only be set in definition files, we only have to ask there.
@@ -535,7 +595,10 @@ class StartSliceJob(Job):
             setting = message.getMessage("settings").addRepeatedMessage("settings")
             setting.name = key
             setting.value = str(value).encode("utf-8")
+            if key not in TIME_TOKENS:
+                sent_settings[key] = value
             Job.yieldThread()
+        self._addToFingerprint("extruder %s" % message.id, sent_settings)
 
     def _buildGlobalSettingsMessage(self, stack: ContainerStack) -> None:
         """Sends all global settings to the engine.
@@ -579,6 +642,7 @@ class StartSliceJob(Job):
             setting_message.name = key
             setting_message.value = str(value).encode("utf-8")
             Job.yieldThread()
+        self._addToFingerprint("global_settings", {key: value for key, value in settings.items() if key not in TIME_TOKENS})
 
     def _buildGlobalInheritsStackMessage(self, stack: ContainerStack) -> None:
         """Sends for some settings which extruder they should fallback to if not set.
@@ -590,13 +654,16 @@ class StartSliceJob(Job):
             limit_to_extruder property.
         """
 
+        limits = {}
         for key in stack.getAllKeys():
-            extruder_position = int(round(float(stack.getProperty(key, "limit_to_extruder"))))
+            extruder_position = int(round(float(self._setting_value_cache.getProperty(stack, key, "limit_to_extruder"))))
             if extruder_position >= 0:  # Set to a specific extruder.
                 setting_extruder = self._slice_message.addRepeatedMessage("limit_to_extruder")
                 setting_extruder.name = key
                 setting_extruder.extruder = extruder_position
+                limits[key] = extruder_position
             Job.yieldThread()
+        self._addToFingerprint("limit_to_extruder", limits)
 
     def _handlePerObjectSettings(self, node: CuraSceneNode, message: Arcus.PythonMessage):
         """Check if a node has per object settings and ensure that they are set correctly in the message
@@ -613,22 +680,20 @@ class StartSliceJob(Job):
 
         # Check all settings for relations, so we can also calculate the correct values for dependent settings.
         top_of_stack = stack.getTop()  # Cache for efficiency.
-        changed_setting_keys = top_of_stack.getAllKeys()
 
         # Add all relations to changed settings as well.
-        for key in top_of_stack.getAllKeys():
-            instance = top_of_stack.getInstance(key)
-            self._addRelations(changed_setting_keys, instance.definition.relations)
-            Job.yieldThread()
+        changed_setting_keys = self._setting_value_cache.getRelatedKeys(stack, top_of_stack.getAllKeys())
+        Job.yieldThread()
 
         # Ensure that the engine is aware what the build extruder is.
         changed_setting_keys.add("extruder_nr")
 
         # Get values for all changed settings
+        sent_settings = {}
         for key in changed_setting_keys:
             setting = message.addRepeatedMessage("settings")
             setting.name = key
-            extruder = int(round(float(stack.getProperty(key, "limit_to_extruder"))))
+            extruder = int(round(float(self._setting_value_cache.getProperty(stack, key, "limit_to_extruder"))))
 
             # Check if limited to a specific extruder, but not overridden by per-object settings.
             if extruder >= 0 and key not in changed_setting_keys:
@@ -636,20 +701,9 @@ class StartSliceJob(Job):
             else:
                 limited_stack = stack
 
-            setting.value = str(limited_stack.getProperty(key, "value")).encode("utf-8")
+            value = str(self._setting_value_cache.getProperty(limited_stack, key, "value"))
+            setting.value = value.encode("utf-8")
+            sent_settings[key] = value
 
             Job.yieldThread()
-
-    def _addRelations(self, relations_set: Set[str], relations: List[SettingRelation]):
-        """Recursive function to put all settings that require each other for value changes in a list
-
-        :param relations_set: Set of keys of settings that are influenced
-        :param relations: list of relation objects that need to be checked.
-        """
-
-        for relation in filter(lambda r: r.role == "value" or r.role == "limit_to_extruder", relations):
-            if relation.type == RelationType.RequiresTarget:
-                continue
-
-            relations_set.add(relation.target.key)
-            self._addRelations(relations_set, relation.target.relations)
+        self._addToFingerprint("object_settings", sent_settings)
@@ -0,0 +1,37 @@
+from string import Formatter
+
+from ..GcodeTemplate import GcodeTemplate
+
+
+class FakeFormatter(Formatter):
+    def __init__(self, values):
+        super().__init__()
+        self.values = values
+        self.evaluated = []
+
+    def evaluate(self, field):
+        self.evaluated.append(field)
+        if field.is_post_slice_data:
+            return "{%s}" % field.expression
+        return eval(field.expression, {}, dict(self.values))
+
+
+def test_parsedFields():
+    template = GcodeTemplate("M104 S{material_print_temperature, 1} ;heat\nM140 S{material_bed_temperature}\n{{not a field}}")
+    fields = template.getFields()
+    assert [field.expression for field in fields] == ["material_print_temperature", "material_bed_temperature"]
+    assert [field.extruder_nr_expression for field in fields] == ["1", None]
+    assert fields[1].names == {"material_bed_temperature"}
+
+
+def test_render():
+    template = GcodeTemplate("M140 S{material_bed_temperature:.1f}\nM104 S{200 if material_type == 'PLA' else 240}\n;{print_time} {{x}}")
+    formatter = FakeFormatter({"material_bed_temperature": 60, "material_type": "PLA"})
+    assert template.render(formatter) == "M140 S60.0\nM104 S200\n;{print_time} {x}"
+    assert formatter.evaluated[1].names == {"material_type"}
+
+
+def test_templateCachedPerDefinition():
+    text = "G28 ;{machine_name}"
+    assert GcodeTemplate.getTemplate("bcn3dw27", text) is GcodeTemplate.getTemplate("bcn3dw27", text)
+    assert GcodeTemplate.getTemplate("bcn3dd25", text) is not GcodeTemplate.getTemplate("bcn3dw27", text)
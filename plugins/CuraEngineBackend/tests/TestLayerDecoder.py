@@ -0,0 +1,55 @@
+import numpy
+
+from ..LayerDecoder import DecodedLayer
+
+
+class FakeSegment:
+    def __init__(self, extruder, point_type, points, line_types):
+        line_count = len(line_types)
+        self.extruder = extruder
+        self.point_type = point_type
+        self.points = numpy.array(points, dtype = "f4").tobytes()
+        self.line_type = numpy.array(line_types, dtype = "u1").tobytes()
+        self.line_width = numpy.full(line_count, 0.4, dtype = "f4").tobytes()
+        self.line_thickness = numpy.full(line_count, 0.2, dtype = "f4").tobytes()
+        self.line_feedrate = numpy.arange(line_count, dtype = "f4").tobytes()
+
+
+class FakeLayer:
+    def __init__(self, segments):
+        self.height = 300
+        self._segments = segments
+
+    def repeatedMessageCount(self, name):
+        return len(self._segments)
+
+    def getRepeatedMessage(self, name, index):
+        return self._segments[index]
+
+
+def test_decodedLayer2D():
+    layer = FakeLayer([FakeSegment(0, 0, [0, 0, 10, 0, 10, 5], [1, 8]), FakeSegment(1, 0, [1, 2, 3, 4], [6])])
+    decoded = DecodedLayer(layer)
+    assert len(decoded) == 2
+
+    extruder, line_types, points, line_widths, line_thicknesses, line_feedrates = decoded.segment(1)
+    assert extruder == 1
+    assert line_types.tolist() == [[6]]
+    assert numpy.array_equal(points, numpy.array([[1, 0.3, -2], [3, 0.3, -4]], dtype = numpy.float32))
+    assert line_widths.shape == line_thicknesses.shape == line_feedrates.shape == (1, 1)
+    assert numpy.shares_memory(points, decoded.points)  # A view, not a copy.
+
+
+def test_decodedLayerMixedPointTypes():
+    layer = FakeLayer([FakeSegment(0, 1, [0, 1, 2, 3, 4, 5], [1]), FakeSegment(0, 0, [6, 7, 8, 9], [2]), FakeSegment(0, 1, [10, 11, 12, 13, 14, 15], [3])])
+    points = [segment[2].tolist() for segment in DecodedLayer(layer)]
+    assert points[0] == [[0, 2, -1], [3, 5, -4]]
+    assert numpy.array_equal(points[1], numpy.array([[6, 0.3, -7], [8, 0.3, -9]], dtype = numpy.float32))
+    assert points[2] == [[10, 12, -11], [13, 15, -14]]
+
+
+def test_decodedLayerLineTypesAreWritable():
+    decoded = DecodedLayer(FakeLayer([FakeSegment(0, 0, [0, 0, 1, 1], [20])]))
+    line_types = decoded.segment(0)[1]
+    line_types[0] = 0  # LayerPolygon resets unknown line types.
+    assert decoded.line_types[0, 0] == 0
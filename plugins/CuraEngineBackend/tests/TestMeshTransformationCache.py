@@ -0,0 +1,72 @@
+import numpy
+
+from ..MeshTransformationCache import MeshTransformationCache, transformVertices
+
+
+class FakeMatrix:
+    def __init__(self, data):
+        self._data = numpy.array(data, dtype = numpy.float64)
+
+    def getData(self):
+        return self._data
+
+    def getTransposed(self):
+        return FakeMatrix(self._data.T)
+
+
+class FakeMeshData:
+    def __init__(self):
+        self._vertices = numpy.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype = numpy.float32)
+        self._indices = numpy.array([[0, 1, 2], [0, 2, 3]], dtype = numpy.int32)
+
+    def getVertices(self):
+        return self._vertices
+
+    def getIndices(self):
+        return self._indices
+
+
+class FakeNode:
+    def __init__(self, mesh_data, translation = (0, 0, 0)):
+        self._mesh_data = mesh_data
+        self.transformation = FakeMatrix(numpy.identity(4))
+        self.transformation.getData()[:3, 3] = translation
+
+    def getMeshData(self):
+        return self._mesh_data
+
+    def getWorldTransformation(self):
+        return self.transformation
+
+
+def test_transformVertices():
+    vertices = transformVertices(FakeMeshData(), FakeNode(None, (10, 20, 30)).transformation)
+    assert vertices.shape == (6, 3)
+    # Y up becomes Z up: the Z of the mesh becomes minus Y.
+    assert numpy.array_equal(vertices[5], [10, -31, 20])
+
+
+def test_cachedPerTransformation():
+    mesh_data = FakeMeshData()
+    node = FakeNode(mesh_data)
+    shadow = FakeNode(mesh_data, (50, 0, 0))  # Shares the mesh data, like the shadow nodes of duplication printing.
+    cache = MeshTransformationCache()
+
+    first = cache.getVertices([node, shadow, FakeNode(None)])
+    assert first[2] is None
+    assert not numpy.array_equal(first[0], first[1])
+    assert cache.getStatistics() == {"hits": 0, "misses": 2, "size": 2}
+
+    second = cache.getVertices([node, shadow])  # Nothing moved.
+    assert second[0] is first[0] and second[1] is first[1]
+    assert cache.getStatistics()["hits"] == 2
+
+
+def test_movedNodeTransformedAgain():
+    node = FakeNode(FakeMeshData())
+    cache = MeshTransformationCache()
+    before = cache.getVertices([node])[0]
+    node.transformation.getData()[:3, 3] = (5, 0, 0)
+    after = cache.getVertices([node])[0]
+    assert numpy.array_equal(after, before + [5, 0, 0])
+    assert cache.getStatistics() == {"hits": 0, "misses": 2, "size": 1}  # The old position is not kept.
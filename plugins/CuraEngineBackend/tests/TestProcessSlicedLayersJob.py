@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock, patch
+
+import numpy
+
+from .. import ProcessSlicedLayersJob as ProcessSlicedLayersJobModule
+from ..ProcessSlicedLayersJob import ProcessSlicedLayersJob
+
+
+class FakeSegment:
+    def __init__(self, extruder, points, line_types):
+        line_count = len(line_types)
+        self.extruder = extruder
+        self.point_type = 0
+        self.points = numpy.array(points, dtype = "f4").tobytes()
+        self.line_type = numpy.array(line_types, dtype = "u1").tobytes()
+        self.line_width = numpy.full(line_count, 0.4, dtype = "f4").tobytes()
+        self.line_thickness = numpy.full(line_count, 0.2, dtype = "f4").tobytes()
+        self.line_feedrate = numpy.full(line_count, 50, dtype = "f4").tobytes()
+
+
+class FakeLayer:
+    def __init__(self, layer_id, height, segments):
+        self.id = layer_id
+        self.height = height
+        self.thickness = 200
+        self._segments = segments
+
+    def repeatedMessageCount(self, name):
+        return len(self._segments)
+
+    def getRepeatedMessage(self, name, index):
+        return self._segments[index]
+
+
+def createJob(layers):
+    with patch.object(ProcessSlicedLayersJobModule, "Application", MagicMock()):
+        with patch.object(ProcessSlicedLayersJobModule, "Message", MagicMock()):
+            return ProcessSlicedLayersJob(layers)
+
+
+def test_processLayerMergesLayersWithTheSameId():
+    # In one-at-a-time mode the engine sends the layers of every mesh group with the same layer numbers.
+    first_group = FakeLayer(0, 200, [FakeSegment(0, [0, 0, 10, 0], [1])])
+    second_group = FakeLayer(0, 250, [FakeSegment(1, [20, 0, 30, 0], [1]), FakeSegment(1, [30, 0, 30, 10], [1])])
+    job = createJob([first_group, second_group])
+
+    job._processLayer(first_group)
+    job._processLayer(second_group)
+
+    height, thickness, polygons = job._processed_layers[0]
+    assert len(job._processed_layers) == 1
+    assert (height, thickness) == (200, 200)
+    assert [polygon.extruder for polygon in polygons] == [0, 1, 1]
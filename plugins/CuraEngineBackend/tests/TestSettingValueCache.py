@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+
+from UM.Settings.SettingRelation import RelationType
+
+from ..SettingValueCache import SettingValueCache
+
+
+class FakeSignal:
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def disconnect(self, slot):
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class FakeDefinition:
+    def __init__(self, key):
+        self.key = key
+        self.relations = []
+
+
+class FakeRelation:
+    def __init__(self, relation_type, target, role = "value"):
+        self.type = relation_type
+        self.target = target
+        self.role = role
+
+
+class FakeStack:
+    def __init__(self, values, definitions):
+        self.values = values
+        self._definitions = definitions
+        self.propertyChanged = FakeSignal()
+        self.propertiesChanged = FakeSignal()
+        self.containersChanged = FakeSignal()
+        self.getProperty = MagicMock(side_effect = lambda key, property_name: self.values[key])
+
+    def getNextStack(self):
+        return None
+
+    def getSettingDefinition(self, key):
+        return self._definitions.get(key)
+
+
+def createStack():
+    # wall_thickness is required by wall_line_count.
+    wall_thickness = FakeDefinition("wall_thickness")
+    wall_line_count = FakeDefinition("wall_line_count")
+    wall_thickness.relations.append(FakeRelation(RelationType.RequiredByTarget, wall_line_count))
+    wall_line_count.relations.append(FakeRelation(RelationType.RequiresTarget, wall_thickness))
+    definitions = {"wall_thickness": wall_thickness, "wall_line_count": wall_line_count, "layer_height": FakeDefinition("layer_height")}
+    return FakeStack({"wall_thickness": 0.8, "wall_line_count": 2, "layer_height": 0.2}, definitions)
+
+
+def test_valuesEvaluatedOnce():
+    stack = createStack()
+    cache = SettingValueCache()
+    assert cache.getProperty(stack, "layer_height") == 0.2
+    assert cache.getProperty(stack, "layer_height") == 0.2
+    assert stack.getProperty.call_count == 1
+    assert cache.getStatistics() == {"hits": 1, "misses": 1, "stacks": 1}
+
+
+def test_changeForgetsDependents():
+    stack = createStack()
+    cache = SettingValueCache()
+    for key in ("wall_thickness", "wall_line_count", "layer_height"):
+        cache.getProperty(stack, key)
+
+    stack.values.update({"wall_thickness": 1.2, "wall_line_count": 3})
+    stack.propertyChanged.emit("wall_thickness", "value")
+    assert cache.getProperty(stack, "wall_thickness") == 1.2
+    assert cache.getProperty(stack, "wall_line_count") == 3
+    assert cache.getProperty(stack, "layer_height") == 0.2
+    assert stack.getProperty.call_count == 5  # layer_height didn't change.
+
+    stack.values["layer_height"] = 0.1
+    stack.containersChanged.emit(None)
+    assert cache.getProperty(stack, "layer_height") == 0.1
+
+
+def test_getRelatedKeys():
+    stack = createStack()
+    cache = SettingValueCache()
+    assert cache.getRelatedKeys(stack, ["wall_thickness"]) == {"wall_thickness", "wall_line_count"}
+    assert cache.getRelatedKeys(stack, ["wall_line_count", "layer_height"]) == {"wall_line_count", "layer_height"}
+
+
+def test_extruderEnabledChangeForgetsValues():
+    stack = createStack()
+    cache = SettingValueCache()
+    cache.getProperty(stack, "layer_height")
+
+    # MachineManager.setExtruderEnabled emits propertiesChanged for every setting of the global stack.
+    stack.values["layer_height"] = 0.3
+    for key in stack.values:
+        stack.propertiesChanged.emit(key, ["resolve", "validationState"])
+    assert cache.getProperty(stack, "layer_height") == 0.3
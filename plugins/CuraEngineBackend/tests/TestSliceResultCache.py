@@ -0,0 +1,59 @@
+import gzip
+import os
+import pickle
+
+from ..SliceResultCache import SliceResultCache
+
+
+class FakeMessage:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def repeatedMessageCount(self, name):
+        return len(getattr(self, name))
+
+    def getRepeatedMessage(self, name, index):
+        return getattr(self, name)[index]
+
+
+def createLayerMessage(layer_id):
+    segment = FakeMessage(extruder = 1, point_type = 0, points = b"\x00" * 16, line_type = b"\x01", line_width = b"\x00" * 4,
+                          line_thickness = b"\x00" * 4, line_feedrate = b"\x00" * 4)
+    return FakeMessage(id = layer_id, height = 200 * (layer_id + 1), thickness = 200, path_segment = [segment])
+
+
+def test_storeAndRestore(tmp_path):
+    cache = SliceResultCache(str(tmp_path), 1024 * 1024)
+    assert cache.get("abc") is None
+    cache.put("abc", [";FLAVOR:Marlin\n;TIME:{print_time}\n", "G1 X10\n"], [0], {"travel": 12.5}, [1.5, 0.0], [createLayerMessage(0), createLayerMessage(1)]).result()
+
+    result = cache.get("abc")
+    assert result.gcode == [";FLAVOR:Marlin\n;TIME:{print_time}\n", "G1 X10\n"]
+    assert result.placeholder_layers == [0]
+    assert result.print_times == {"travel": 12.5}
+    assert result.material_amounts == [1.5, 0.0]
+    layers = result.getLayerMessages()
+    assert [layer.height for layer in layers] == [200, 400]
+    assert layers[1].repeatedMessageCount("path_segment") == 1
+    assert layers[1].getRepeatedMessage("path_segment", 0).extruder == 1
+
+
+def test_leastRecentlyUsedRemoved(tmp_path):
+    cache = SliceResultCache(str(tmp_path), 1024 * 1024)
+    cache.put("old", ["x" * 1000], [], {}, [], []).result()
+    cache.put("used", ["y" * 1000], [], {}, [], []).result()
+    os.utime(os.path.join(str(tmp_path), "old.slice"), (0, 0))
+    os.utime(os.path.join(str(tmp_path), "used.slice"), (1, 1))
+    assert cache.get("old") is not None  # Now the most recently used one.
+
+    cache.setMaxSize(os.path.getsize(os.path.join(str(tmp_path), "old.slice")))
+    assert cache.get("used") is None
+    assert cache.get("old") is not None
+
+
+def test_onlyValuesLoaded(tmp_path):
+    cache = SliceResultCache(str(tmp_path), 1024 * 1024)
+    with gzip.open(os.path.join(str(tmp_path), "foreign.slice"), "wb") as f:
+        pickle.dump({"version": SliceResultCache.Version, "gcode": os.getcwd}, f)
+    assert cache.get("foreign") is None
+    assert not os.path.exists(os.path.join(str(tmp_path), "foreign.slice"))
@@ -3,7 +3,7 @@
 
 import math
 import re
-from typing import Dict, List, NamedTuple, Optional, Union, Set
+from typing import Callable, Dict, IO, List, NamedTuple, Optional, Union, Set
 
 import numpy
 
@@ -22,8 +22,14 @@ from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Scene.GCodeListDecorator import GCodeListDecorator
 from cura.Settings.ExtruderManager import ExtruderManager
 
+from .GCodeLines import iterateLines, streamSize
+from .PathBuffer import PathBuffer, calculateLineWidths
+
 catalog = i18nCatalog("cura")
 
+# End of the value of a G-code word.
+_value_end_pattern = re.compile("[;\\s]")
+
 PositionOptional = NamedTuple("PositionOptional", [("x", Optional[float]), ("y", Optional[float]), ("z", Optional[float]), ("f", Optional[float]), ("e", Optional[float])])
 Position = NamedTuple("Position", [("x", float), ("y", float), ("z", float), ("f", float), ("e", List[float])])
 
@@ -51,6 +57,7 @@ class FlavorParser:
         self._current_layer_thickness = 0.2  # default
         self._current_filament_diameter = 2.85       # default
         self._previous_extrusion_value = 0.0  # keep track of the filament retractions
+        self._g_code_functions = {}  # type: Dict[int, Optional[Callable]]
 
         CuraApplication.getInstance().getPreferences().addPreference("gcodereader/show_caution", True)
 
@@ -70,8 +77,7 @@ class FlavorParser:
         if n < 0:
             return None
         n += len(code)
-        pattern = re.compile("[;\\s]")
-        match = pattern.search(line, n)
+        match = _value_end_pattern.search(line, n)
         m = match.start() if match is not None else -1
         try:
             if m < 0:
@@ -98,15 +104,12 @@ class FlavorParser:
         if message == self._message:
             self._cancelled = True
 
-    def _createPolygon(self, layer_thickness: float, path: List[List[Union[float, int]]], extruder_offsets: List[float]) -> bool:
-        countvalid = 0
-        for point in path:
-            if point[5] > 0:
-                countvalid += 1
-                if countvalid >= 2:
-                    # we know what to do now, no need to count further
-                    continue
-        if countvalid < 2:
+    def _createPolygon(self, layer_thickness: float, path: Union[PathBuffer, List[List[Union[float, int]]]], extruder_offsets: List[float]) -> bool:
+        if isinstance(path, PathBuffer):
+            path_data = path.toArray()
+        else:
+            path_data = numpy.array(path, dtype = numpy.float64).reshape(-1, 6)
+        if numpy.count_nonzero(path_data[:, 5] > 0) < 2:
             return False
         try:
             self._layer_data_builder.addLayer(self._layer_number)
@@ -117,28 +120,24 @@ class FlavorParser:
                 return False
         except ValueError:
             return False
-        count = len(path)
+        count = len(path_data)
         line_types = numpy.empty((count - 1, 1), numpy.int32)
         line_widths = numpy.empty((count - 1, 1), numpy.float32)
         line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
         line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
-        line_widths[:, 0] = 0.35  # Just a guess
         line_thicknesses[:, 0] = layer_thickness
         points = numpy.empty((count, 3), numpy.float32)
-        extrusion_values = numpy.empty((count, 1), numpy.float32)
-        i = 0
-        for point in path:
-            points[i, :] = [point[0] + extruder_offsets[0], point[2], -point[1] - extruder_offsets[1]]
-            extrusion_values[i] = point[4]
-            if i > 0:
-                line_feedrates[i - 1] = point[3]
-                line_types[i - 1] = point[5]
-                if point[5] in [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType]:
-                    line_widths[i - 1] = 0.1
-                    line_thicknesses[i - 1] = 0.0 # Travels are set as zero thickness lines
-                else:
-                    line_widths[i - 1] = self._calculateLineWidth(points[i], points[i-1], extrusion_values[i], extrusion_values[i-1], layer_thickness)
-            i += 1
+        points[:, 0] = path_data[:, 0] + extruder_offsets[0]
+        points[:, 1] = path_data[:, 2]
+        points[:, 2] = -path_data[:, 1] - extruder_offsets[1]
+        extrusion_values = path_data[:, 4].astype(numpy.float32)
+        line_feedrates[:, 0] = path_data[1:, 3]
+        line_types[:, 0] = path_data[1:, 5]
+
+        line_widths[:, 0] = calculateLineWidths(points, extrusion_values, self._current_filament_diameter, layer_thickness)
+        travels = numpy.isin(line_types[:, 0], [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType])
+        line_widths[travels] = 0.1
+        line_thicknesses[travels] = 0.0  # Travels are set as zero thickness lines
 
         this_poly = LayerPolygon(self._extruder_number, line_types, points, line_widths, line_thicknesses, line_feedrates)
         this_poly.buildCache()
@@ -259,29 +258,34 @@ class FlavorParser:
             position.e)
 
     def processGCode(self, G: int, line: str, position: Position, path: List[List[Union[float, int]]]) -> Position:
-        func = getattr(self, "_gCode%s" % G, None)
-        line = line.split(";", 1)[0]  # Remove comments (if any)
+        try:
+            func = self._g_code_functions[G]
+        except KeyError:
+            func = self._g_code_functions[G] = getattr(self, "_gCode%s" % G, None)
         if func is not None:
-            s = line.upper().split(" ")
+            # Remove comments (if any) and read all words of the command in one go.
+            s = line.split(";", 1)[0].upper().split(" ")
             x, y, z, f, e = None, None, None, None, None
             for item in s[1:]:
                 if len(item) <= 1:
                     continue
-                if item.startswith(";"):
+                code = item[0]
+                if code not in "XYZFE":
                     continue
                 try:
-                    if item[0] == "X":
-                        x = float(item[1:])
-                    elif item[0] == "Y":
-                        y = float(item[1:])
-                    elif item[0] == "Z":
-                        z = float(item[1:])
-                    elif item[0] == "F":
-                        f = float(item[1:]) / 60
-                    elif item[0] == "E":
-                        e = float(item[1:])
+                    value = float(item[1:])
                 except ValueError:  # Improperly formatted g-code: Coordinates are not floats.
                     continue  # Skip the command then.
+                if code == "X":
+                    x = value
+                elif code == "Y":
+                    y = value
+                elif code == "Z":
+                    z = value
+                elif code == "F":
+                    f = value / 60
+                else:
+                    e = value
             params = PositionOptional(x, y, z, f, e)
             return func(position, params, path)
         return position
@@ -319,7 +323,11 @@ class FlavorParser:
     # This function needs the filename so it can be set to the SceneNode. Otherwise, if you load a GCode file and press
     # F5, that gcode SceneNode will be removed because it doesn't have a file to be reloaded from.
     #
-    def processGCodeStream(self, stream: str, filename: str) -> Optional["CuraSceneNode"]:
+    def processGCodeStream(self, stream: Union[str, IO[str]], filename: str) -> Optional["CuraSceneNode"]:
+        """Parses G-code into layer data.
+
+        :param stream: The G-code, either as a string or as a text file that is read line by line while parsing.
+        """
         Logger.log("d", "Preparing to load g-code")
         self._cancelled = False
         # We obtain the filament diameter from the selected extruder to calculate line widths
@@ -344,15 +352,13 @@ class FlavorParser:
         ##############################################################################################
         ##  This part is where the action starts
         ##############################################################################################
-        file_lines = 0
-        current_line = 0
-        for line in stream.split("\n"):
-            file_lines += 1
-            gcode_list.append(line + "\n")
-            if not self._is_layers_in_file and line[:len(self._layer_keyword)] == self._layer_keyword:
-                self._is_layers_in_file = True
-
-        file_step = max(math.floor(file_lines / 100), 1)
+        # The file is parsed while it is read. The G-code list gets one entry per layer, like the ones of the
+        # backend, instead of one per line.
+        gcode_layer = []  # type: List[str]
+        stream_size = streamSize(stream)
+        parsed_size = 0
+        progress = 0
+        ends_with_newline = True
 
         self._clearValues()
 
@@ -367,25 +373,41 @@ class FlavorParser:
         Logger.log("d", "Parsing g-code...")
 
         current_position = Position(0, 0, 0, 0, [0] * self.MAX_EXTRUDER_COUNT)
-        current_path = [] #type: List[List[float]]
+        current_path = PathBuffer()
         min_layer_number = 0
         negative_layers = 0
         previous_layer = 0
         self._previous_extrusion_value = 0.0
 
-        for line in stream.split("\n"):
+        for raw_line in iterateLines(stream):
             if self._cancelled:
                 Logger.log("d", "Parsing g-code file cancelled.")
                 return None
-            current_line += 1
 
-            if current_line % file_step == 0:
-                self._message.setProgress(math.floor(current_line / file_lines * 100))
+            parsed_size += len(raw_line)
+            if stream_size and parsed_size * 100 >= (progress + 1) * stream_size:
+                progress = min(math.floor(parsed_size * 100 / stream_size), 100)
+                self._message.setProgress(progress)
                 Job.yieldThread()
+
+            ends_with_newline = raw_line.endswith("\n")
+            if ends_with_newline:
+                line = raw_line[:-1]
+            else:
+                line = raw_line
+                raw_line += "\n"
+
+            if line.startswith(self._layer_keyword):
+                self._is_layers_in_file = True
+                if gcode_layer:
+                    gcode_list.append("".join(gcode_layer))
+                    gcode_layer.clear()
+            gcode_layer.append(raw_line)
+
             if len(line) == 0:
                 continue
 
-            if line.find(self._type_keyword) == 0:
+            if line.startswith(self._type_keyword):
                 type = line[len(self._type_keyword):].strip()
                 if type == "WALL-INNER":
                     self._layer_type = LayerPolygon.InsetXType
@@ -438,7 +460,15 @@ class FlavorParser:
             if line.startswith(";"):
                 continue
 
-            G = self._getInt(line, "G")
+            if line[0] == "G":
+                # Fast path for moves, the bulk of the file: the same as _getInt(line, "G").
+                match = _value_end_pattern.search(line, 1)
+                try:
+                    G = int(line[1:match.start()] if match is not None else line[1:])
+                except ValueError:
+                    G = None
+            else:
+                G = self._getInt(line, "G")
             if G is not None:
                 # When find a movement, the new position is calculated and added to the current_path, but
                 # don't need to create a polygon until the end of the layer
@@ -464,6 +494,12 @@ class FlavorParser:
                 if M is not None:
                     self.processMCode(M, line, current_position, current_path)
 
+        # Every line gets a newline, also the empty one after the last newline of the file.
+        if ends_with_newline:
+            gcode_layer.append("\n")
+        gcode_list.append("".join(gcode_layer))
+        gcode_layer.clear()
+
         # "Flush" leftovers. Last layer paths are still stored
         if len(current_path) > 1:
             if self._createPolygon(self._current_layer_thickness, current_path, self._extruder_offsets.get(self._extruder_number, [0, 0])):
@@ -479,7 +515,8 @@ class FlavorParser:
         material_color_map[5, :] = [0.0, 0.0, 0.7, 1.0]
         material_color_map[6, :] = [0.3, 0.3, 0.3, 1.0]
         material_color_map[7, :] = [0.7, 0.7, 0.7, 1.0]
-        layer_mesh = self._layer_data_builder.build(material_color_map)
+        compact = bool(CuraApplication.getInstance().getPreferences().getValue("view/compact_layer_data"))
+        layer_mesh = self._layer_data_builder.build(material_color_map, compact = compact)
         decorator = LayerDataDecorator()
         decorator.setLayerData(layer_mesh)
         scene_node.addDecorator(decorator)
@@ -0,0 +1,34 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+from typing import IO, Iterator, Union
+
+
+def iterateLines(stream: Union[str, IO[str]]) -> Iterator[str]:
+    """The lines of a G-code string or text file, one by one and with their newline.
+
+    Unlike ``stream.split("\\n")`` this never holds a second copy of the whole file, and files are read while the
+    lines are consumed. The last line may lack the newline.
+    """
+    if not isinstance(stream, str):
+        yield from stream
+        return
+    start = 0
+    end = stream.find("\n")
+    while end >= 0:
+        yield stream[start:end + 1]
+        start = end + 1
+        end = stream.find("\n", start)
+    if start < len(stream):
+        yield stream[start:]
+
+
+def streamSize(stream: Union[str, IO[str]]) -> int:
+    """Number of characters (or, for files, bytes) in the stream, to report the parsing progress. 0 if unknown."""
+    if isinstance(stream, str):
+        return len(stream)
+    try:
+        return os.fstat(stream.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
@@ -2,7 +2,7 @@
 # Copyright (c) 2020 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
-from typing import Optional, Union, List, TYPE_CHECKING
+from typing import IO, Optional, Union, List, TYPE_CHECKING
 
 from UM.FileHandler.FileReader import FileReader
 from UM.Mesh.MeshReader import MeshReader
@@ -13,6 +13,7 @@ from UM.MimeTypeDatabase import MimeTypeDatabase, MimeType
 catalog = i18nCatalog("cura")
 
 from .FlavorParser import FlavorParser
+from .GCodeLines import iterateLines
 from . import MarlinFlavorParser, RepRapFlavorParser
 
 if TYPE_CHECKING:
@@ -43,7 +44,7 @@ class GCodeReader(MeshReader):
         Application.getInstance().getPreferences().addPreference("gcodereader/show_caution", True)
 
     def preReadFromStream(self, stream, *args, **kwargs):
-        for line in stream.split("\n"):
+        for line in iterateLines(stream):
             if line[:len(self._flavor_keyword)] == self._flavor_keyword:
                 try:
                     self._flavor_reader = self._flavor_readers_dict[line[len(self._flavor_keyword):].rstrip()]
@@ -58,20 +59,20 @@ class GCodeReader(MeshReader):
 
     # PreRead is used to get the correct flavor. If not, Marlin is set by default
     def preRead(self, file_name, *args, **kwargs):
+        # The flavor is in the header, so this usually stops reading after a few lines.
         with open(file_name, "r", encoding = "utf-8") as file:
-            file_data = file.read()
-        return self.preReadFromStream(file_data, args, kwargs)
+            return self.preReadFromStream(file, args, kwargs)
 
-    def readFromStream(self, stream: str, filename: str) -> Optional["CuraSceneNode"]:
+    def readFromStream(self, stream: Union[str, IO[str]], filename: str) -> Optional["CuraSceneNode"]:
         if self._flavor_reader is None:
             return None
         return self._flavor_reader.processGCodeStream(stream, filename)
 
     def _read(self, file_name: str) -> Union["SceneNode", List["SceneNode"]]:
-        with open(file_name, "r", encoding = "utf-8") as file:
-            file_data = file.read()
         result = []  # type: List[SceneNode]
-        node = self.readFromStream(file_data, file_name)
+        # The file is parsed while it is read, instead of being loaded in memory first.
+        with open(file_name, "r", encoding = "utf-8") as file:
+            node = self.readFromStream(file, file_name)
         if node is not None:
             result.append(node)
         return result
@@ -0,0 +1,74 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from array import array
+from typing import Iterator, List, Sequence, Union
+
+import numpy
+
+# Values stored per path point: X, Y, Z, F (feedrate), E (extrusion) and the line type.
+POINT_SIZE = 6
+
+
+class PathBuffer:
+    """Growable buffer with the points of the path of the current layer and extruder.
+
+    The FlavorParser used to keep every point as a Python list of 6 objects. The buffer stores them in a flat
+    array of doubles instead, which ``toArray`` exposes to NumPy without copying. It keeps the list interface
+    (``append``, ``clear``, ``len``, indexing) the ``_gCode*`` handlers of the flavor parsers use.
+    """
+
+    def __init__(self) -> None:
+        self._data = array("d")
+
+    def append(self, point: Sequence[Union[float, int]]) -> None:
+        self._data.extend(point)
+
+    def clear(self) -> None:
+        del self._data[:]
+
+    def __len__(self) -> int:
+        return len(self._data) // POINT_SIZE
+
+    def __getitem__(self, index: int) -> List[float]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        return self._data[index * POINT_SIZE:(index + 1) * POINT_SIZE].tolist()
+
+    def __iter__(self) -> Iterator[List[float]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def toArray(self) -> numpy.ndarray:
+        """The points as an (n, 6) float64 array.
+
+        This is a copy: a view would keep the buffer exported and make the next ``clear`` fail.
+        """
+        return numpy.frombuffer(self._data, dtype = numpy.float64).reshape(-1, POINT_SIZE).copy()
+
+
+def calculateLineWidths(points: numpy.ndarray, extrusion_values: numpy.ndarray, filament_diameter: float, layer_thickness: float) -> numpy.ndarray:
+    """Width of every line between consecutive points, from the volume of filament extruded along it.
+
+    Vectorized version of ``FlavorParser._calculateLineWidth``, with the same float32 arithmetic. Only the squares
+    differ: the scalar version squares through ``powf``, which can be 1 ULP off.
+
+    :param points: (n, 3) float32 points in the X, Z, -Y layer data coordinates.
+    :param extrusion_values: (n, ) float32 extrusion value at every point.
+    :return: (n - 1, ) float32 line widths.
+    """
+    # Area of the filament
+    filament_area = (filament_diameter / 2) ** 2 * numpy.pi
+    # Volume of the extruded filament
+    extruded_volume = (extrusion_values[1:] - extrusion_values[:-1]) * filament_area
+    # Length of the printed line
+    line_length = numpy.sqrt((points[1:, 0] - points[:-1, 0]) ** 2 + (points[1:, 2] - points[:-1, 2]) ** 2)
+    with numpy.errstate(divide = "ignore", invalid = "ignore"):
+        # The cross section is a rectangle with area equal to layer_thickness * line width
+        line_widths = extruded_volume / line_length / layer_thickness
+    # A threshold is set to avoid weird paths in the GCode, and prevent showing infinitely wide or negative lines
+    line_widths = numpy.where(line_widths > 1.2, 0.35, numpy.where(line_widths < 0.0, 0.0, line_widths))
+    # When the extruder recovers from a retraction, we get zero distance
+    return numpy.where(line_length == 0, 0.1, line_widths).astype(numpy.float32)
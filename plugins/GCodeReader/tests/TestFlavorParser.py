@@ -0,0 +1,135 @@
+import io
+from typing import List, Union
+from unittest.mock import MagicMock, patch
+
+import numpy
+
+from cura.LayerDataDecorator import LayerDataDecorator
+from cura.LayerPolygon import LayerPolygon
+from cura.Scene.GCodeListDecorator import GCodeListDecorator
+
+from .. import FlavorParser as FlavorParserModule
+from ..FlavorParser import FlavorParser
+
+color_map = numpy.array([[i / 12, 0.5, 1 - i / 12, 1.0] for i in range(12)])
+
+gcode = """;FLAVOR:Marlin
+;Generated with Cura_SteamEngine 5.0
+G28
+G92 E0
+;LAYER:-1
+;TYPE:SKIRT
+G0 F9000 X10 Y10 Z0.3
+G1 F1800 X20 Y10 E0.5
+G1 X20 Y20 E1.0
+;LAYER:0
+;TYPE:WALL-OUTER
+G1 X30 Y20 Z0.5 E1.6 ; comment
+G1 X30 Y20 E1.7
+G1 E-1.0
+G0 X40 Y30
+G1 E1.7
+G1 X50 Y30 E1000
+G92 E0
+;TYPE:FILL
+G1 X50 Y40 E0.4
+T1
+G1 X60 Y40 E0.3
+G1 X60 Y50 E0.8
+;LAYER:2
+G1 X70 Y50 Z0.7 E1.3
+G1 X70 Y60 E1.8
+"""
+
+
+def legacyCreatePolygon(self, layer_thickness: float, path: List[List[Union[float, int]]], extruder_offsets: List[float]) -> bool:
+    """The _createPolygon of the FlavorParser before it was vectorized, with a Python loop per point."""
+
+    if sum(1 for point in path if point[5] > 0) < 2:
+        return False
+    self._layer_data_builder.addLayer(self._layer_number)
+    self._layer_data_builder.setLayerHeight(self._layer_number, path[0][2])
+    self._layer_data_builder.setLayerThickness(self._layer_number, layer_thickness)
+    this_layer = self._layer_data_builder.getLayer(self._layer_number)
+    count = len(path)
+    line_types = numpy.empty((count - 1, 1), numpy.int32)
+    line_widths = numpy.empty((count - 1, 1), numpy.float32)
+    line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
+    line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
+    line_widths[:, 0] = 0.35
+    line_thicknesses[:, 0] = layer_thickness
+    points = numpy.empty((count, 3), numpy.float32)
+    extrusion_values = numpy.empty((count, 1), numpy.float32)
+    for i, point in enumerate(path):
+        points[i, :] = [point[0] + extruder_offsets[0], point[2], -point[1] - extruder_offsets[1]]
+        extrusion_values[i] = point[4]
+        if i > 0:
+            line_feedrates[i - 1] = point[3]
+            line_types[i - 1] = point[5]
+            if point[5] in [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType]:
+                line_widths[i - 1] = 0.1
+                line_thicknesses[i - 1] = 0.0
+            else:
+                line_widths[i - 1] = self._calculateLineWidth(points[i], points[i - 1], extrusion_values[i], extrusion_values[i - 1], layer_thickness)
+
+    this_poly = LayerPolygon(self._extruder_number, line_types, points, line_widths, line_thicknesses, line_feedrates)
+    this_poly.buildCache()
+    this_layer.polygons.append(this_poly)
+    return True
+
+
+def parse(stream, legacy = False):
+    """Parses the G-code with the FlavorParser and returns its layer data and G-code list.
+
+    :param legacy: Parse it the previous way: the points of the path as Python lists and the layer arrays built
+    point by point.
+    """
+
+    extruder = MagicMock()
+    extruder.getProperty = MagicMock(return_value = 1.75)  # The material diameter.
+    global_stack = MagicMock()
+    global_stack.extruderList = [extruder, extruder]
+    global_stack.getProperty = MagicMock(return_value = True)  # The machine center is zero.
+    application = MagicMock()
+    application.getGlobalContainerStack = MagicMock(return_value = global_stack)
+    application.getPreferences().getValue = MagicMock(return_value = False)  # No compact layer data, no caution.
+
+    with patch.object(FlavorParserModule.CuraApplication, "getInstance", MagicMock(return_value = application)), \
+            patch.object(FlavorParserModule.ExtruderManager, "getInstance", MagicMock()), \
+            patch.object(FlavorParserModule, "Message", MagicMock()), \
+            patch.object(FlavorParserModule, "CuraSceneNode", MagicMock()), \
+            patch.object(LayerPolygon, "getColorMap", return_value = color_map):
+        parser = FlavorParser()
+        if legacy:
+            with patch.object(FlavorParserModule, "PathBuffer", list), patch.object(FlavorParser, "_createPolygon", legacyCreatePolygon):
+                scene_node = parser.processGCodeStream(stream, "test.gcode")
+        else:
+            scene_node = parser.processGCodeStream(stream, "test.gcode")
+
+    decorators = [call[0][0] for call in scene_node.addDecorator.call_args_list]
+    layer_data = next(decorator for decorator in decorators if isinstance(decorator, LayerDataDecorator)).getLayerData()
+    gcode_list = next(decorator for decorator in decorators if isinstance(decorator, GCodeListDecorator)).getGCodeList()
+    return layer_data, gcode_list
+
+
+def test_processGCodeStreamMatchesLegacyParsing():
+    legacy_layer_data, legacy_gcode_list = parse(gcode, legacy = True)
+    layer_data, gcode_list = parse(io.StringIO(gcode))
+
+    assert "".join(gcode_list) == "".join(legacy_gcode_list)
+    assert len(gcode_list) == 4  # The lines before the first layer and one entry per layer.
+
+    assert sorted(layer_data.getLayers()) == sorted(legacy_layer_data.getLayers()) == [0, 1, 2, 3]  # Layer 2 is the gap.
+    for layer_number, legacy_layer in legacy_layer_data.getLayers().items():
+        layer = layer_data.getLayer(layer_number)
+        assert (layer.height, layer.thickness) == (legacy_layer.height, legacy_layer.thickness)
+        assert len(layer.polygons) == len(legacy_layer.polygons)
+        for polygon, legacy_polygon in zip(layer.polygons, legacy_layer.polygons):
+            assert polygon.extruder == legacy_polygon.extruder
+            for name in ("types", "data", "lineThicknesses", "lineFeedrates"):
+                assert numpy.array_equal(getattr(polygon, name), getattr(legacy_polygon, name)), name
+            # The previous loop squared float32 scalars through powf, which can be 1 ULP off.
+            assert numpy.allclose(polygon.lineWidths, legacy_polygon.lineWidths, rtol = 1e-6, atol = 0)
+
+    assert numpy.array_equal(layer_data.getVertices(), legacy_layer_data.getVertices())
+    assert numpy.array_equal(layer_data.getIndices(), legacy_layer_data.getIndices())
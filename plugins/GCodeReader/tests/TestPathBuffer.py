@@ -0,0 +1,39 @@
+import io
+
+import numpy
+
+from ..GCodeLines import iterateLines
+from ..PathBuffer import PathBuffer, calculateLineWidths
+
+
+def test_pathBuffer():
+    path = PathBuffer()
+    path.append([1.0, 2.0, 0.2, 40.0, 0.5, 8])
+    path.append([3.0, 2.0, 0.2, 40.0, 0.6, 1])
+    assert len(path) == 2
+    assert path[-1] == [3.0, 2.0, 0.2, 40.0, 0.6, 1.0]
+    assert list(path)[0] == [1.0, 2.0, 0.2, 40.0, 0.5, 8.0]
+
+    data = path.toArray()
+    assert data.shape == (2, 6)
+    path.clear()  # Must not fail while the array of the previous path is still alive.
+    assert len(path) == 0
+    assert data[1, 4] == 0.6
+
+
+def test_calculateLineWidths():
+    points = numpy.array([[0, 0, 0], [10, 0, 0], [10, 0, 0], [20, 0, 0], [30, 0, 0]], dtype = numpy.float32)
+    extrusion_values = numpy.array([0, 0.1, 0.2, 100, 99], dtype = numpy.float32)
+    widths = calculateLineWidths(points, extrusion_values, 1.75, 0.2)
+    assert widths.dtype == numpy.float32
+    assert numpy.isclose(widths[0], 0.1 * (1.75 / 2) ** 2 * numpy.pi / 10 / 0.2)
+    assert widths[1] == numpy.float32(0.1)  # No distance.
+    assert widths[2] == numpy.float32(0.35)  # Too wide.
+    assert widths[3] == 0.0  # Retraction.
+
+
+def test_iterateLines():
+    assert list(iterateLines("G1 X1\nG1 X2\n")) == ["G1 X1\n", "G1 X2\n"]
+    assert list(iterateLines("G1 X1\n\nG1 X2")) == ["G1 X1\n", "\n", "G1 X2"]
+    assert list(iterateLines("")) == []
+    assert list(iterateLines(io.StringIO("G1 X1\nG1 X2"))) == ["G1 X1\n", "G1 X2"]
@@ -9,6 +9,7 @@ from UM.Logger import Logger
 from UM.Application import Application
 from UM.Settings.InstanceContainer import InstanceContainer
 from cura.Machines.ContainerTree import ContainerTree
+from cura.Utils.BCN3Dutils.PostSliceBarrier import PostSliceBarrier
 
 from UM.i18n import i18nCatalog
 
@@ -79,6 +80,8 @@ class GCodeWriter(MeshWriter):
         if not hasattr(scene, "gcode_dict"):
             self.setInformation(catalog.i18nc("@warning:status", "Please prepare G-code before exporting."))
             return False
+        # Don't write G-code that the post-slice fixes are still working on.
+        PostSliceBarrier.getInstance().wait(active_build_plate)
         gcode_dict = getattr(scene, "gcode_dict")
         gcode_list = gcode_dict.get(active_build_plate, None)
         if gcode_list is not None:
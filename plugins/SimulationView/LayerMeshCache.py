@@ -0,0 +1,76 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LayerMeshCache:
+    """Least recently used cache of the meshes of single layers of the layer data.
+
+    The compatibility mode of the simulation view builds the meshes of the top layers every time the layer slider moves.
+    With this cache only the layers that newly come into view are built. The meshes belong to one layer data: the
+    cache empties itself when it is asked for the meshes of another one. It does not keep the layer data alive.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._capacity = capacity
+        self._meshes = OrderedDict()  # type: OrderedDict[Hashable, Any]
+        self._layer_data_reference = None  # type: Optional[weakref.ref]
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def getCapacity(self) -> int:
+        return self._capacity
+
+    def setCapacity(self, capacity: int) -> None:
+        with self._lock:
+            self._capacity = capacity
+            self._evict()
+
+    def get(self, layer_data: Any, key: Hashable, create: Callable[[], Any]) -> Any:
+        """The mesh for the key, created with ``create`` if it is not cached yet.
+
+        :param layer_data: The layer data the mesh is made from.
+        :param key: What identifies the mesh within the layer data, like the layer number and the color scheme.
+        :param create: Creates the mesh. It is called outside of the lock, so that other threads can use the cache.
+        """
+
+        with self._lock:
+            if self._layer_data_reference is None or self._layer_data_reference() is not layer_data:
+                self._meshes.clear()
+                self._layer_data_reference = weakref.ref(layer_data)
+            elif key in self._meshes:
+                self._meshes.move_to_end(key)
+                self._hits += 1
+                return self._meshes[key]
+            self._misses += 1
+
+        mesh = create()
+
+        with self._lock:
+            if self._layer_data_reference() is layer_data:
+                self._meshes[key] = mesh
+                self._evict()
+        return mesh
+
+    def clear(self) -> None:
+        with self._lock:
+            self._meshes.clear()
+            self._layer_data_reference = None
+
+    def getStatistics(self) -> Dict[str, int]:
+        """The number of meshes that were found and not found in the cache, and the number of meshes it holds."""
+
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": len(self._meshes)}
+
+    def __len__(self) -> int:
+        return len(self._meshes)
+
+    def _evict(self) -> None:
+        while len(self._meshes) > self._capacity:
+            self._meshes.popitem(last = False)
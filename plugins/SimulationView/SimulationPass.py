@@ -152,33 +152,24 @@ class SimulationPass(RenderPass):
                     for layer in sorted(element_counts.keys()):
                         # In the current layer, we show just the indicated paths
                         if layer == self._layer_view._current_layer_num:
-                            # We look for the position of the head, searching the point of the current path
-                            index = int(self._layer_view.getCurrentPath()) if not math.isnan(
-                                self._layer_view.getCurrentPath()) else 0
-                            for polygon in layer_data.getLayer(layer).polygons:
-                                # The size indicates all values in the two-dimension array, and the second dimension is
-                                # always size 3 because we have 3D points.
-                                if index >= polygon.data.size // 3 :
-                                    index -= polygon.data.size // 3
-                                    continue
+                            # We look for the position of the head with the time index, which knows where every path starts.
+                            time_index = self._layer_view.getTimeIndex(layer_data.getLayer(layer))
+                            head = time_index.getHeadPosition(self._layer_view.getCurrentPath()) if time_index is not None else None
+                            if head is not None:
                                 # The head position is calculated and translated
-                                ratio = self._layer_view.getCurrentPath() - math.floor(self._layer_view.getCurrentPath())
-                                pos_a = Vector(polygon.data[index][0], polygon.data[index][1],
-                                               polygon.data[index][2])
+                                point_a, point_b, ratio = head
+                                pos_a = Vector(point_a[0], point_a[1], point_a[2])
                                 vertex_before_head = pos_a
                                 vertex_distance_ratio = ratio
-                                if ratio <= 0.0001 or index + 1 == len(polygon.data):
+                                if point_b is None:
                                     # in case there multiple polygons and polygon changes, the first point has the same value as the last point in the previous polygon
                                     head_position = pos_a + node.getWorldPosition()
                                 else:
-                                    pos_b = Vector(polygon.data[index + 1][0],
-                                                   polygon.data[index + 1][1],
-                                                   polygon.data[index + 1][2])
+                                    pos_b = Vector(point_b[0], point_b[1], point_b[2])
                                     vec = pos_a * (1.0 - ratio) + pos_b * ratio
                                     head_position = vec + node.getWorldPosition()
                                     vertex_after_head = pos_b
                                     towards_next_vertex = 2  # Add two to the index to print the current and next vertices as an 'unfinished' line (to the nozzle).
-                                break
                             break
                         if self._layer_view.getMinimumLayer() > layer:
                             start += element_counts[layer]
@@ -0,0 +1,87 @@
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import math
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+import numpy
+
+if TYPE_CHECKING:
+    from cura.LayerPolygon import LayerPolygon
+
+
+class SimulationTimeIndex:
+    """When every path of a layer ends in the simulation, to find the path at a time with a binary search.
+
+    The paths are the points of the polygons of the layer, one after the other. Path ``i`` of a polygon is its line
+    from point ``i`` to point ``i + 1``. The last path of every polygon takes no time: it stands for the tool change
+    to the next polygon.
+    """
+
+    def __init__(self, polygons: List["LayerPolygon"], simulation_factor: float) -> None:
+        self._polygons = [polygon for polygon in polygons if len(polygon.data) > 0]
+
+        point_counts = [len(polygon.data) for polygon in self._polygons]
+        # The first path of every polygon.
+        self._point_offsets = numpy.zeros(len(point_counts) + 1, dtype = numpy.int64)
+        numpy.cumsum(point_counts, out = self._point_offsets[1:])
+        if not self._polygons:
+            self._cumulative_durations = numpy.zeros(0)
+            return
+
+        # The paths of all polygons one after the other, with the tool change as the last path of every polygon.
+        points = numpy.concatenate([polygon.data for polygon in self._polygons])
+        is_line = numpy.ones(len(points), dtype = bool)
+        is_line[self._point_offsets[1:] - 1] = False
+        feedrates = numpy.concatenate([polygon.lineFeedrates.ravel()[:len(polygon.data) - 1] for polygon in self._polygons])
+
+        line_lengths = numpy.linalg.norm(numpy.diff(points, axis = 0), axis = 1)[is_line[:-1]]
+        durations = numpy.zeros(len(points))
+        with numpy.errstate(divide = "ignore", invalid = "ignore"):
+            durations[is_line] = line_lengths / feedrates
+        durations /= simulation_factor
+
+        # The time at which every path ends.
+        self._cumulative_durations = numpy.cumsum(durations)
+
+    def __len__(self) -> int:
+        return len(self._cumulative_durations)
+
+    def getTotalDuration(self) -> float:
+        return float(self._cumulative_durations[-1]) if len(self) > 0 else 0.0
+
+    def getTime(self, path_index: int) -> float:
+        """The time at which a path ends."""
+
+        return float(self._cumulative_durations[path_index])
+
+    def getPath(self, time: float) -> float:
+        """The path at a time, with the part of it that is done as fraction."""
+
+        # The first path that ends after the time.
+        index = min(int(numpy.searchsorted(self._cumulative_durations, time, side = "right")), len(self) - 1)
+        start_time = float(self._cumulative_durations[index - 1]) if index > 0 else 0.0
+        end_time = float(self._cumulative_durations[index])
+        duration = end_time - start_time
+        fraction = 0.0 if duration == 0.0 else (time - start_time) / duration
+        return index + min(max(fraction, 0.0), 1.0)
+
+    def getHeadPosition(self, path: float) -> Optional[Tuple[numpy.ndarray, Optional[numpy.ndarray], float]]:
+        """Where the nozzle is at a path.
+
+        :return: The point of the path, the point the nozzle goes to next or None if it is exactly at the point, and
+        how far along it is to the next point. None if the path is not on this layer.
+        """
+
+        index = int(path) if not math.isnan(path) else 0
+        if index < 0 or index >= self._point_offsets[-1]:
+            return None
+        polygon_index = int(numpy.searchsorted(self._point_offsets, index, side = "right")) - 1
+        data = self._polygons[polygon_index].data
+        index -= int(self._point_offsets[polygon_index])
+
+        ratio = path - math.floor(path) if not math.isnan(path) else 0.0
+        if ratio <= 0.0001 or index + 1 == len(data):
+            # In case there are multiple polygons and the polygon changes, the first point has the same value as the last point in the previous polygon.
+            return data[index], None, ratio
+        return data[index], data[index + 1], ratio
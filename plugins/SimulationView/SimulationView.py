@@ -31,18 +31,23 @@ from UM.View.GL.ShaderProgram import ShaderProgram
 from UM.i18n import i18nCatalog
 from cura.CuraView import CuraView
 from cura.LayerPolygon import LayerPolygon  # To distinguish line types.
+from cura.LayerStatistics import LayerStatistics
 from cura.Scene.ConvexHullNode import ConvexHullNode
 from cura.CuraApplication import CuraApplication
 
+from .LayerMeshCache import LayerMeshCache
 from .NozzleNode import NozzleNode
+from .SimulationTimeIndex import SimulationTimeIndex
 from .SimulationPass import SimulationPass
 from .SimulationViewProxy import SimulationViewProxy
 import numpy
 import os.path
+import weakref
 
 from typing import Optional, TYPE_CHECKING, List, cast
 
 if TYPE_CHECKING:
+    from cura.Layer import Layer
     from UM.Scene.SceneNode import SceneNode
     from UM.Scene.Scene import Scene
     from UM.Settings.ContainerStack import ContainerStack
@@ -71,6 +76,7 @@ class SimulationView(CuraView):
         self._current_layer_mesh = None
         self._current_layer_jumps = None
         self._top_layers_job = None  # type: Optional["_CreateTopLayersJob"]
+        self._layer_mesh_cache = LayerMeshCache()
         self._activity = False
         self._old_max_layers = 0
 
@@ -98,8 +104,8 @@ class SimulationView(CuraView):
         self._min_line_width = sys.float_info.max
         self._min_flow_rate = sys.float_info.max
         self._max_flow_rate = sys.float_info.min
-        self._cumulative_line_duration_layer: Optional[int] = None
-        self._cumulative_line_duration: List[float] = []
+        # The time index of every layer that was simulated, until the layer data is replaced.
+        self._time_indices = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[Layer, SimulationTimeIndex]
 
         self._global_container_stack: Optional[ContainerStack] = None
         self._proxy = None
@@ -112,6 +118,8 @@ class SimulationView(CuraView):
         Application.getInstance().getPreferences().addPreference("view/top_layer_count", 5)
         Application.getInstance().getPreferences().addPreference("view/only_show_top_layers", False)
         Application.getInstance().getPreferences().addPreference("view/force_layer_view_compatibility_mode", False)
+        # Keep the layer data in half floats and bytes, for prints too large to fit in memory otherwise.
+        Application.getInstance().getPreferences().addPreference("view/compact_layer_data", False)
 
         Application.getInstance().getPreferences().addPreference("layerview/layer_view_type", 1)  # Default to "Line Type".
         Application.getInstance().getPreferences().addPreference("layerview/extruder_opacities", "")
@@ -194,33 +202,10 @@ class SimulationView(CuraView):
         return self._current_path_num
 
     def setTime(self, time: float) -> None:
-        cumulative_line_duration = self.cumulativeLineDuration()
-        if len(cumulative_line_duration) > 0:
+        time_index = self.getTimeIndex()
+        if time_index is not None and len(time_index) > 0:
             self._current_time = time
-            left_i = 0
-            right_i = len(cumulative_line_duration) - 1
-            total_duration = cumulative_line_duration[-1]
-            # make an educated guess about where to start
-            i = int(right_i * max(0.0, min(1.0, self._current_time / total_duration)))
-            # binary search for the correct path
-            while left_i < right_i:
-                if cumulative_line_duration[i] <= self._current_time:
-                    left_i = i + 1
-                else:
-                    right_i = i
-                i = int((left_i + right_i) / 2)
-
-            left_value = cumulative_line_duration[i - 1] if i > 0 else 0.0
-            right_value = cumulative_line_duration[i]
-
-            if not (left_value <= self._current_time <= right_value):
-                Logger.warn(
-                    f"Binary search error (out of bounds): index {i}: left value {left_value} right value {right_value} and current time is {self._current_time}")
-
-            segment_duration = right_value - left_value
-            fractional_value = 0.0 if segment_duration == 0.0 else (self._current_time - left_value) / segment_duration
-
-            self.setPath(i + fractional_value)
+            self.setPath(time_index.getPath(time))
 
     def advanceTime(self, time_increase: float) -> bool:
         """
@@ -229,9 +214,8 @@ class SimulationView(CuraView):
         :param time_increase: The amount of time to advance (in seconds).
         :return: True if the time was advanced, False if the end of the simulation was reached.
         """
-        total_duration = 0.0
-        if len(self.cumulativeLineDuration()) > 0:
-            total_duration = self.cumulativeLineDuration()[-1]
+        time_index = self.getTimeIndex()
+        total_duration = time_index.getTotalDuration() if time_index is not None else 0.0
 
         if self._current_time + time_increase > total_duration:
             # If we have reached the end of the simulation, go to the next layer.
@@ -247,24 +231,20 @@ class SimulationView(CuraView):
             self.setTime(self._current_time + time_increase)
         return True
 
-    def cumulativeLineDuration(self) -> List[float]:
-        # Make sure _cumulative_line_duration is initialized properly
-        if self.getCurrentLayer() != self._cumulative_line_duration_layer:
-            #clear cache
-            self._cumulative_line_duration = []
-            total_duration = 0.0
-            polylines = self.getLayerData()
-            if polylines is not None:
-                for polyline in polylines.polygons:
-                    for line_duration in list((polyline.lineLengths / polyline.lineFeedrates)[0]):
-                        total_duration += line_duration / SimulationView.SIMULATION_FACTOR
-                        self._cumulative_line_duration.append(total_duration)
-                    # for tool change we add an extra tool path
-                    self._cumulative_line_duration.append(total_duration)
-            # set current cached layer
-            self._cumulative_line_duration_layer = self.getCurrentLayer()
-
-        return self._cumulative_line_duration
+    def getTimeIndex(self, layer: Optional["Layer"] = None) -> Optional[SimulationTimeIndex]:
+        """The times at which the paths of a layer end in the simulation.
+
+        :param layer: The layer, or None for the current layer.
+        """
+        if layer is None:
+            layer = self.getLayerData()
+        if layer is None:
+            return None
+        time_index = self._time_indices.get(layer)
+        if time_index is None:
+            time_index = SimulationTimeIndex(layer.polygons, SimulationView.SIMULATION_FACTOR)
+            self._time_indices[layer] = time_index
+        return time_index
 
     def getLayerData(self) -> Optional["LayerData"]:
         scene = self.getController().getScene()
@@ -375,9 +355,9 @@ class SimulationView(CuraView):
             # update _current time when the path is changed by user
             if self._current_path_num < self._max_paths and round(self._current_path_num)== self._current_path_num:
                 actual_path_num = int(self._current_path_num)
-                cumulative_line_duration = self.cumulativeLineDuration()
-                if actual_path_num < len(cumulative_line_duration):
-                    self._current_time = cumulative_line_duration[actual_path_num]
+                time_index = self.getTimeIndex()
+                if time_index is not None and actual_path_num < len(time_index):
+                    self._current_time = time_index.getTime(actual_path_num)
 
             self._startUpdateTopLayers()
             self.currentPathNumChanged.emit()
@@ -532,16 +512,11 @@ class SimulationView(CuraView):
             self.setActivity(True)
             min_layer_number = sys.maxsize
             max_layer_number = -sys.maxsize
-            for layer_id in layer_data.getLayers():
-
-                # If a layer doesn't contain any polygons, skip it (for infill meshes taller than print objects
-                if len(layer_data.getLayer(layer_id).polygons) < 1:
-                    continue
-
-                if max_layer_number < layer_id:
-                    max_layer_number = layer_id
-                if min_layer_number > layer_id:
-                    min_layer_number = layer_id
+            # Layers without polygons are left out (for infill meshes taller than print objects).
+            layer_numbers = layer_data.getStatistics().getLayerNumbers()
+            if layer_numbers:
+                min_layer_number = layer_numbers[0]
+                max_layer_number = layer_numbers[-1]
             layer_count = max_layer_number - min_layer_number
 
             if new_max_layers < layer_count:
@@ -583,7 +558,6 @@ class SimulationView(CuraView):
         self._max_thickness = sys.float_info.min
         self._min_flow_rate = sys.float_info.max
         self._max_flow_rate = sys.float_info.min
-        self._cumulative_line_duration = {}
 
         # The colour scheme is only influenced by the visible lines, so filter the lines by if they should be visible.
         visible_line_types = []
@@ -609,33 +583,27 @@ class SimulationView(CuraView):
             if not layer_data:
                 continue
 
-            for layer_index in layer_data.getLayers():
-                for polyline in layer_data.getLayer(layer_index).polygons:
-                    is_visible = numpy.isin(polyline.types, visible_line_types)
-                    visible_indices = numpy.where(is_visible)[0]
-                    visible_indicies_with_extrusion = numpy.where(numpy.isin(polyline.types, visible_line_types_with_extrusion))[0]
-                    if visible_indices.size == 0:  # No items to take maximum or minimum of.
-                        continue
-                    visible_feedrates = numpy.take(polyline.lineFeedrates, visible_indices)
-                    visible_feedrates_with_extrusion = numpy.take(polyline.lineFeedrates, visible_indicies_with_extrusion)
-                    visible_linewidths = numpy.take(polyline.lineWidths, visible_indices)
-                    visible_linewidths_with_extrusion = numpy.take(polyline.lineWidths, visible_indicies_with_extrusion)
-                    visible_thicknesses = numpy.take(polyline.lineThicknesses, visible_indices)
-                    visible_thicknesses_with_extrusion = numpy.take(polyline.lineThicknesses, visible_indicies_with_extrusion)
-                    self._max_feedrate = max(float(visible_feedrates.max()), self._max_feedrate)
-                    if visible_feedrates_with_extrusion.size != 0:
-                        flow_rates = visible_feedrates_with_extrusion * visible_linewidths_with_extrusion * visible_thicknesses_with_extrusion
-                        self._min_flow_rate = min(float(flow_rates.min()), self._min_flow_rate)
-                        self._max_flow_rate = max(float(flow_rates.max()), self._max_flow_rate)
-                    self._min_feedrate = min(float(visible_feedrates.min()), self._min_feedrate)
-                    self._max_line_width = max(float(visible_linewidths.max()), self._max_line_width)
-                    self._min_line_width = min(float(visible_linewidths.min()), self._min_line_width)
-                    self._max_thickness = max(float(visible_thicknesses.max()), self._max_thickness)
-                    try:
-                        self._min_thickness = min(float(visible_thicknesses[numpy.nonzero(visible_thicknesses)].min()), self._min_thickness)
-                    except ValueError:
-                        # Sometimes, when importing a GCode the line thicknesses are zero and so the minimum (avoiding the zero) can't be calculated.
-                        Logger.log("w", "Min thickness can't be calculated because all the values are zero")
+            # Combine the ranges of the visible line types of every layer, computed when the layer data was made.
+            statistics = layer_data.getStatistics()
+            if not statistics.hasLines(visible_line_types):  # No items to take maximum or minimum of.
+                continue
+            min_feedrate, max_feedrate = statistics.getRange(LayerStatistics.Feedrate, visible_line_types)
+            min_line_width, max_line_width = statistics.getRange(LayerStatistics.LineWidth, visible_line_types)
+            min_thickness, max_thickness = statistics.getRange(LayerStatistics.Thickness, visible_line_types)
+            self._max_feedrate = max(max_feedrate, self._max_feedrate)
+            if statistics.hasLines(visible_line_types_with_extrusion):
+                min_flow_rate, max_flow_rate = statistics.getRange(LayerStatistics.FlowRate, visible_line_types_with_extrusion)
+                self._min_flow_rate = min(min_flow_rate, self._min_flow_rate)
+                self._max_flow_rate = max(max_flow_rate, self._max_flow_rate)
+            self._min_feedrate = min(min_feedrate, self._min_feedrate)
+            self._max_line_width = max(max_line_width, self._max_line_width)
+            self._min_line_width = min(min_line_width, self._min_line_width)
+            self._max_thickness = max(max_thickness, self._max_thickness)
+            if min_thickness != numpy.inf:
+                self._min_thickness = min(min_thickness, self._min_thickness)
+            else:
+                # Sometimes, when importing a GCode the line thicknesses are zero and so the minimum (avoiding the zero) can't be calculated.
+                Logger.log("w", "Min thickness can't be calculated because all the values are zero")
 
         if old_min_feedrate != self._min_feedrate or old_max_feedrate != self._max_feedrate \
                 or old_min_linewidth != self._min_line_width or old_max_linewidth != self._max_line_width \
@@ -782,6 +750,11 @@ class SimulationView(CuraView):
     def getCurrentLayerJumps(self):
         return self._current_layer_jumps
 
+    def getLayerMeshCache(self) -> LayerMeshCache:
+        """The meshes of single layers that the compatibility mode shows, with its hit and miss counters."""
+
+        return self._layer_mesh_cache
+
     def _onGlobalStackChanged(self) -> None:
         self._global_container_stack = Application.getInstance().getGlobalContainerStack()
         if self._global_container_stack:
@@ -802,7 +775,8 @@ class SimulationView(CuraView):
 
         self.setBusy(True)
 
-        self._top_layers_job = _CreateTopLayersJob(self._controller.getScene(), self._current_layer_num, self._solid_layers)
+        self._top_layers_job = _CreateTopLayersJob(self._controller.getScene(), self._current_layer_num, self._solid_layers,
+                                                   self._layer_mesh_cache, self._layer_view_type)
         self._top_layers_job.finished.connect(self._updateCurrentLayerMesh)  # type: ignore  # mypy doesn't understand the whole private class thing that's going on here.
         self._top_layers_job.start()  # type: ignore
 
@@ -821,6 +795,8 @@ class SimulationView(CuraView):
 
     def _updateWithPreferences(self) -> None:
         self._solid_layers = int(Application.getInstance().getPreferences().getValue("view/top_layer_count"))
+        # Keep the layers of a few positions of the layer slider, so scrubbing back and forth builds no layer twice.
+        self._layer_mesh_cache.setCapacity(max(64, 4 * self._solid_layers))
         self._only_show_top_layers = bool(Application.getInstance().getPreferences().getValue("view/only_show_top_layers"))
         self._compatibility_mode = self._evaluateCompatibilityMode()
 
@@ -871,12 +847,14 @@ class SimulationView(CuraView):
         CuraApplication.getInstance().getPreferences().setValue(self._no_layers_warning_preference, not checked)
 
 class _CreateTopLayersJob(Job):
-    def __init__(self, scene: "Scene", layer_number: int, solid_layers: int) -> None:
+    def __init__(self, scene: "Scene", layer_number: int, solid_layers: int, layer_mesh_cache: LayerMeshCache, color_scheme: int) -> None:
         super().__init__()
 
         self._scene = scene
         self._layer_number = layer_number
         self._solid_layers = solid_layers
+        self._layer_mesh_cache = layer_mesh_cache
+        self._color_scheme = color_scheme
         self._cancel = False
 
     def run(self) -> None:
@@ -896,7 +874,8 @@ class _CreateTopLayersJob(Job):
                 continue
 
             try:
-                layer = layer_data.getLayer(layer_number).createMesh()
+                layer = self._layer_mesh_cache.get(layer_data, (layer_number, "layer", self._color_scheme),
+                                                   layer_data.getLayer(layer_number).createMesh)
             except Exception:
                 Logger.logException("w", "An exception occurred while creating layer mesh.")
                 return
@@ -922,7 +901,8 @@ class _CreateTopLayersJob(Job):
             return
 
         Job.yieldThread()
-        jump_mesh = layer_data.getLayer(self._layer_number).createJumps()
+        jump_mesh = self._layer_mesh_cache.get(layer_data, (self._layer_number, "jumps", self._color_scheme),
+                                               layer_data.getLayer(self._layer_number).createJumps)
         if not jump_mesh or jump_mesh.getVertices() is None:
             jump_mesh = None
 
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from ..LayerMeshCache import LayerMeshCache
+
+
+class FakeLayerData:
+    pass
+
+
+def test_getCachesMeshes():
+    cache = LayerMeshCache()
+    layer_data = FakeLayerData()
+    create = MagicMock(return_value = "mesh")
+    assert cache.get(layer_data, (3, "layer", 1), create) == "mesh"
+    assert cache.get(layer_data, (3, "layer", 1), create) == "mesh"
+    assert create.call_count == 1
+    assert cache.getStatistics() == {"hits": 1, "misses": 1, "size": 1}
+
+    cache.get(layer_data, (3, "layer", 0), create)  # Another color scheme.
+    assert create.call_count == 2
+
+
+def test_leastRecentlyUsedEvicted():
+    cache = LayerMeshCache(capacity = 2)
+    layer_data = FakeLayerData()
+    cache.get(layer_data, 1, lambda: "one")
+    cache.get(layer_data, 2, lambda: "two")
+    cache.get(layer_data, 1, lambda: "not cached")  # Layer 1 is now the most recently used.
+    cache.get(layer_data, 3, lambda: "three")
+    assert len(cache) == 2
+    assert cache.get(layer_data, 1, lambda: "not cached") == "one"
+    assert cache.get(layer_data, 2, lambda: "two again") == "two again"
+
+
+def test_otherLayerDataClearsCache():
+    cache = LayerMeshCache()
+    cache.get(FakeLayerData(), 1, lambda: "old")
+    new_layer_data = FakeLayerData()
+    assert cache.get(new_layer_data, 1, lambda: "new") == "new"
+    assert len(cache) == 1
@@ -0,0 +1,44 @@
+import numpy
+import pytest
+
+from ..SimulationTimeIndex import SimulationTimeIndex
+
+
+class FakePolygon:
+    def __init__(self, points, feedrates):
+        self.data = numpy.array(points, dtype = numpy.float32)
+        self.lineFeedrates = numpy.array(feedrates, dtype = numpy.float32).reshape((1, -1))
+
+
+def createIndex():
+    # Two lines of 10 and 20 mm at 10 mm/s, then the tool change, then a line of 30 mm at 30 mm/s.
+    first = FakePolygon([[0, 0, 0], [10, 0, 0], [10, 0, 20]], [10, 10])
+    second = FakePolygon([[0, 0, 0], [30, 0, 0]], [30])
+    return SimulationTimeIndex([first, second], simulation_factor = 1.0)
+
+
+def test_cumulativeDurations():
+    time_index = createIndex()
+    assert len(time_index) == 5
+    assert [time_index.getTime(i) for i in range(5)] == pytest.approx([1, 3, 3, 4, 4])
+    assert time_index.getTotalDuration() == pytest.approx(4)
+
+
+@pytest.mark.parametrize("time, path", [(0.0, 0.0), (0.5, 0.5), (2.0, 1.5), (3.5, 3.5), (10.0, 4.0)])
+def test_getPath(time, path):
+    assert createIndex().getPath(time) == pytest.approx(path)
+
+
+def test_getHeadPosition():
+    time_index = createIndex()
+    point_a, point_b, ratio = time_index.getHeadPosition(1.5)
+    assert list(point_a) == [10, 0, 0]
+    assert list(point_b) == [10, 0, 20]
+    assert ratio == pytest.approx(0.5)
+
+    point_a, point_b, _ = time_index.getHeadPosition(3.25)  # The first path of the second polygon.
+    assert list(point_a) == [0, 0, 0]
+    assert list(point_b) == [30, 0, 0]
+
+    assert time_index.getHeadPosition(2.5)[1] is None  # The end of the first polygon.
+    assert time_index.getHeadPosition(5) is None
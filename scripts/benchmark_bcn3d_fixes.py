@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks the BCN3D post slicing fixes on a synthetic dual extruder print.
+
+Runs the old one-pass-per-fix implementation and the single pass RuleEngine on the same G-code, checks that both
+produce identical output and prints the time each one took, plus the time spent in every rule.
+
+Usage: python3 scripts/benchmark_bcn3d_fixes.py [number of lines]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+from typing import List
+
+STRATOS_VERSION = "2.0.0"
+
+_rules_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "BCN3DPostSlicing", "GCodeRules.py")
+_spec = importlib.util.spec_from_file_location("GCodeRules", _rules_path)
+GCodeRules = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(GCodeRules)
+
+
+def create_dual_gcode(line_count: int, lines_per_layer: int = 500) -> List[str]:
+    """Creates a G-code list that alternates extruders every layer, like a dual Sigma/Epsilon print."""
+
+    header = "\n".join([";Generated with Cura_SteamEngine 4.8",
+                        ";FLAVOR:RepRap",
+                        ";TIME:6666",
+                        ";Filament used: 1.2m, 3.4m",
+                        ";Layer height: 0.2",
+                        ";Machine Model: Sigma",
+                        ";Extruders used: T0 0.4m T1 0.4m",
+                        ";Print mode: dual"]) + "\n"
+    gcode_list = [header]
+    layer_nr = 0
+    written = 0
+    while written < line_count:
+        tool = layer_nr % 2
+        lines = [";LAYER:%d" % layer_nr,
+                 ";startTC T%d" % tool,
+                 "T%d" % tool,
+                 "G92 E0",
+                 ";switch_extruder_retraction_amount:8",
+                 ";endTC",
+                 "G1 F1500 E-8",
+                 "G92 E0"]
+        for i in range(lines_per_layer - len(lines)):
+            lines.append("G1 X%.3f Y%.3f E%.5f" % (i * 0.1, i * 0.2, i * 0.01))
+        gcode_list.append("\n".join(lines) + "\n")
+        written += len(lines)
+        layer_nr += 1
+    return gcode_list
+
+
+def legacy_fixes(gcode_list: List[str]) -> None:
+    """The fixes as they were applied before the RuleEngine: one full split/join pass per fix."""
+
+    for index, layer in enumerate(gcode_list):
+        lines = layer.split("\n")
+        if lines[6].startswith(";Extruders used: T0 0.4m"):
+            lines[6] = ";Extruders used: T0 0.4M"
+            gcode_list[index] = "\n".join(lines)
+        break
+
+    for index, layer in enumerate(gcode_list):
+        lines = layer.split("\n")
+        if lines[0].startswith(";Generated with Cura_SteamEngine"):
+            lines[0] = ";Generated with StratosEngine " + STRATOS_VERSION
+            gcode_list[index] = "\n".join(lines)
+        break
+
+    for index, layer in enumerate(gcode_list):
+        lines = layer.split("\n")
+        if lines[0].startswith(";firstAllToolChangeFixed"):
+            break
+        if lines[0].startswith(";Generated with StratosEngine"):
+            lines[0] = ";firstAllToolChangeFixed\n" + lines[0]
+            gcode_list[index] = "\n".join(lines)
+        if ";endTC" in lines:
+            position = lines.index(";endTC")
+            del(lines[position + 2])
+            del(lines[position + 1])
+            gcode_list[index] = "\n".join(lines)
+
+    for index, layer in enumerate(gcode_list):
+        lines = layer.split("\n")
+        if lines[0].startswith(";firstToolChangeFixed"):
+            break
+        if ";endTC" in lines:
+            position = lines.index(";endTC")
+            ea = lines[position - 1].replace(";switch_extruder_retraction_amount:", "")
+            lines[position] = lines[position] + "\nG92 E-" + ea + "\n;First TC fixed"
+            gcode_list[index] = "\n".join(lines)
+            break
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    original = create_dual_gcode(line_count)
+    print("Synthetic dual print: %d layers, %d lines" % (len(original), line_count))
+
+    legacy = list(original)
+    start = time.perf_counter()
+    legacy_fixes(legacy)
+    legacy_time = time.perf_counter() - start
+
+    fused = list(original)
+    engine = GCodeRules.RuleEngine([GCodeRules.ExtrudersNameRule(),
+                                    GCodeRules.StratosEngineNameRule(STRATOS_VERSION),
+                                    GCodeRules.FixAllToolChangeRule(),
+                                    GCodeRules.AfterFirstToolChangeRule()])
+    start = time.perf_counter()
+    engine.run(fused)
+    fused_time = time.perf_counter() - start
+
+    if "".join(legacy) != "".join(fused):
+        print("ERROR: the RuleEngine output differs from the legacy fixes")
+        sys.exit(1)
+
+    print("Legacy passes: %8.1f ms" % (legacy_time * 1000))
+    print("Single pass:   %8.1f ms (%d layers rewritten)" % (fused_time * 1000, engine.changed_layers))
+    for name, seconds in engine.timings.items():
+        print("    %-24s %8.1f ms" % (name, seconds * 1000))
+
+    start = time.perf_counter()
+    engine.run(fused)
+    print("Second write:  %8.1f ms (skipped: %s)" % ((time.perf_counter() - start) * 1000, ", ".join(engine.skipped)))
+
+
+if __name__ == "__main__":
+    main()
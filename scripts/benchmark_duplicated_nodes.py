@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks the DuplicatedNode bookkeeping of the PrintModeManager when toggling the print mode.
+
+Switching to duplication or mirror mode creates a DuplicatedNode for every object, and deleting, grouping or undoing
+looks the DuplicatedNode of an object up again. This replays that pattern on a scene of N objects with the plain list
+the PrintModeManager used before and with the DuplicatedNodeRegistry, and prints the time each one took.
+
+Usage: python3 scripts/benchmark_duplicated_nodes.py [number of objects] [number of toggles]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+_registry_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cura", "Utils", "BCN3Dutils", "Scene",
+                              "DuplicatedNodeRegistry.py")
+_spec = importlib.util.spec_from_file_location("DuplicatedNodeRegistry", _registry_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+DuplicatedNodeRegistry = _module.DuplicatedNodeRegistry
+
+
+class Node:
+    pass
+
+
+class DuplicatedNode:
+    def __init__(self, node):
+        self.node = node
+
+
+class ListBookkeeping:
+    """The list based bookkeeping of the PrintModeManager before the registry."""
+
+    def __init__(self):
+        self._duplicated_nodes = []
+
+    def add(self, node_dup):
+        if node_dup not in self._duplicated_nodes:
+            self._duplicated_nodes.append(node_dup)
+
+    def remove(self, node_dup):
+        if node_dup in self._duplicated_nodes:
+            self._duplicated_nodes.remove(node_dup)
+
+    def clear(self):
+        del self._duplicated_nodes[:]
+
+    def get(self, node):
+        for node_dup in self._duplicated_nodes:
+            if node_dup.node == node:
+                return node_dup
+        return None
+
+    def __contains__(self, node_dup):
+        return node_dup in self._duplicated_nodes
+
+
+class RegistryBookkeeping(DuplicatedNodeRegistry):
+    def add(self, node_dup):
+        if node_dup not in self:
+            super().add(node_dup)
+
+
+def toggle(bookkeeping, nodes):
+    """One switch to duplication mode and back, with a lookup of every object as the scene hooks do."""
+    node_dups = []
+    for node in nodes:
+        node_dup = DuplicatedNode(node)
+        bookkeeping.add(node_dup)
+        node_dups.append(node_dup)
+    for node in nodes:  # Delete, group or select all: every hook looks the DuplicatedNode up.
+        assert bookkeeping.get(node) is not None
+    for node_dup in reversed(node_dups):  # Undo of the added nodes checks membership and removes them one by one.
+        if node_dup in bookkeeping:
+            bookkeeping.remove(node_dup)
+    bookkeeping.clear()
+
+
+def run(bookkeeping_type, nodes, toggles):
+    bookkeeping = bookkeeping_type()
+    start = time.perf_counter()
+    for _ in range(toggles):
+        toggle(bookkeeping, nodes)
+    return time.perf_counter() - start
+
+
+def main():
+    object_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    toggles = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    nodes = [Node() for _ in range(object_count)]
+
+    list_time = run(ListBookkeeping, nodes, toggles)
+    registry_time = run(RegistryBookkeeping, nodes, toggles)
+    print("%d objects, %d print mode toggles" % (object_count, toggles))
+    print("list:     %8.2f ms per toggle" % (list_time * 1000 / toggles))
+    print("registry: %8.2f ms per toggle" % (registry_time * 1000 / toggles))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks the G-code import pipeline of the GCodeReader on a synthetic print.
+
+Runs the previous pipeline (splitting the whole file twice, one G-code list entry per line, a Python list per path
+point and a per point loop to build the layer arrays) and the streaming one (lines read one by one, one G-code list
+entry per layer, a PathBuffer per path and vectorized layer arrays) on the same G-code. Checks that both produce the
+same G-code and the same layer arrays and prints the time and peak memory each one took.
+
+The line widths may differ by 1 float32 ULP: the previous loop squared float32 scalars through powf.
+
+The pipelines only have as much of the FlavorParser as the timing needs, so the benchmark runs without Cura.
+plugins/GCodeReader/tests/TestFlavorParser.py checks that FlavorParser.processGCodeStream itself produces the same
+layer data both ways.
+
+Usage: python3 scripts/benchmark_gcode_reader.py [number of layers] [moves per layer]
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy
+
+_plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "GCodeReader")
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_plugin_path, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PathBuffer = _load("PathBuffer")
+GCodeLines = _load("GCodeLines")
+
+FILAMENT_DIAMETER = 1.75
+LAYER_THICKNESS = 0.2
+MOVE_COMBING_TYPE = 8
+MOVE_RETRACTION_TYPE = 9
+EXTRUSION_TYPE = 1
+
+
+def create_gcode(layer_count: int, moves_per_layer: int) -> str:
+    random.seed(42)
+    lines = [";FLAVOR:Marlin", ";Generated with Cura_SteamEngine 5.0", "G28", "G92 E0"]
+    e = 0.0
+    for layer in range(layer_count):
+        lines.append(";LAYER:%d" % layer)
+        lines.append("G0 F9000 X%.3f Y%.3f Z%.2f" % (random.uniform(0, 200), random.uniform(0, 200), 0.3 + layer * LAYER_THICKNESS))
+        for _ in range(moves_per_layer):
+            if random.random() < 0.1:
+                lines.append("G0 X%.3f Y%.3f" % (random.uniform(0, 200), random.uniform(0, 200)))
+            else:
+                e += random.uniform(0, 0.2)
+                lines.append("G1 X%.3f Y%.3f E%.5f" % (random.uniform(0, 200), random.uniform(0, 200), e))
+    return "\n".join(lines) + "\n"
+
+
+class Parser:
+    """Just enough of FlavorParser to produce path points for absolute G0/G1 moves."""
+
+    def __init__(self):
+        self.position = [0.0, 0.0, 0.0, 0.0, 0.0]
+
+    def move(self, line, path):
+        x, y, z, f, e = self.position
+        extrudes = False
+        for item in line.split(";", 1)[0].split(" ")[1:]:
+            if len(item) > 1:
+                value = float(item[1:])
+                if item[0] == "X":
+                    x = value
+                elif item[0] == "Y":
+                    y = value
+                elif item[0] == "Z":
+                    z = value
+                elif item[0] == "F":
+                    f = value / 60
+                elif item[0] == "E":
+                    extrudes = value > e
+                    e = value
+        self.position = [x, y, z, f, e]
+        path.append([x, y, z, f, e, EXTRUSION_TYPE if extrudes else MOVE_COMBING_TYPE])
+
+
+def legacy_line_width(current_point, previous_point, current_extrusion, previous_extrusion, layer_thickness):
+    Af = (FILAMENT_DIAMETER / 2) ** 2 * numpy.pi
+    de = current_extrusion - previous_extrusion
+    dVe = de * Af
+    dX = numpy.sqrt((current_point[0] - previous_point[0])**2 + (current_point[2] - previous_point[2])**2)
+    if dX == 0:
+        return 0.1
+    line_width = dVe / dX / layer_thickness
+    if line_width > 1.2:
+        return 0.35
+    if line_width < 0.0:
+        return 0.0
+    return line_width
+
+
+def legacy_polygon(path):
+    count = len(path)
+    line_types = numpy.empty((count - 1, 1), numpy.int32)
+    line_widths = numpy.empty((count - 1, 1), numpy.float32)
+    line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
+    line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
+    line_widths[:, 0] = 0.35
+    line_thicknesses[:, 0] = LAYER_THICKNESS
+    points = numpy.empty((count, 3), numpy.float32)
+    extrusion_values = numpy.empty((count, 1), numpy.float32)
+    i = 0
+    for point in path:
+        points[i, :] = [point[0], point[2], -point[1]]
+        extrusion_values[i] = point[4]
+        if i > 0:
+            line_feedrates[i - 1] = point[3]
+            line_types[i - 1] = point[5]
+            if point[5] in [MOVE_COMBING_TYPE, MOVE_RETRACTION_TYPE]:
+                line_widths[i - 1] = 0.1
+                line_thicknesses[i - 1] = 0.0
+            else:
+                line_widths[i - 1] = legacy_line_width(points[i], points[i - 1], extrusion_values[i], extrusion_values[i - 1], LAYER_THICKNESS)
+        i += 1
+    return line_types, points, line_widths, line_thicknesses, line_feedrates
+
+
+def streaming_polygon(path):
+    path_data = path.toArray()
+    count = len(path_data)
+    line_types = numpy.empty((count - 1, 1), numpy.int32)
+    line_widths = numpy.empty((count - 1, 1), numpy.float32)
+    line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
+    line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
+    line_thicknesses[:, 0] = LAYER_THICKNESS
+    points = numpy.empty((count, 3), numpy.float32)
+    points[:, 0] = path_data[:, 0]
+    points[:, 1] = path_data[:, 2]
+    points[:, 2] = -path_data[:, 1]
+    extrusion_values = path_data[:, 4].astype(numpy.float32)
+    line_feedrates[:, 0] = path_data[1:, 3]
+    line_types[:, 0] = path_data[1:, 5]
+    line_widths[:, 0] = PathBuffer.calculateLineWidths(points, extrusion_values, FILAMENT_DIAMETER, LAYER_THICKNESS)
+    travels = numpy.isin(line_types[:, 0], [MOVE_COMBING_TYPE, MOVE_RETRACTION_TYPE])
+    line_widths[travels] = 0.1
+    line_thicknesses[travels] = 0.0
+    return line_types, points, line_widths, line_thicknesses, line_feedrates
+
+
+def legacy_pipeline(stream):
+    gcode_list = []
+    for line in stream.split("\n"):
+        gcode_list.append(line + "\n")
+    polygons = []
+    parser = Parser()
+    path = []
+    for line in stream.split("\n"):
+        if line.startswith(";LAYER:"):
+            if len(path) > 1:
+                polygons.append(legacy_polygon(path))
+            path = [parser.position + [MOVE_COMBING_TYPE]]
+        elif line.startswith("G0 ") or line.startswith("G1 "):
+            parser.move(line, path)
+    if len(path) > 1:
+        polygons.append(legacy_polygon(path))
+    return gcode_list, polygons
+
+
+def streaming_pipeline(stream):
+    gcode_list = []
+    gcode_layer = []
+    polygons = []
+    parser = Parser()
+    path = PathBuffer.PathBuffer()
+    for raw_line in GCodeLines.iterateLines(stream):
+        line = raw_line[:-1] if raw_line.endswith("\n") else raw_line
+        if line.startswith(";LAYER:"):
+            if gcode_layer:
+                gcode_list.append("".join(gcode_layer))
+                gcode_layer.clear()
+            if len(path) > 1:
+                polygons.append(streaming_polygon(path))
+            path.clear()
+            path.append(parser.position + [MOVE_COMBING_TYPE])
+        elif line.startswith("G0 ") or line.startswith("G1 "):
+            parser.move(line, path)
+        gcode_layer.append(raw_line if raw_line.endswith("\n") else raw_line + "\n")
+    gcode_layer.append("\n")
+    gcode_list.append("".join(gcode_layer))
+    if len(path) > 1:
+        polygons.append(streaming_polygon(path))
+    return gcode_list, polygons
+
+
+def measure(pipeline, stream):
+    start = time.perf_counter()
+    result = pipeline(stream)
+    duration = time.perf_counter() - start
+    # Tracing allocations slows everything down, so the memory is measured in a second run.
+    tracemalloc.start()
+    pipeline(stream)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def main():
+    layer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    moves_per_layer = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    gcode = create_gcode(layer_count, moves_per_layer)
+
+    (legacy_list, legacy_polygons), legacy_time, legacy_peak = measure(legacy_pipeline, gcode)
+    (streaming_list, streaming_polygons), streaming_time, streaming_peak = measure(streaming_pipeline, gcode)
+
+    assert "".join(legacy_list) == "".join(streaming_list), "The G-code lists differ"
+    assert len(legacy_polygons) == len(streaming_polygons), "The number of polygons differs"
+    max_width_difference = 0.0
+    for legacy_arrays, streaming_arrays in zip(legacy_polygons, streaming_polygons):
+        for index, (legacy, streaming) in enumerate(zip(legacy_arrays, streaming_arrays)):
+            assert legacy.shape == streaming.shape and legacy.dtype == streaming.dtype
+            if index == 2:  # Line widths
+                assert numpy.allclose(legacy, streaming, rtol = 1e-6, atol = 0)
+                max_width_difference = max(max_width_difference, float(numpy.abs(legacy - streaming).max(initial = 0)))
+            else:
+                assert numpy.array_equal(legacy, streaming)
+
+    print("%d lines, %d layers: identical output (line widths within %g)" % (gcode.count("\n"), layer_count, max_width_difference))
+    print("previous:  %6.2f s, peak %6.1f MB" % (legacy_time, legacy_peak / 1e6))
+    print("streaming: %6.2f s, peak %6.1f MB" % (streaming_time, streaming_peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks finding the overlapping convex hulls that PlatformPhysics pushes apart.
+
+Generates a build plate with N small parts at random spots, and in duplication mode the shadow of every part on the
+other half of the plate. Then it finds the parts that overlap every part by testing it against all other parts, like
+PlatformPhysics did before, and by testing it only against the parts the ConvexHullGrid finds. The polygon test is a
+separating axis test like the one of Polygon.intersectsPolygon. It prints the time and the number of polygon tests of
+each one, and checks that both find the same overlaps.
+
+Usage: python3 scripts/benchmark_platform_physics.py [number of parts] [--no-shadows]
+"""
+
+import importlib.util
+import math
+import os
+import sys
+import time
+
+import numpy
+
+_grid_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cura", "Scene", "ConvexHullGrid.py")
+_spec = importlib.util.spec_from_file_location("ConvexHullGrid", _grid_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+ConvexHullGrid = _module.ConvexHullGrid
+
+PLATE_WIDTH = 420.0
+PLATE_DEPTH = 300.0
+
+
+class Hull:
+    def __init__(self, points):
+        self._points = points
+
+    def getPoints(self):
+        return self._points
+
+    def intersectsPolygon(self, other):
+        """The separating axis test of the convex hulls, without the push vector."""
+
+        for polygon in (self._points, other.getPoints()):
+            edges = numpy.roll(polygon, -1, axis = 0) - polygon
+            for normal in numpy.column_stack((-edges[:, 1], edges[:, 0])):
+                own = self._points.dot(normal)
+                projected = other.getPoints().dot(normal)
+                if own.max() <= projected.min() or projected.max() <= own.min():
+                    return False
+        return True
+
+
+def generateScene(part_count, shadows = True, seed = 0):
+    """Convex hulls of N parts of 5 to 25 mm on the plate, on the left half if they have shadows."""
+
+    random = numpy.random.RandomState(seed)
+    width = PLATE_WIDTH / 2 if shadows else PLATE_WIDTH
+    hulls = []
+    for _ in range(part_count):
+        radius = random.uniform(2.5, 12.5)
+        corner_count = random.randint(5, 12)
+        angles = numpy.sort(random.uniform(0, 2 * math.pi, corner_count))
+        center = (random.uniform(radius, width - radius), random.uniform(radius, PLATE_DEPTH - radius))
+        points = numpy.column_stack((center[0] + radius * numpy.cos(angles), center[1] + radius * numpy.sin(angles)))
+        hulls.append(Hull(points.astype(numpy.float32)))
+        if shadows:
+            hulls.append(Hull((points + (PLATE_WIDTH / 2, 0)).astype(numpy.float32)))
+    return hulls
+
+
+def findOverlapsAllPairs(hulls):
+    tests = 0
+    overlaps = set()
+    for index, hull in enumerate(hulls):
+        for other_index, other_hull in enumerate(hulls):
+            if other_index == index:
+                continue
+            tests += 1
+            if hull.intersectsPolygon(other_hull):
+                overlaps.add((index, other_index))
+    return overlaps, tests
+
+
+def findOverlapsGrid(hulls):
+    tests = 0
+    overlaps = set()
+    bounds = [_module.getPolygonBounds(hull) for hull in hulls]
+    grid = ConvexHullGrid(list(range(len(hulls))), bounds)
+    for index, hull in enumerate(hulls):
+        for other_index in grid.query(bounds[index]):
+            if other_index == index:
+                continue
+            tests += 1
+            if hull.intersectsPolygon(hulls[other_index]):
+                overlaps.add((index, other_index))
+    return overlaps, tests
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 and not sys.argv[1].startswith("-") else 200
+    hulls = generateScene(part_count, shadows = "--no-shadows" not in sys.argv)
+    print("{count} convex hulls".format(count = len(hulls)))
+
+    results = []
+    for name, find in (("All pairs", findOverlapsAllPairs), ("Grid", findOverlapsGrid)):
+        start = time.perf_counter()
+        overlaps, tests = find(hulls)
+        duration = time.perf_counter() - start
+        results.append(overlaps)
+        print("{name:>10}: {duration:8.1f} ms, {tests:6d} polygon tests, {overlaps} overlaps".format(name = name, duration = duration * 1000, tests = tests, overlaps = len(overlaps) // 2))
+    assert results[0] == results[1], "The grid missed overlapping hulls"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks a frame of the simulation playback of the SimulationView.
+
+A frame advances the time, finds the path at that time and finds the position of the nozzle on that path. Compares
+the previous way (a Python list of the cumulative line durations made per layer, a binary search over it and a loop
+over the polygons to find the nozzle) with the SimulationTimeIndex. Checks that both find the same paths and prints
+the time to index a layer and the time per frame.
+
+Usage: python3 scripts/benchmark_simulation_playback.py [number of polygons] [lines per polygon] [frames]
+"""
+
+import importlib.util
+import math
+import os
+import sys
+import time
+
+import numpy
+
+_index_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "SimulationView", "SimulationTimeIndex.py")
+_spec = importlib.util.spec_from_file_location("SimulationTimeIndex", _index_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+SimulationTimeIndex = _module.SimulationTimeIndex
+
+SIMULATION_FACTOR = 2
+
+
+class Polygon:
+    def __init__(self, line_count):
+        self.data = numpy.random.uniform(0, 200, (line_count + 1, 3)).astype(numpy.float32)
+        self.lineFeedrates = numpy.random.uniform(20, 200, (1, line_count)).astype(numpy.float32)
+        self.lineLengths = numpy.linalg.norm(numpy.diff(self.data, axis = 0), axis = 1).reshape((1, -1))
+
+
+def legacy_index(polygons):
+    cumulative_line_duration = []
+    total_duration = 0.0
+    for polygon in polygons:
+        for line_duration in list((polygon.lineLengths / polygon.lineFeedrates)[0]):
+            total_duration += float(line_duration) / SIMULATION_FACTOR  # As with NumPy 1, which summed in float64.
+            cumulative_line_duration.append(total_duration)
+        cumulative_line_duration.append(total_duration)
+    return cumulative_line_duration
+
+
+def legacy_frame(polygons, cumulative_line_duration, current_time):
+    left_i = 0
+    right_i = len(cumulative_line_duration) - 1
+    i = int(right_i * max(0.0, min(1.0, current_time / cumulative_line_duration[-1])))
+    while left_i < right_i:
+        if cumulative_line_duration[i] <= current_time:
+            left_i = i + 1
+        else:
+            right_i = i
+        i = int((left_i + right_i) / 2)
+    left_value = cumulative_line_duration[i - 1] if i > 0 else 0.0
+    segment_duration = cumulative_line_duration[i] - left_value
+    path = i + (0.0 if segment_duration == 0.0 else (current_time - left_value) / segment_duration)
+
+    index = int(path)
+    for polygon in polygons:
+        if index >= polygon.data.size // 3:
+            index -= polygon.data.size // 3
+            continue
+        return path, polygon.data[index]
+    return path, None
+
+
+def indexed_frame(time_index, current_time):
+    path = time_index.getPath(current_time)
+    head = time_index.getHeadPosition(path)
+    return path, head[0] if head is not None else None
+
+
+def main():
+    polygon_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    lines_per_polygon = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    frame_count = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    numpy.random.seed(42)
+
+    # Every line divided by its own feedrate, so that both ways give the same durations.
+    polygons = [Polygon(lines_per_polygon) for _ in range(polygon_count)]
+
+    start = time.perf_counter()
+    cumulative_line_duration = legacy_index(polygons)
+    legacy_index_time = time.perf_counter() - start
+    start = time.perf_counter()
+    time_index = SimulationTimeIndex(polygons, SIMULATION_FACTOR)
+    index_time = time.perf_counter() - start
+
+    times = numpy.linspace(0, cumulative_line_duration[-1], frame_count)
+    start = time.perf_counter()
+    legacy_frames = [legacy_frame(polygons, cumulative_line_duration, current_time) for current_time in times]
+    legacy_frame_time = (time.perf_counter() - start) / frame_count
+    start = time.perf_counter()
+    indexed_frames = [indexed_frame(time_index, current_time) for current_time in times]
+    frame_time = (time.perf_counter() - start) / frame_count
+
+    for (legacy_path, legacy_head), (path, head) in zip(legacy_frames, indexed_frames):
+        assert math.isclose(legacy_path, path, rel_tol = 1e-6, abs_tol = 1e-4), (legacy_path, path)
+        if int(legacy_path) == int(path):
+            assert (legacy_head is None) == (head is None) and (head is None or numpy.array_equal(legacy_head, head))
+
+    print("%d polygons, %d paths, %d frames: same paths" % (polygon_count, len(time_index), frame_count))
+    print("                 index layer   per frame")
+    print("list and loops:  %8.2f ms  %8.1f us" % (legacy_index_time * 1000, legacy_frame_time * 1e6))
+    print("time index:      %8.2f ms  %8.1f us" % (index_time * 1000, frame_time * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 BCN3D Technologies
+# Cura is released under the terms of the LGPLv3 or higher.
+
+"""Benchmarks the decoding of the LayerOptimized messages of CuraEngine in ProcessSlicedLayersJob.
+
+Replays a recording of layer messages through the previous decoding (four or five NumPy conversions and a thread
+yield per path segment) and through the DecodedLayer of the CuraEngineBackend (one conversion per field and layer).
+Checks that both give the same arrays and prints the time each one took.
+
+A recording is a pickled list with a dictionary per layer: "id", "height", "thickness" and "path_segment", a list with
+a dictionary per path segment holding the fields of the PathSegment message of Cura.proto. Without a recording, a
+synthetic dual extrusion print is recorded first.
+
+Usage: python3 scripts/benchmark_sliced_layers.py [recording] [number of layers] [path segments per layer]
+"""
+
+import importlib.util
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+import numpy
+
+_decoder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "CuraEngineBackend", "LayerDecoder.py")
+_spec = importlib.util.spec_from_file_location("LayerDecoder", _decoder_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+DecodedLayer = _module.DecodedLayer
+
+
+class Message:
+    """Replays a recorded message with the interface of the Arcus messages."""
+
+    def __init__(self, fields):
+        for name, value in fields.items():
+            if name == "path_segment":
+                value = [Message(segment) for segment in value]
+            setattr(self, name, value)
+
+    def repeatedMessageCount(self, name):
+        return len(getattr(self, name))
+
+    def getRepeatedMessage(self, name, index):
+        return getattr(self, name)[index]
+
+
+def record_print(path, layer_count, segments_per_layer):
+    random.seed(42)
+    layers = []
+    for layer_id in range(layer_count):
+        segments = []
+        for _ in range(segments_per_layer):
+            line_count = random.randint(1, 40)
+            segments.append({
+                "extruder": random.randint(0, 1),
+                "point_type": 0,
+                "points": numpy.random.uniform(0, 210000, (line_count + 1) * 2).astype("f4").tobytes(),
+                "line_type": numpy.random.randint(1, 12, line_count).astype("u1").tobytes(),
+                "line_width": numpy.full(line_count, 0.4, dtype = "f4").tobytes(),
+                "line_thickness": numpy.full(line_count, 0.2, dtype = "f4").tobytes(),
+                "line_feedrate": numpy.random.uniform(20, 200, line_count).astype("f4").tobytes(),
+            })
+        layers.append({"id": layer_id, "height": 300 + layer_id * 200, "thickness": 200, "path_segment": segments})
+    with open(path, "wb") as f:
+        pickle.dump(layers, f)
+
+
+def legacy_decode(layer):
+    result = []
+    for p in range(layer.repeatedMessageCount("path_segment")):
+        polygon = layer.getRepeatedMessage("path_segment", p)
+        line_types = numpy.frombuffer(polygon.line_type, dtype = "u1").copy().reshape((-1, 1))
+        points = numpy.frombuffer(polygon.points, dtype = "f4").copy()
+        points = points.reshape((-1, 2)) if polygon.point_type == 0 else points.reshape((-1, 3))
+        line_widths = numpy.frombuffer(polygon.line_width, dtype = "f4").copy().reshape((-1, 1))
+        line_thicknesses = numpy.frombuffer(polygon.line_thickness, dtype = "f4").copy().reshape((-1, 1))
+        line_feedrates = numpy.frombuffer(polygon.line_feedrate, dtype = "f4").copy().reshape((-1, 1))
+        new_points = numpy.empty((len(points), 3), numpy.float32)
+        if polygon.point_type == 0:
+            new_points[:, 0] = points[:, 0]
+            new_points[:, 1] = layer.height / 1000
+            new_points[:, 2] = -points[:, 1]
+        else:
+            new_points[:, 0] = points[:, 0]
+            new_points[:, 1] = points[:, 2]
+            new_points[:, 2] = -points[:, 1]
+        result.append((polygon.extruder, line_types, new_points, line_widths, line_thicknesses, line_feedrates))
+        time.sleep(0)  # Job.yieldThread()
+    return result
+
+
+def batched_decode(layer):
+    result = list(DecodedLayer(layer))
+    time.sleep(0)  # Job.yieldThread(), once per layer.
+    return result
+
+
+def measure(decode, layers):
+    start = time.perf_counter()
+    result = [decode(layer) for layer in layers]
+    return result, time.perf_counter() - start
+
+
+def main():
+    recording = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "-" else None
+    layer_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    segments_per_layer = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    if recording is None:
+        recording = os.path.join(tempfile.gettempdir(), "cura_sliced_layers_%d_%d.pickle" % (layer_count, segments_per_layer))
+        if not os.path.exists(recording):
+            record_print(recording, layer_count, segments_per_layer)
+    with open(recording, "rb") as f:
+        layers = [Message(layer) for layer in pickle.load(f)]
+
+    legacy_layers, legacy_time = measure(legacy_decode, layers)
+    batched_layers, batched_time = measure(batched_decode, layers)
+
+    segment_count = 0
+    for legacy_segments, batched_segments in zip(legacy_layers, batched_layers):
+        assert len(legacy_segments) == len(batched_segments)
+        for legacy, batched in zip(legacy_segments, batched_segments):
+            assert legacy[0] == batched[0]
+            for legacy_array, batched_array in zip(legacy[1:], batched[1:]):
+                assert legacy_array.dtype == batched_array.dtype and numpy.array_equal(legacy_array, batched_array)
+        segment_count += len(legacy_segments)
+
+    print("%d layers, %d path segments: identical arrays" % (len(layers), segment_count))
+    print("per segment: %6.2f s" % legacy_time)
+    print("per layer:   %6.2f s" % batched_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,11 @@
 from unittest.mock import MagicMock, patch
 import pytest
 
+from UM.Math.AxisAlignedBox import AxisAlignedBox
 from UM.Math.Polygon import Polygon
 from UM.Math.Vector import Vector
 from cura.BuildVolume import BuildVolume, PRIME_CLEARANCE
+from cura.Scene.CuraSceneNode import CuraSceneNode
 import numpy
 
 @pytest.fixture
@@ -425,3 +427,100 @@ class TestGetEdgeDisallowedSize:
             with patch.dict(self.setting_property_dict, {"print_sequence": {"value": "one_at_a_time"}}):
                 assert build_volume.getEdgeDisallowedSize() == 0.1
 
+
+
+class TestUpdateNodeBoundaryCheck:
+    decorations = {"isSliceable": True, "getActiveExtruderPosition": "0"}
+
+    def createNode(self, printing_area = None):
+        node = CuraSceneNode(no_setting_override = True)
+        node.callDecoration = MagicMock(side_effect = lambda name, *args: printing_area if name == "getPrintingArea" else self.decorations.get(name))
+        node.collidesWithBbox = MagicMock(return_value = False)
+        return node
+
+    def setUpBuildVolume(self, build_volume: BuildVolume, nodes):
+        mocked_extruder = MagicMock(isEnabled = True)
+        build_volume._global_container_stack = MagicMock(extruderList = [mocked_extruder])
+        build_volume._volume_aabb = AxisAlignedBox(minimum = Vector(-100, -1, -100), maximum = Vector(100, 100, 100))
+        return patch("cura.BuildVolume.BreadthFirstIterator", MagicMock(return_value = nodes))
+
+    def test_onlyChangedNodesAreChecked(self, build_volume: BuildVolume):
+        node = self.createNode()
+        other_node = self.createNode()
+        with self.setUpBuildVolume(build_volume, [node, other_node]):
+            with patch("cura.Utils.BCN3Dutils.Bcn3dIdexSupport.updateNodeBoundaryCheckForDuplicated"):
+                build_volume.updateNodeBoundaryCheck()
+                node.setPosition(Vector(10, 0, 10))
+                build_volume.updateNodeBoundaryCheck()
+
+        assert node.collidesWithBbox.call_count == 2
+        assert other_node.collidesWithBbox.call_count == 1
+        assert not node.isOutsideBuildArea()
+
+    def test_settingsChangeChecksAllNodes(self, build_volume: BuildVolume):
+        node = self.createNode()
+        with self.setUpBuildVolume(build_volume, [node]):
+            with patch("cura.Utils.BCN3Dutils.Bcn3dIdexSupport.updateNodeBoundaryCheckForDuplicated"):
+                build_volume.updateNodeBoundaryCheck()
+                build_volume.setDisallowedAreas([Polygon(numpy.array([[-5, -5], [-5, 5], [5, 5], [5, -5]], numpy.float32))])
+                build_volume.updateNodeBoundaryCheck()
+
+        assert node.collidesWithBbox.call_count == 2
+
+    def test_printingAreaChangeChecksNode(self, build_volume: BuildVolume):
+        # A per-object setting like the horizontal expansion changes the printing area, not the transformation.
+        printing_areas = [Polygon(numpy.array([[10, 10], [10, 20], [20, 20], [20, 10]], numpy.float32))]
+        node = self.createNode()
+        node.callDecoration = MagicMock(side_effect = lambda name, *args: printing_areas[0] if name == "getPrintingArea" else self.decorations.get(name))
+        with self.setUpBuildVolume(build_volume, [node]):
+            with patch("cura.Utils.BCN3Dutils.Bcn3dIdexSupport.updateNodeBoundaryCheckForDuplicated"):
+                build_volume.setDisallowedAreas([Polygon(numpy.array([[-5, -5], [-5, 5], [5, 5], [5, -5]], numpy.float32))])
+                build_volume.updateNodeBoundaryCheck()
+                assert not node.isOutsideBuildArea()
+
+                printing_areas[0] = Polygon(numpy.array([[0, 0], [0, 20], [20, 20], [20, 0]], numpy.float32))
+                build_volume.updateNodeBoundaryCheck()
+
+        assert node.collidesWithBbox.call_count == 2
+        assert node.isOutsideBuildArea()
+
+    def test_collidesWithDisallowedAreas(self, build_volume: BuildVolume):
+        area = Polygon(numpy.array([[-5, -5], [-5, 5], [5, 5], [5, -5]], numpy.float32))
+        far_area = Polygon(numpy.array([[50, 50], [50, 60], [60, 60], [60, 50]], numpy.float32))
+        build_volume.setDisallowedAreas([area, far_area, area])
+
+        assert len(build_volume._disallowed_area_grid) == 2
+        assert build_volume._collidesWithDisallowedAreas(Polygon(numpy.array([[0, 0], [0, 10], [10, 10], [10, 0]], numpy.float32)))
+        assert not build_volume._collidesWithDisallowedAreas(Polygon(numpy.array([[20, 20], [20, 30], [30, 30], [30, 20]], numpy.float32)))
+        assert not build_volume._collidesWithDisallowedAreas(None)
+
+
+class TestUpdateDisallowedAreas:
+    setting_property_dict = {"machine_width": {"value": 200},
+                             "machine_depth": {"value": 200},
+                             "machine_disallowed_areas": {"value": [[[-200, 112.5], [-82, 112.5], [-84, 102.5]]]},
+                             "print_mode": {"value": "dual"}}
+
+    def getPropertySideEffect(*args, **kwargs):
+        properties = TestUpdateDisallowedAreas.setting_property_dict.get(args[1])
+        if properties:
+            return properties.get(args[2])
+
+    def test_switchPrintModeBackAndForth(self, build_volume: BuildVolume):
+        mocked_stack = MagicMock()
+        mocked_stack.getProperty = MagicMock(side_effect = self.getPropertySideEffect)
+        build_volume._global_container_stack = mocked_stack
+        build_volume.getEdgeDisallowedSize = MagicMock(return_value = 0)
+        area = Polygon(numpy.array([[-5, -5], [-5, 5], [5, 5], [5, -5]], numpy.float32))
+        build_volume._computeDisallowedAreas = MagicMock(return_value = ([area], [area], []))
+
+        with patch("cura.Settings.ExtruderManager.ExtruderManager.getInstance"):
+            build_volume._updateDisallowedAreas()
+            with patch.dict(self.setting_property_dict, {"print_mode": {"value": "mirror"}}):
+                build_volume._updateDisallowedAreas()
+            build_volume._updateDisallowedAreas()
+
+        assert build_volume._computeDisallowedAreas.call_count == 2
+        assert build_volume.getDisallowedAreasCacheStatistics() == {"hits": 1, "misses": 2, "size": 2}
+        assert build_volume.getDisallowedAreas() == [area]
+        assert not build_volume.hasErrors()
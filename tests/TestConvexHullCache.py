@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock
+
+import numpy
+
+from UM.Math.Matrix import Matrix
+
+from cura.Scene.ConvexHullCache import ConvexHullCache
+
+
+class CubeMesh:
+    """A mesh data of a 10 mm cube around the origin that counts how often its hull is asked for."""
+
+    def __init__(self):
+        self.vertices = numpy.array([[x, y, z] for x in (-5, 5) for y in (-5, 5) for z in (-5, 5)], dtype = numpy.float64)
+        self.getConvexHullTransformedVertices = MagicMock(side_effect = self._transform)
+
+    def _transform(self, transformation):
+        data = transformation.getData()
+        return self.vertices.dot(data[:3, :3].T) + data[:3, 3]
+
+
+def createTransformation(translation = (0, 0, 0), scale = 1.0):
+    data = numpy.identity(4)
+    data[:3, :3] *= scale
+    data[:3, 3] = translation
+    return Matrix(data)
+
+
+def getSortedPoints(polygon):
+    return sorted(map(tuple, polygon.getPoints().tolist()))
+
+
+def test_getHullSharedByCopies():
+    cache = ConvexHullCache(background = False)
+    mesh = CubeMesh()
+
+    hull = cache.getHull(mesh, createTransformation((0, 3, 0)))
+    copy_hull = cache.getHull(mesh, createTransformation((20, 0, -10)))
+
+    assert mesh.getConvexHullTransformedVertices.call_count == 1
+    assert getSortedPoints(hull) == [(-5, -5), (-5, 5), (5, -5), (5, 5)]
+    assert getSortedPoints(copy_hull) == [(15, -15), (15, -5), (25, -15), (25, -5)]
+    assert cache.getStatistics() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_getHullOtherScaleOrMesh():
+    cache = ConvexHullCache(background = False)
+    mesh = CubeMesh()
+    other_mesh = CubeMesh()
+
+    cache.getHull(mesh, createTransformation())
+    scaled_hull = cache.getHull(mesh, createTransformation(scale = 2.0))
+    cache.getHull(other_mesh, createTransformation())
+
+    assert mesh.getConvexHullTransformedVertices.call_count == 2
+    assert other_mesh.getConvexHullTransformedVertices.call_count == 1
+    assert getSortedPoints(scaled_hull) == [(-10, -10), (-10, 10), (10, -10), (10, 10)]
+
+
+def test_prefetch():
+    cache = ConvexHullCache()
+    mesh = CubeMesh()
+
+    cache.prefetch(mesh, createTransformation())
+    cache.prefetch(mesh, createTransformation((5, 0, 5)))
+    hull = cache.getHull(mesh, createTransformation((1, 0, 1)))
+
+    assert mesh.getConvexHullTransformedVertices.call_count == 1
+    assert getSortedPoints(hull) == [(-4, -4), (-4, 6), (6, -4), (6, 6)]
+
+    disabled_cache = ConvexHullCache(background = False)
+    disabled_cache.prefetch(mesh, createTransformation())
+    assert disabled_cache.getStatistics()["size"] == 0
@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+
+import numpy
+
+from cura.Scene.ConvexHullGrid import ConvexHullGrid, getPolygonBounds
+
+
+def createPolygon(points):
+    polygon = MagicMock()
+    polygon.getPoints = MagicMock(return_value = numpy.array(points, dtype = numpy.float32))
+    return polygon
+
+
+def test_getPolygonBounds():
+    hull = createPolygon([[-5, -5], [5, -5], [5, 5], [-5, 5]])
+    head_hull = createPolygon([[-10, -2], [20, -2], [20, 2], [-10, 2]])
+
+    assert getPolygonBounds(hull) == (-5, -5, 5, 5)
+    assert getPolygonBounds(hull, head_hull) == (-10, -5, 20, 5)
+    assert getPolygonBounds(None, createPolygon(numpy.zeros((0, 2)))) is None
+
+
+def test_queryMatchesAllRectangles():
+    random = numpy.random.RandomState(4)
+    corners = random.uniform(-200, 200, (300, 2))
+    sizes = random.uniform(1, 30, (300, 2))
+    bounds = [(x, y, x + width, y + depth) for (x, y), (width, depth) in zip(corners, sizes)]
+    grid = ConvexHullGrid(list(range(len(bounds))), bounds)
+
+    for query in [(-10, -10, 10, 10), (100, -200, 130, -150), (-1000, -1000, 1000, 1000), (500, 500, 510, 510)]:
+        expected = [index for index, item_bounds in enumerate(bounds)
+                    if item_bounds[0] <= query[2] and item_bounds[2] >= query[0] and item_bounds[1] <= query[3] and item_bounds[3] >= query[1]]
+        assert grid.query(query) == expected
+
+
+def test_queryOversizedAndTouching():
+    grid = ConvexHullGrid(["small", "huge", "touching"], [(0, 0, 1, 1), (-1e5, -1e5, 1e5, 1e5), (1, 1, 2, 2)], cell_size = 1)
+
+    assert grid.query((0.5, 0.5, 1, 1)) == ["small", "huge", "touching"]
+    assert grid.query((5, 5, 6, 6)) == ["huge"]
+    assert ConvexHullGrid([], []).query((0, 0, 1, 1)) == []
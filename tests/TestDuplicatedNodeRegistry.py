@@ -0,0 +1,48 @@
+from cura.Utils.BCN3Dutils.Scene.DuplicatedNodeRegistry import DuplicatedNodeRegistry
+
+
+class FakeDuplicatedNode:
+    def __init__(self, node):
+        self.node = node
+
+
+def test_addGetRemove():
+    registry = DuplicatedNodeRegistry()
+    sources = [object() for _ in range(3)]
+    node_dups = [FakeDuplicatedNode(source) for source in sources]
+    for node_dup in node_dups:
+        registry.add(node_dup)
+
+    assert len(registry) == 3
+    assert registry.toList() == node_dups
+    assert registry.get(sources[1]) is node_dups[1]
+    assert node_dups[1] in registry
+
+    registry.remove(node_dups[1])
+    assert registry.get(sources[1]) is None
+    assert node_dups[1] not in registry
+    assert registry.toList() == [node_dups[0], node_dups[2]]
+
+    registry.remove(node_dups[1])  # Removing twice is harmless.
+    assert len(registry) == 2
+
+
+def test_newDuplicateReplacesOldOne():
+    registry = DuplicatedNodeRegistry()
+    source = object()
+    old_dup = FakeDuplicatedNode(source)
+    new_dup = FakeDuplicatedNode(source)
+    registry.add(old_dup)
+    registry.add(new_dup)
+
+    assert registry.get(source) is new_dup
+    assert old_dup not in registry
+    registry.remove(old_dup)  # Must not remove the duplicate that replaced it.
+    assert registry.get(source) is new_dup
+
+
+def test_otherObjectsAreNotContained():
+    registry = DuplicatedNodeRegistry()
+    registry.add(FakeDuplicatedNode(object()))
+    assert object() not in registry
+    assert registry.get(object()) is None
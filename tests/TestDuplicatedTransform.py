@@ -0,0 +1,43 @@
+import numpy
+
+from cura.Utils.BCN3Dutils.Scene.DuplicatedTransform import getRelativeTransform, isAxisAligned, transformBox, transformPoints2D
+
+
+def translation(x, y, z):
+    matrix = numpy.identity(4)
+    matrix[:3, 3] = [x, y, z]
+    return matrix
+
+
+MIRROR_X = numpy.diag([-1.0, 1.0, 1.0, 1.0])
+
+
+def test_mirroredDuplicate():
+    source = translation(-50, 10, 20)
+    duplicate = MIRROR_X.dot(source)
+    relative = getRelativeTransform(source, duplicate)
+    assert relative is not None
+    assert isAxisAligned(relative)
+
+    hull = numpy.array([[-60, 10], [-40, 10], [-40, 30], [-60, 30]], dtype = numpy.float64)
+    mirrored = transformPoints2D(hull, relative)
+    assert numpy.allclose(mirrored, [[60, 30], [40, 30], [40, 10], [60, 10]])  # Reversed to keep the winding.
+
+    minimum, maximum = transformBox(numpy.array([-60, 0, 10]), numpy.array([-40, 20, 30]), relative)
+    assert numpy.allclose(minimum, [40, 0, 10])
+    assert numpy.allclose(maximum, [60, 20, 30])
+
+
+def test_offsetDuplicate():
+    source = translation(-50, 0, 0)
+    relative = getRelativeTransform(source, translation(100, 0, 0).dot(source))
+    hull = numpy.array([[-60, 10], [-40, 10], [-40, 30]], dtype = numpy.float64)
+    assert numpy.allclose(transformPoints2D(hull, relative), hull + [100, 0])
+
+
+def test_tiltedDuplicateIsNotDerived():
+    tilted = numpy.identity(4)
+    tilted[1, 1] = tilted[2, 2] = numpy.cos(0.3)
+    tilted[1, 2] = -numpy.sin(0.3)
+    tilted[2, 1] = numpy.sin(0.3)
+    assert getRelativeTransform(numpy.identity(4), tilted) is None
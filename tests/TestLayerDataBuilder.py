@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from cura.LayerDataBuilder import LayerDataBuilder
+from cura.LayerPolygon import LayerPolygon
+
+color_map = numpy.array([[i / 12, 0.5, 1 - i / 12, 1.0] for i in range(12)])
+material_color_map = numpy.array([[1.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]], dtype = numpy.float32)
+
+
+def createBuilder():
+    builder = LayerDataBuilder()
+    for layer_nr in range(3):
+        builder.addLayer(layer_nr)
+        builder.setLayerHeight(layer_nr, 0.2 * (layer_nr + 1))
+        builder.setLayerThickness(layer_nr, 0.2)
+        line_types = numpy.array([[1], [1], [8], [3], [9], [6]], dtype = numpy.uint8)
+        points = numpy.arange(21, dtype = numpy.float32).reshape((7, 3))
+        line_widths = numpy.array([[0.4], [0.45], [0.1], [0.38], [0.1], [0.42]], dtype = numpy.float32)
+        line_thicknesses = numpy.full((6, 1), 0.2, dtype = numpy.float32)
+        line_feedrates = numpy.array([[30], [30], [150], [45.5], [150], [60]], dtype = numpy.float32)
+        with patch.object(LayerPolygon, "getColorMap", return_value = color_map):
+            polygon = LayerPolygon(layer_nr % 2, line_types, points, line_widths, line_thicknesses, line_feedrates)
+        polygon.buildCache()
+        builder.getLayer(layer_nr).polygons.append(polygon)
+    return builder
+
+
+@pytest.mark.parametrize("brightness", [1.0, 0.5])
+def test_compactAttributesMatch(brightness):
+    with patch.object(LayerPolygon, "getColorMap", return_value = color_map):
+        layer_data = createBuilder().build(material_color_map, brightness)
+        compact_layer_data = createBuilder().build(material_color_map, brightness, compact = True)
+
+    assert not layer_data.isCompact()
+    assert compact_layer_data.isCompact()
+    assert numpy.array_equal(compact_layer_data.getVertices(), layer_data.getVertices())
+    assert numpy.array_equal(compact_layer_data.getIndices(), layer_data.getIndices())
+    assert numpy.allclose(compact_layer_data.getColors(), layer_data.getColors())
+    # The vertex colors are uploaded from the bytes.
+    compact_colors = numpy.frombuffer(compact_layer_data.getColorsAsByteArray(), dtype = numpy.float32)
+    assert numpy.allclose(compact_colors, numpy.frombuffer(layer_data.getColorsAsByteArray(), dtype = numpy.float32))
+    for name in ("extruders", "line_types", "colors"):
+        assert numpy.allclose(compact_layer_data.getAttribute(name)["value"], layer_data.getAttribute(name)["value"])
+    for name in ("line_dimensions", "feedrates"):
+        # Half floats have 11 significant bits.
+        assert numpy.allclose(compact_layer_data.getAttribute(name)["value"], layer_data.getAttribute(name)["value"], rtol = 1e-3)
+    for name in ("line_dimensions", "extruders", "colors", "line_types", "feedrates"):
+        attribute = compact_layer_data.getAttribute(name)
+        assert attribute["value"].dtype == numpy.float32  # What the shaders read.
+        assert attribute["opengl_name"] == layer_data.getAttribute(name)["opengl_name"]
+
+
+def test_compactMemoryUsage():
+    with patch.object(LayerPolygon, "getColorMap", return_value = color_map):
+        memory_usage = createBuilder().build(material_color_map).getMemoryUsage()
+        compact_memory_usage = createBuilder().build(material_color_map, compact = True).getMemoryUsage()
+
+    assert "colors" in memory_usage and "colors" not in compact_memory_usage
+    assert compact_memory_usage["vertices"] == memory_usage["vertices"]
+    assert compact_memory_usage["line_types"] * 4 == memory_usage["line_types"]
+    assert sum(compact_memory_usage.values()) < sum(memory_usage.values()) / 2
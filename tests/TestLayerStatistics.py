@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock
+
+import numpy
+
+from cura.Layer import Layer
+from cura.LayerPolygon import LayerPolygon
+from cura.LayerStatistics import LayerStatistics
+
+
+def createPolygon(random, line_count):
+    polygon = MagicMock()
+    polygon.types = random.integers(0, 12, (line_count, 1)).astype(numpy.uint8)
+    polygon.lineFeedrates = random.uniform(10, 150, (line_count, 1)).astype(numpy.float32)
+    polygon.lineWidths = random.uniform(0.1, 0.6, (line_count, 1)).astype(numpy.float32)
+    polygon.lineThicknesses = random.choice([0.0, 0.1, 0.2, 0.3], (line_count, 1)).astype(numpy.float32)
+    return polygon
+
+
+def createLayers():
+    random = numpy.random.default_rng(42)
+    layers = {}
+    for layer_number in range(10):
+        layers[layer_number] = Layer(layer_number)
+        if layer_number != 4:  # An empty layer.
+            layers[layer_number].polygons.extend(createPolygon(random, random.integers(1, 50)) for _ in range(5))
+    return layers
+
+
+def test_getLayerNumbers():
+    assert LayerStatistics(createLayers()).getLayerNumbers() == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+
+
+def test_getRangeMatchesAllLines():
+    layers = createLayers()
+    statistics = LayerStatistics(layers)
+    visible_line_types = [LayerPolygon.SkinType, LayerPolygon.Inset0Type, LayerPolygon.InfillType, LayerPolygon.MoveCombingType]
+
+    polygons = [polygon for layer in layers.values() for polygon in layer.polygons]
+    visible = numpy.concatenate([numpy.isin(polygon.types.ravel(), visible_line_types) for polygon in polygons])
+    feedrates = numpy.concatenate([polygon.lineFeedrates.ravel() for polygon in polygons])[visible]
+    line_widths = numpy.concatenate([polygon.lineWidths.ravel() for polygon in polygons])[visible]
+    thicknesses = numpy.concatenate([polygon.lineThicknesses.ravel() for polygon in polygons])[visible]
+    flow_rates = feedrates * line_widths * thicknesses
+
+    assert statistics.hasLines(visible_line_types)
+    assert statistics.getRange(LayerStatistics.Feedrate, visible_line_types) == (float(feedrates.min()), float(feedrates.max()))
+    assert statistics.getRange(LayerStatistics.LineWidth, visible_line_types) == (float(line_widths.min()), float(line_widths.max()))
+    assert statistics.getRange(LayerStatistics.Thickness, visible_line_types) == (float(thicknesses[thicknesses != 0].min()), float(thicknesses.max()))
+    assert statistics.getRange(LayerStatistics.FlowRate, visible_line_types) == (float(flow_rates.min()), float(flow_rates.max()))
+
+
+def test_getRangeWithoutLines():
+    statistics = LayerStatistics({0: Layer(0)})
+    assert not statistics.hasLines([LayerPolygon.SkinType])
+    assert statistics.getRange(LayerStatistics.Feedrate, [LayerPolygon.SkinType]) == (numpy.inf, -numpy.inf)
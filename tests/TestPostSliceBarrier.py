@@ -0,0 +1,32 @@
+import threading
+
+from cura.Utils.BCN3Dutils.PostSliceBarrier import PostSliceBarrier
+
+
+def createBarrier():
+    PostSliceBarrier._instance = None
+    return PostSliceBarrier.getInstance()
+
+
+def test_waitWithoutPendingWork():
+    barrier = createBarrier()
+    assert barrier.wait(0, timeout = 0)
+    assert barrier.wait(timeout = 0)
+
+
+def test_waitForBuildPlate():
+    barrier = createBarrier()
+    barrier.start(0)
+    barrier.start(1)
+    assert barrier.isPending(0)
+    assert not barrier.wait(0, timeout = 0)
+
+    worker = threading.Thread(target = barrier.finish, args = (0, ))
+    worker.start()
+    assert barrier.wait(0, timeout = 5)
+    worker.join()
+
+    assert not barrier.isPending(0)
+    assert not barrier.wait(timeout = 0)  # Build plate 1 is still being processed.
+    barrier.finish(1)
+    assert barrier.wait(timeout = 0)
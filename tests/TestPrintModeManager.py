@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from UM.Math.Vector import Vector
+from UM.Scene.GroupDecorator import GroupDecorator
+from UM.Scene.SceneNode import SceneNode
+from UM.Scene.SceneNodeDecorator import SceneNodeDecorator
+
+from cura.Scene.CuraSceneNode import CuraSceneNode
+from cura.Scene.SliceableObjectDecorator import SliceableObjectDecorator
+from cura.Utils.BCN3Dutils import PrintModeManager as PrintModeManagerModule
+from cura.Utils.BCN3Dutils.PrintModeManager import PrintModeManager
+
+
+class FakeDuplicatedNode:
+    def __init__(self, node, parent):
+        self.node = node
+
+
+@pytest.fixture()
+def root():
+    return SceneNode()
+
+
+@pytest.fixture()
+def print_mode_manager(root):
+    # Don't set up the singleton: it connects to the application.
+    manager = PrintModeManager.__new__(PrintModeManager)
+    manager._global_stack = MagicMock()
+    manager._global_stack.getProperty = MagicMock(return_value = 200)  # The machine width.
+    manager._scene = MagicMock()
+    manager._scene.getRoot = MagicMock(return_value = root)
+    manager._last_mode = "singleT0"
+    manager.openedFromMFReader = False
+    manager.addDuplicatedNode = MagicMock()
+    manager.removeDuplicatedNodes = MagicMock()
+    return manager
+
+
+def createNode(parent, position, decorator):
+    # Replace the SettingOverrideDecorator with an empty decorator
+    with patch("cura.Scene.CuraSceneNode.SettingOverrideDecorator", SceneNodeDecorator):
+        node = CuraSceneNode()
+    node.addDecorator(decorator)
+    node.setParent(parent)
+    node.setPosition(position)
+    return node
+
+
+def switchPrintMode(manager, print_mode):
+    with patch.object(PrintModeManagerModule, "ExtruderManager"), patch.object(PrintModeManagerModule, "DuplicatedNode", FakeDuplicatedNode):
+        manager._applyPrintMode(print_mode)
+    manager._last_mode = print_mode
+
+
+def test_moveGroupAcrossDuplication(print_mode_manager, root):
+    group = createNode(root, Vector(10, 0, 20), GroupDecorator())
+    child = createNode(group, Vector(5, 0, 0), SliceableObjectDecorator())
+
+    switchPrintMode(print_mode_manager, "duplication")
+    # Nodes move a quarter of the machine width to the left, the child with its group.
+    assert group.getWorldPosition() == Vector(-40, 0, 20)
+    assert child.getWorldPosition() == Vector(-35, 0, 20)
+    assert child.getPosition() == Vector(5, 0, 0)
+
+    switchPrintMode(print_mode_manager, "dual")
+    assert group.getWorldPosition() == Vector(10, 0, 20)
+    assert child.getWorldPosition() == Vector(15, 0, 20)